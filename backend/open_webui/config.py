@@ -718,6 +718,34 @@ LICENSE_KEY = os.environ.get("LICENSE_KEY", "")
 
 STORAGE_PROVIDER = os.environ.get("STORAGE_PROVIDER", "local")  # defaults to local, s3
 
+# Uploads are hashed and copied in chunks of this size, and sent to the cloud
+# providers in multipart uploads with parts of (at least) this size
+STORAGE_UPLOAD_CHUNK_SIZE = os.environ.get("STORAGE_UPLOAD_CHUNK_SIZE", "8388608")
+
+try:
+    STORAGE_UPLOAD_CHUNK_SIZE = int(STORAGE_UPLOAD_CHUNK_SIZE)
+except Exception:
+    STORAGE_UPLOAD_CHUNK_SIZE = 8 * 1024 * 1024
+
+# Async callers run the blocking storage SDK calls on a pool of this many threads
+STORAGE_THREAD_POOL_SIZE = os.environ.get("STORAGE_THREAD_POOL_SIZE", "16")
+
+try:
+    STORAGE_THREAD_POOL_SIZE = int(STORAGE_THREAD_POOL_SIZE)
+except Exception:
+    STORAGE_THREAD_POOL_SIZE = 16
+
+# Serve file content from cloud storage by redirecting to a short-lived presigned URL
+ENABLE_STORAGE_PRESIGNED_URLS = (
+    os.environ.get("ENABLE_STORAGE_PRESIGNED_URLS", "False").lower() == "true"
+)
+STORAGE_PRESIGNED_URL_EXPIRY = os.environ.get("STORAGE_PRESIGNED_URL_EXPIRY", "300")
+
+try:
+    STORAGE_PRESIGNED_URL_EXPIRY = int(STORAGE_PRESIGNED_URL_EXPIRY)
+except Exception:
+    STORAGE_PRESIGNED_URL_EXPIRY = 300
+
 S3_ACCESS_KEY_ID = os.environ.get("S3_ACCESS_KEY_ID", None)
 S3_SECRET_ACCESS_KEY = os.environ.get("S3_SECRET_ACCESS_KEY", None)
 S3_REGION_NAME = os.environ.get("S3_REGION_NAME", None)
@@ -753,6 +781,18 @@ UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
 CACHE_DIR = DATA_DIR / "cache"
 CACHE_DIR.mkdir(parents=True, exist_ok=True)
 
+# Local copies of files kept in cloud storage, least recently used ones are
+# evicted once they take up more than STORAGE_CACHE_MAX_SIZE bytes
+STORAGE_CACHE_DIR = Path(os.environ.get("STORAGE_CACHE_DIR", CACHE_DIR / "storage"))
+STORAGE_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+
+STORAGE_CACHE_MAX_SIZE = os.environ.get("STORAGE_CACHE_MAX_SIZE", "5368709120")
+
+try:
+    STORAGE_CACHE_MAX_SIZE = int(STORAGE_CACHE_MAX_SIZE)
+except Exception:
+    STORAGE_CACHE_MAX_SIZE = 5 * 1024 * 1024 * 1024
+
 
 ####################################
 # DIRECT CONNECTIONS
@@ -1683,6 +1723,36 @@ PGVECTOR_INITIALIZE_MAX_VECTOR_LENGTH = int(
     os.environ.get("PGVECTOR_INITIALIZE_MAX_VECTOR_LENGTH", "1536")
 )
 
+####################################
+# Local Models
+####################################
+
+# Embedding, reranking, Whisper and TTS models that are loaded in process are
+# unloaded once unused for this many seconds (0 keeps them loaded) ...
+MODEL_IDLE_TIMEOUT = os.environ.get("MODEL_IDLE_TIMEOUT", "0")
+
+try:
+    MODEL_IDLE_TIMEOUT = int(MODEL_IDLE_TIMEOUT)
+except Exception:
+    MODEL_IDLE_TIMEOUT = 0
+
+# ... or, least recently used first, when together they take up more than
+# this many bytes of memory (0 for no limit)
+MODEL_MEMORY_BUDGET = os.environ.get("MODEL_MEMORY_BUDGET", "0")
+
+try:
+    MODEL_MEMORY_BUDGET = int(MODEL_MEMORY_BUDGET)
+except Exception:
+    MODEL_MEMORY_BUDGET = 0
+
+# Inferences each embedding, reranking and TTS model runs at a time
+MODEL_INFERENCE_THREADS = os.environ.get("MODEL_INFERENCE_THREADS", "1")
+
+try:
+    MODEL_INFERENCE_THREADS = max(int(MODEL_INFERENCE_THREADS), 1)
+except Exception:
+    MODEL_INFERENCE_THREADS = 1
+
 ####################################
 # Information Retrieval (RAG)
 ####################################
@@ -2427,6 +2497,39 @@ IMAGE_GENERATION_MODEL = PersistentConfig(
     os.getenv("IMAGE_GENERATION_MODEL", ""),
 )
 
+# Generated images are also stored as smaller WebP (and AVIF, where Pillow
+# supports it) copies, at full size and at each of these widths
+ENABLE_IMAGE_VARIANTS = (
+    os.environ.get("ENABLE_IMAGE_VARIANTS", "True").lower() == "true"
+)
+
+IMAGE_VARIANT_FORMATS = [
+    format.strip().lower()
+    for format in os.environ.get("IMAGE_VARIANT_FORMATS", "webp,avif").split(",")
+    if format.strip()
+]
+
+IMAGE_VARIANT_WIDTHS = [
+    int(width)
+    for width in os.environ.get("IMAGE_VARIANT_WIDTHS", "256,512,1024").split(",")
+    if width.strip().isdigit()
+]
+
+IMAGE_VARIANT_QUALITY = os.environ.get("IMAGE_VARIANT_QUALITY", "80")
+
+try:
+    IMAGE_VARIANT_QUALITY = int(IMAGE_VARIANT_QUALITY)
+except Exception:
+    IMAGE_VARIANT_QUALITY = 80
+
+# Threads encoding the variants in the background
+IMAGE_VARIANT_WORKERS = os.environ.get("IMAGE_VARIANT_WORKERS", "2")
+
+try:
+    IMAGE_VARIANT_WORKERS = max(int(IMAGE_VARIANT_WORKERS), 1)
+except Exception:
+    IMAGE_VARIANT_WORKERS = 2
+
 ####################################
 # Audio
 ####################################
@@ -2444,6 +2547,55 @@ WHISPER_MODEL_AUTO_UPDATE = (
     and os.environ.get("WHISPER_MODEL_AUTO_UPDATE", "").lower() == "true"
 )
 
+# The local Whisper engine splits recordings at pauses into windows of at most
+# this many seconds, and transcribes up to AUDIO_STT_WORKERS of them at a time
+AUDIO_STT_CHUNK_DURATION = os.environ.get("AUDIO_STT_CHUNK_DURATION", "30")
+
+try:
+    AUDIO_STT_CHUNK_DURATION = int(AUDIO_STT_CHUNK_DURATION)
+except Exception:
+    AUDIO_STT_CHUNK_DURATION = 30
+
+# Shortest pause, in milliseconds, a recording is split at
+AUDIO_STT_MIN_SILENCE_DURATION = os.environ.get("AUDIO_STT_MIN_SILENCE_DURATION", "500")
+
+try:
+    AUDIO_STT_MIN_SILENCE_DURATION = int(AUDIO_STT_MIN_SILENCE_DURATION)
+except Exception:
+    AUDIO_STT_MIN_SILENCE_DURATION = 500
+
+AUDIO_STT_WORKERS = os.environ.get("AUDIO_STT_WORKERS", "2")
+
+try:
+    AUDIO_STT_WORKERS = max(int(AUDIO_STT_WORKERS), 1)
+except Exception:
+    AUDIO_STT_WORKERS = 2
+
+# Recordings are converted to 16 kHz mono before transcription by up to this
+# many processes, and the results are cached by content up to
+# AUDIO_STT_CACHE_MAX_SIZE bytes, evicting those unused for AUDIO_STT_CACHE_TTL
+# seconds first
+AUDIO_STT_TRANSCODE_WORKERS = os.environ.get("AUDIO_STT_TRANSCODE_WORKERS", "2")
+
+try:
+    AUDIO_STT_TRANSCODE_WORKERS = max(int(AUDIO_STT_TRANSCODE_WORKERS), 1)
+except Exception:
+    AUDIO_STT_TRANSCODE_WORKERS = 2
+
+AUDIO_STT_CACHE_MAX_SIZE = os.environ.get("AUDIO_STT_CACHE_MAX_SIZE", "1073741824")
+
+try:
+    AUDIO_STT_CACHE_MAX_SIZE = int(AUDIO_STT_CACHE_MAX_SIZE)
+except Exception:
+    AUDIO_STT_CACHE_MAX_SIZE = 1024 * 1024 * 1024
+
+AUDIO_STT_CACHE_TTL = os.environ.get("AUDIO_STT_CACHE_TTL", str(7 * 24 * 60 * 60))
+
+try:
+    AUDIO_STT_CACHE_TTL = int(AUDIO_STT_CACHE_TTL)
+except Exception:
+    AUDIO_STT_CACHE_TTL = 7 * 24 * 60 * 60
+
 # Add Deepgram configuration
 DEEPGRAM_API_KEY = PersistentConfig(
     "DEEPGRAM_API_KEY",
@@ -2531,6 +2683,27 @@ AUDIO_TTS_AZURE_SPEECH_OUTPUT_FORMAT = PersistentConfig(
     ),
 )
 
+# Stream synthesized speech to the client while it is written to the cache
+ENABLE_AUDIO_TTS_STREAMING = (
+    os.environ.get("ENABLE_AUDIO_TTS_STREAMING", "True").lower() == "true"
+)
+
+# Synthesized speech is cached up to this many bytes, clips not played for
+# AUDIO_TTS_CACHE_TTL seconds are evicted first
+AUDIO_TTS_CACHE_MAX_SIZE = os.environ.get("AUDIO_TTS_CACHE_MAX_SIZE", "1073741824")
+
+try:
+    AUDIO_TTS_CACHE_MAX_SIZE = int(AUDIO_TTS_CACHE_MAX_SIZE)
+except Exception:
+    AUDIO_TTS_CACHE_MAX_SIZE = 1024 * 1024 * 1024
+
+AUDIO_TTS_CACHE_TTL = os.environ.get("AUDIO_TTS_CACHE_TTL", str(30 * 24 * 60 * 60))
+
+try:
+    AUDIO_TTS_CACHE_TTL = int(AUDIO_TTS_CACHE_TTL)
+except Exception:
+    AUDIO_TTS_CACHE_TTL = 30 * 24 * 60 * 60
+
 
 ####################################
 # LDAP
@@ -314,10 +314,6 @@ RESET_CONFIG_ON_START = (
     os.environ.get("RESET_CONFIG_ON_START", "False").lower() == "true"
 )
 
-ENABLE_REALTIME_CHAT_SAVE = (
-    os.environ.get("ENABLE_REALTIME_CHAT_SAVE", "False").lower() == "true"
-)
-
 ####################################
 # REDIS
 ####################################
@@ -340,6 +336,32 @@ BYPASS_MODEL_ACCESS_CONTROL = (
     os.environ.get("BYPASS_MODEL_ACCESS_CONTROL", "False").lower() == "true"
 )
 
+# Seconds an authenticated user is cached per token before being reloaded from the DB
+AUTH_USER_CACHE_TTL = os.environ.get("AUTH_USER_CACHE_TTL", "5")
+
+try:
+    AUTH_USER_CACHE_TTL = int(AUTH_USER_CACHE_TTL)
+except Exception:
+    AUTH_USER_CACHE_TTL = 5
+
+# Minimum number of seconds between two `last_active_at` writes for the same user
+USER_LAST_ACTIVE_UPDATE_INTERVAL = os.environ.get(
+    "USER_LAST_ACTIVE_UPDATE_INTERVAL", "60"
+)
+
+try:
+    USER_LAST_ACTIVE_UPDATE_INTERVAL = int(USER_LAST_ACTIVE_UPDATE_INTERVAL)
+except Exception:
+    USER_LAST_ACTIVE_UPDATE_INTERVAL = 60
+
+# Seconds between two bulk flushes of buffered user activity timestamps to the DB
+USER_ACTIVITY_FLUSH_INTERVAL = os.environ.get("USER_ACTIVITY_FLUSH_INTERVAL", "5")
+
+try:
+    USER_ACTIVITY_FLUSH_INTERVAL = float(USER_ACTIVITY_FLUSH_INTERVAL)
+except Exception:
+    USER_ACTIVITY_FLUSH_INTERVAL = 5.0
+
 ####################################
 # WEBUI_SECRET_KEY
 ####################################
@@ -385,6 +407,94 @@ WEBSOCKET_SENTINEL_HOSTS = os.environ.get("WEBSOCKET_SENTINEL_HOSTS", "")
 
 WEBSOCKET_SENTINEL_PORT = os.environ.get("WEBSOCKET_SENTINEL_PORT", "26379")
 
+# Seconds a node caches a user's session ids before re-reading them from Redis
+WEBSOCKET_USER_POOL_CACHE_TTL = os.environ.get("WEBSOCKET_USER_POOL_CACHE_TTL", "1")
+
+try:
+    WEBSOCKET_USER_POOL_CACHE_TTL = float(WEBSOCKET_USER_POOL_CACHE_TTL)
+except Exception:
+    WEBSOCKET_USER_POOL_CACHE_TTL = 1.0
+
+WEBSOCKET_USAGE_BROADCAST_INTERVAL = os.environ.get(
+    "WEBSOCKET_USAGE_BROADCAST_INTERVAL", "1"
+)
+
+try:
+    WEBSOCKET_USAGE_BROADCAST_INTERVAL = float(WEBSOCKET_USAGE_BROADCAST_INTERVAL)
+except Exception:
+    WEBSOCKET_USAGE_BROADCAST_INTERVAL = 1.0
+
+WEBSOCKET_PRESENCE_BATCH_INTERVAL = os.environ.get(
+    "WEBSOCKET_PRESENCE_BATCH_INTERVAL", "0.5"
+)
+
+try:
+    WEBSOCKET_PRESENCE_BATCH_INTERVAL = float(WEBSOCKET_PRESENCE_BATCH_INTERVAL)
+except Exception:
+    WEBSOCKET_PRESENCE_BATCH_INTERVAL = 0.5
+
+WEBSOCKET_MAX_CONCURRENT_HANDSHAKES = os.environ.get(
+    "WEBSOCKET_MAX_CONCURRENT_HANDSHAKES", "32"
+)
+
+try:
+    WEBSOCKET_MAX_CONCURRENT_HANDSHAKES = int(WEBSOCKET_MAX_CONCURRENT_HANDSHAKES)
+except Exception:
+    WEBSOCKET_MAX_CONCURRENT_HANDSHAKES = 32
+
+WEBSOCKET_HANDSHAKE_TIMEOUT = os.environ.get("WEBSOCKET_HANDSHAKE_TIMEOUT", "5")
+
+try:
+    WEBSOCKET_HANDSHAKE_TIMEOUT = float(WEBSOCKET_HANDSHAKE_TIMEOUT)
+except Exception:
+    WEBSOCKET_HANDSHAKE_TIMEOUT = 5.0
+
+WEBSOCKET_RECONNECT_DELAY_MAX = os.environ.get("WEBSOCKET_RECONNECT_DELAY_MAX", "30")
+
+try:
+    WEBSOCKET_RECONNECT_DELAY_MAX = float(WEBSOCKET_RECONNECT_DELAY_MAX)
+except Exception:
+    WEBSOCKET_RECONNECT_DELAY_MAX = 30.0
+
+WEBSOCKET_CHANNEL_MEMBERSHIP_CACHE_TTL = os.environ.get(
+    "WEBSOCKET_CHANNEL_MEMBERSHIP_CACHE_TTL", "30"
+)
+
+try:
+    WEBSOCKET_CHANNEL_MEMBERSHIP_CACHE_TTL = float(
+        WEBSOCKET_CHANNEL_MEMBERSHIP_CACHE_TTL
+    )
+except Exception:
+    WEBSOCKET_CHANNEL_MEMBERSHIP_CACHE_TTL = 30.0
+
+WEBSOCKET_EVENT_STREAM_MAXLEN = os.environ.get("WEBSOCKET_EVENT_STREAM_MAXLEN", "500")
+
+try:
+    WEBSOCKET_EVENT_STREAM_MAXLEN = int(WEBSOCKET_EVENT_STREAM_MAXLEN)
+except Exception:
+    WEBSOCKET_EVENT_STREAM_MAXLEN = 500
+
+WEBSOCKET_EVENT_STREAM_TTL = os.environ.get("WEBSOCKET_EVENT_STREAM_TTL", "3600")
+
+try:
+    WEBSOCKET_EVENT_STREAM_TTL = int(WEBSOCKET_EVENT_STREAM_TTL)
+except Exception:
+    WEBSOCKET_EVENT_STREAM_TTL = 3600
+
+WEBSOCKET_TYPING_EVENT_INTERVAL = os.environ.get("WEBSOCKET_TYPING_EVENT_INTERVAL", "2")
+
+try:
+    WEBSOCKET_TYPING_EVENT_INTERVAL = float(WEBSOCKET_TYPING_EVENT_INTERVAL)
+except Exception:
+    WEBSOCKET_TYPING_EVENT_INTERVAL = 2.0
+
+WEBSOCKET_OUTBOUND_QUEUE_SIZE = os.environ.get("WEBSOCKET_OUTBOUND_QUEUE_SIZE", "256")
+
+try:
+    WEBSOCKET_OUTBOUND_QUEUE_SIZE = int(WEBSOCKET_OUTBOUND_QUEUE_SIZE)
+except Exception:
+    WEBSOCKET_OUTBOUND_QUEUE_SIZE = 256
+
 AIOHTTP_CLIENT_TIMEOUT = os.environ.get("AIOHTTP_CLIENT_TIMEOUT", "")
 
 if AIOHTTP_CLIENT_TIMEOUT == "":
@@ -40,9 +40,10 @@ from fastapi.responses import JSONResponse, RedirectResponse
 from fastapi.staticfiles import StaticFiles
 
 from starlette.exceptions import HTTPException as StarletteHTTPException
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.datastructures import MutableHeaders
 from starlette.middleware.sessions import SessionMiddleware
 from starlette.responses import Response, StreamingResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 
 from open_webui.utils import logger
@@ -51,6 +52,7 @@ from open_webui.utils.logger import start_logger
 from open_webui.socket.main import (
     app as socket_app,
     periodic_usage_pool_cleanup,
+    start_chat_event_stream,
 )
 from open_webui.routers import (
     audio,
@@ -318,6 +320,7 @@ from open_webui.config import (
     AppConfig,
     reset_config,
 )
+from open_webui.constants import ERROR_MESSAGES
 from open_webui.env import (
     AUDIT_EXCLUDED_PATHS,
     AUDIT_LOG_LEVEL,
@@ -356,19 +359,32 @@ from open_webui.utils.chat import (
     chat_action as chat_action_handler,
 )
 from open_webui.utils.middleware import process_chat_payload, process_chat_response
-from open_webui.utils.access_control import has_access
+from open_webui.utils.access_control import get_auth_context
+from open_webui.utils.activity import periodic_user_activity_flush
 
+from open_webui.utils.metrics import get_metrics
+from open_webui.utils.model_manager import periodic_model_unload
+from open_webui.utils.images.client import close_session as close_image_session
+from open_webui.utils.images.comfyui import close_comfyui_client
 from open_webui.utils.auth import (
     get_license_data,
     get_http_authorization_cred,
     decode_token,
     get_admin_user,
     get_verified_user,
+    listen_for_user_cache_invalidations,
 )
 from open_webui.utils.oauth import OAuthManager
 from open_webui.utils.security_headers import SecurityHeadersMiddleware
 
-from open_webui.tasks import stop_task, list_tasks  # Import from tasks.py
+from open_webui.tasks import (
+    get_task_info,
+    list_task_ids_by_chat_id,
+    list_tasks,
+    listen_for_task_cancellations,
+    periodic_task_registry_maintenance,
+    stop_task,
+)  # Import from tasks.py
 
 from open_webui.utils.redis import get_sentinels_from_env
 
@@ -426,9 +442,24 @@ async def lifespan(app: FastAPI):
     app.state.MCP_CONFIG = load_mcp_config()
     log.info(f"MCP_CONFIG: {app.state.MCP_CONFIG}")
 
-    asyncio.create_task(periodic_usage_pool_cleanup())
+    background_tasks = [
+        asyncio.create_task(periodic_usage_pool_cleanup()),
+        asyncio.create_task(periodic_user_activity_flush()),
+        asyncio.create_task(periodic_task_registry_maintenance()),
+        asyncio.create_task(listen_for_task_cancellations()),
+        asyncio.create_task(listen_for_user_cache_invalidations()),
+        asyncio.create_task(periodic_model_unload()),
+    ]
     yield
 
+    # Waits for the tasks' cleanup (e.g. the last activity flush) to finish
+    for task in background_tasks:
+        task.cancel()
+    await asyncio.gather(*background_tasks, return_exceptions=True)
+
+    await close_comfyui_client()
+    await close_image_session()
+
 
 app = FastAPI(
     docs_url="/docs" if ENV == "dev" else None,
@@ -796,11 +827,6 @@ app.state.config.TTS_AZURE_SPEECH_REGION = AUDIO_TTS_AZURE_SPEECH_REGION
 app.state.config.TTS_AZURE_SPEECH_OUTPUT_FORMAT = AUDIO_TTS_AZURE_SPEECH_OUTPUT_FORMAT
 
 
-app.state.faster_whisper_model = None
-app.state.speech_synthesiser = None
-app.state.speech_speaker_embeddings_dataset = None
-
-
 ########################################
 #
 # TASKS
@@ -846,68 +872,136 @@ app.state.config.AUTOCOMPLETE_GENERATION_INPUT_MAX_LENGTH = (
 app.state.MODELS = {}
 
 
-class RedirectMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
+class RedirectMiddleware:
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
         # Check if the request is a GET request
-        if request.method == "GET":
-            path = request.url.path
-            query_params = dict(parse_qs(urlparse(str(request.url)).query))
+        if scope["type"] == "http" and scope["method"] == "GET":
+            path = scope["path"]
+            query_params = parse_qs(scope.get("query_string", b"").decode("latin-1"))
 
             # Check for the specific watch path and the presence of 'v' parameter
             if path.endswith("/watch") and "v" in query_params:
                 video_id = query_params["v"][0]  # Extract the first 'v' parameter
                 encoded_video_id = urlencode({"youtube": video_id})
                 redirect_url = f"/?{encoded_video_id}"
-                return RedirectResponse(url=redirect_url)
+                response = RedirectResponse(url=redirect_url)
+                return await response(scope, receive, send)
 
         # Proceed with the normal flow of other requests
-        response = await call_next(request)
-        return response
+        await self.app(scope, receive, send)
 
 
-# Add the middleware to the app
-app.add_middleware(RedirectMiddleware)
-app.add_middleware(SecurityHeadersMiddleware)
+class CommitSessionMiddleware:
+    def __init__(self, app: ASGIApp):
+        self.app = app
 
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
 
-@app.middleware("http")
-async def commit_session_after_request(request: Request, call_next):
-    response = await call_next(request)
-    # log.debug("Commit session after request")
-    Session.commit()
-    return response
+        await self.app(scope, receive, send)
+        # log.debug("Commit session after request")
+        Session.commit()
 
 
-@app.middleware("http")
-async def check_url(request: Request, call_next):
-    start_time = int(time.time())
-    request.state.token = get_http_authorization_cred(
-        request.headers.get("Authorization")
-    )
+class CheckUrlMiddleware:
+    def __init__(self, app: ASGIApp):
+        self.app = app
 
-    request.state.enable_api_key = app.state.config.ENABLE_API_KEY
-    response = await call_next(request)
-    process_time = int(time.time()) - start_time
-    response.headers["X-Process-Time"] = str(process_time)
-    return response
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
 
+        start_time = int(time.time())
+        request = Request(scope)
+        request.state.token = get_http_authorization_cred(
+            request.headers.get("Authorization")
+        )
+        request.state.enable_api_key = app.state.config.ENABLE_API_KEY
 
-@app.middleware("http")
-async def inspect_websocket(request: Request, call_next):
-    if (
-        "/ws/socket.io" in request.url.path
-        and request.query_params.get("transport") == "websocket"
-    ):
-        upgrade = (request.headers.get("Upgrade") or "").lower()
-        connection = (request.headers.get("Connection") or "").lower().split(",")
-        # Check that there's the correct headers for an upgrade, else reject the connection
-        # This is to work around this upstream issue: https://github.com/miguelgrinberg/python-engineio/issues/367
-        if upgrade != "websocket" or "upgrade" not in connection:
-            return JSONResponse(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                content={"detail": "Invalid WebSocket upgrade request"},
-            )
-    return await call_next(request)
+        async def send_wrapper(message: Message):
+            if message["type"] == "http.response.start":
+                process_time = int(time.time()) - start_time
+                MutableHeaders(scope=message)["X-Process-Time"] = str(process_time)
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
+
+
+class UploadSizeLimitMiddleware:
+    """
+    Rejects file uploads declaring a body larger than the configured maximum
+    file size, before the multipart body is read and spooled to disk.
+    """
+
+    # Room for the multipart boundaries and part headers around the file
+    MULTIPART_OVERHEAD = 64 * 1024
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if (
+            scope["type"] == "http"
+            and scope["method"] == "POST"
+            and scope["path"].rstrip("/") == "/api/v1/files"
+        ):
+            # Only read for uploads, as with Redis every config read is a GET
+            max_size = app.state.config.FILE_MAX_SIZE
+            content_length = Request(scope).headers.get("Content-Length", "")
+            if (
+                max_size
+                and content_length.isdigit()
+                and int(content_length)
+                > max_size * 1024 * 1024 + self.MULTIPART_OVERHEAD
+            ):
+                response = JSONResponse(
+                    status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                    content={
+                        "detail": ERROR_MESSAGES.FILE_TOO_LARGE(f"{max_size} MB")
+                    },
+                )
+                return await response(scope, receive, send)
+
+        await self.app(scope, receive, send)
+
+
+class InspectWebsocketMiddleware:
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] == "http" and "/ws/socket.io" in scope["path"]:
+            request = Request(scope)
+            if request.query_params.get("transport") == "websocket":
+                upgrade = (request.headers.get("Upgrade") or "").lower()
+                connection = (
+                    (request.headers.get("Connection") or "").lower().split(",")
+                )
+                # Check that there's the correct headers for an upgrade, else reject the connection
+                # This is to work around this upstream issue: https://github.com/miguelgrinberg/python-engineio/issues/367
+                if upgrade != "websocket" or "upgrade" not in connection:
+                    response = JSONResponse(
+                        status_code=status.HTTP_400_BAD_REQUEST,
+                        content={"detail": "Invalid WebSocket upgrade request"},
+                    )
+                    return await response(scope, receive, send)
+
+        await self.app(scope, receive, send)
+
+
+# Add the middleware to the app
+# These are plain ASGI middlewares, so streamed responses pass through them
+# chunk by chunk without being buffered or re-yielded
+app.add_middleware(RedirectMiddleware)
+app.add_middleware(SecurityHeadersMiddleware)
+app.add_middleware(CommitSessionMiddleware)
+app.add_middleware(CheckUrlMiddleware)
+app.add_middleware(InspectWebsocketMiddleware)
+app.add_middleware(UploadSizeLimitMiddleware)
 
 
 app.add_middleware(
@@ -982,11 +1076,12 @@ if audit_level != AuditLevel.NONE:
 @app.get("/api/models")
 async def get_models(request: Request, user=Depends(get_verified_user)):
     def get_filtered_models(models, user):
+        auth_context = get_auth_context(request, user)
+
         filtered_models = []
         for model in models:
             if model.get("arena"):
-                if has_access(
-                    user.id,
+                if auth_context.has_access(
                     type="read",
                     access_control=model.get("info", {})
                     .get("meta", {})
@@ -997,8 +1092,8 @@ async def get_models(request: Request, user=Depends(get_verified_user)):
 
             model_info = Models.get_model_by_id(model["id"])
             if model_info:
-                if user.id == model_info.user_id or has_access(
-                    user.id, type="read", access_control=model_info.access_control
+                if user.id == model_info.user_id or auth_context.has_access(
+                    type="read", access_control=model_info.access_control
                 ):
                     filtered_models.append(model)
 
@@ -1120,6 +1215,9 @@ async def chat_completion(
         request.state.metadata = metadata
         form_data["metadata"] = metadata
 
+        if metadata["chat_id"] and metadata["message_id"]:
+            start_chat_event_stream(metadata["chat_id"], metadata["message_id"])
+
         form_data, metadata, events = await process_chat_payload(
             request, form_data, user, metadata, model
         )
@@ -1197,6 +1295,15 @@ async def chat_action(
 
 @app.post("/api/tasks/stop/{task_id}")
 async def stop_task_endpoint(task_id: str, user=Depends(get_verified_user)):
+    task_info = await get_task_info(task_id)
+    if user.role != "admin" and (
+        task_info is None or task_info.get("user_id") != user.id
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Task with ID {task_id} not found.",
+        )
+
     try:
         result = await stop_task(task_id)  # Use the function from tasks.py
         return result
@@ -1206,7 +1313,20 @@ async def stop_task_endpoint(task_id: str, user=Depends(get_verified_user)):
 
 @app.get("/api/tasks")
 async def list_tasks_endpoint(user=Depends(get_verified_user)):
-    return {"tasks": list_tasks()}  # Use the function from tasks.py
+    return {
+        "tasks": await list_tasks(user_id=None if user.role == "admin" else user.id)
+    }  # Use the function from tasks.py
+
+
+@app.get("/api/tasks/chat/{chat_id}")
+async def list_tasks_by_chat_id_endpoint(
+    chat_id: str, user=Depends(get_verified_user)
+):
+    return {
+        "task_ids": await list_task_ids_by_chat_id(
+            chat_id, user_id=None if user.role == "admin" else user.id
+        )
+    }
 
 
 ##################################
@@ -1216,6 +1336,11 @@ async def list_tasks_endpoint(user=Depends(get_verified_user)):
 ##################################
 
 
+@app.get("/api/metrics")
+async def get_app_metrics(user=Depends(get_admin_user)):
+    return get_metrics()
+
+
 @app.get("/api/config")
 async def get_app_config(request: Request):
     user = None
@@ -0,0 +1,64 @@
+"""Add group_member table
+
+Revision ID: d31026856c01
+Revises: 3781e22d8b01
+Create Date: 2025-01-20 03:00:00.000000
+
+"""
+
+import json
+import time
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.sql import table, column
+
+revision = "d31026856c01"
+down_revision = "3781e22d8b01"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "group_member",
+        sa.Column("group_id", sa.Text(), nullable=False),
+        sa.Column("user_id", sa.Text(), nullable=False),
+        sa.Column("created_at", sa.BigInteger(), nullable=True),
+        sa.PrimaryKeyConstraint("group_id", "user_id"),
+    )
+    op.create_index("group_member_user_id_idx", "group_member", ["user_id"])
+
+    # Backfill memberships from the JSON 'user_ids' column of the 'group' table
+    group = table(
+        "group",
+        column("id", sa.Text()),
+        column("user_ids", sa.JSON()),
+    )
+    group_member = table(
+        "group_member",
+        column("group_id", sa.Text()),
+        column("user_id", sa.Text()),
+        column("created_at", sa.BigInteger()),
+    )
+
+    conn = op.get_bind()
+    result = conn.execute(sa.select(group.c.id, group.c.user_ids))
+
+    now = int(time.time())
+    rows = []
+    for row in result:
+        user_ids = row.user_ids
+        if isinstance(user_ids, str):
+            user_ids = json.loads(user_ids)
+
+        for user_id in dict.fromkeys(user_ids or []):
+            rows.append({"group_id": row.id, "user_id": user_id, "created_at": now})
+
+    if rows:
+        op.bulk_insert(group_member, rows)
+
+
+def downgrade():
+    op.drop_index("group_member_user_id_idx", table_name="group_member")
+    op.drop_table("group_member")
@@ -11,7 +11,7 @@ from open_webui.models.files import FileMetadataResponse
 
 
 from pydantic import BaseModel, ConfigDict
-from sqlalchemy import BigInteger, Column, String, Text, JSON, func
+from sqlalchemy import BigInteger, Column, Index, Text, JSON
 
 
 log = logging.getLogger(__name__)
@@ -41,6 +41,17 @@ class Group(Base):
     updated_at = Column(BigInteger)
 
 
+class GroupMember(Base):
+    __tablename__ = "group_member"
+
+    group_id = Column(Text, primary_key=True)
+    user_id = Column(Text, primary_key=True)
+
+    created_at = Column(BigInteger)
+
+    __table_args__ = (Index("group_member_user_id_idx", "user_id"),)
+
+
 class GroupModel(BaseModel):
     model_config = ConfigDict(from_attributes=True)
     id: str
@@ -88,6 +99,19 @@ class GroupUpdateForm(GroupForm):
 
 
 class GroupTable:
+    def _set_group_members(self, db, group_id: str, user_ids: list[str]):
+        # `group_member` is the indexed source of truth for membership lookups,
+        # `group.user_ids` is kept in sync for API responses.
+        db.query(GroupMember).filter_by(group_id=group_id).delete()
+        db.add_all(
+            [
+                GroupMember(
+                    group_id=group_id, user_id=user_id, created_at=int(time.time())
+                )
+                for user_id in dict.fromkeys(user_ids)
+            ]
+        )
+
     def insert_new_group(
         self, user_id: str, form_data: GroupForm
     ) -> Optional[GroupModel]:
@@ -105,6 +129,7 @@ class GroupTable:
             try:
                 result = Group(**group.model_dump())
                 db.add(result)
+                self._set_group_members(db, group.id, group.user_ids)
                 db.commit()
                 db.refresh(result)
                 if result:
@@ -127,16 +152,34 @@ class GroupTable:
             return [
                 GroupModel.model_validate(group)
                 for group in db.query(Group)
-                .filter(
-                    func.json_array_length(Group.user_ids) > 0
-                )  # Ensure array exists
-                .filter(
-                    Group.user_ids.cast(String).like(f'%"{user_id}"%')
-                )  # String-based check
+                .join(GroupMember, GroupMember.group_id == Group.id)
+                .filter(GroupMember.user_id == user_id)
                 .order_by(Group.updated_at.desc())
                 .all()
             ]
 
+    def get_group_ids_by_member_id(self, user_id: str) -> list[str]:
+        with get_db() as db:
+            return [
+                group_id
+                for (group_id,) in db.query(GroupMember.group_id)
+                .filter(GroupMember.user_id == user_id)
+                .all()
+            ]
+
+    def get_member_ids_by_group_ids(self, group_ids: list[str]) -> list[str]:
+        if not group_ids:
+            return []
+
+        with get_db() as db:
+            return [
+                user_id
+                for (user_id,) in db.query(GroupMember.user_id)
+                .filter(GroupMember.group_id.in_(group_ids))
+                .distinct()
+                .all()
+            ]
+
     def get_group_by_id(self, id: str) -> Optional[GroupModel]:
         try:
             with get_db() as db:
@@ -163,6 +206,8 @@ class GroupTable:
                         "updated_at": int(time.time()),
                     }
                 )
+                if form_data.user_ids is not None:
+                    self._set_group_members(db, id, form_data.user_ids)
                 db.commit()
                 return self.get_group_by_id(id=id)
         except Exception as e:
@@ -172,6 +217,7 @@ class GroupTable:
     def delete_group_by_id(self, id: str) -> bool:
         try:
             with get_db() as db:
+                db.query(GroupMember).filter_by(group_id=id).delete()
                 db.query(Group).filter_by(id=id).delete()
                 db.commit()
                 return True
@@ -181,6 +227,7 @@ class GroupTable:
     def delete_all_groups(self) -> bool:
         with get_db() as db:
             try:
+                db.query(GroupMember).delete()
                 db.query(Group).delete()
                 db.commit()
 
@@ -194,14 +241,15 @@ class GroupTable:
                 groups = self.get_groups_by_member_id(user_id)
 
                 for group in groups:
-                    group.user_ids.remove(user_id)
                     db.query(Group).filter_by(id=group.id).update(
                         {
-                            "user_ids": group.user_ids,
+                            "user_ids": [i for i in group.user_ids if i != user_id],
                             "updated_at": int(time.time()),
                         }
                     )
-                    db.commit()
+
+                db.query(GroupMember).filter_by(user_id=user_id).delete()
+                db.commit()
 
                 return True
             except Exception:
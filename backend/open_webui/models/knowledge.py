@@ -14,6 +14,7 @@ from open_webui.models.users import Users, UserResponse
 from pydantic import BaseModel, ConfigDict
 from sqlalchemy import BigInteger, Column, String, Text, JSON
 
+from open_webui.models.groups import Groups
 from open_webui.utils.access_control import has_access
 
 log = logging.getLogger(__name__)
@@ -147,11 +148,18 @@ class KnowledgeTable:
         self, user_id: str, permission: str = "write"
     ) -> list[KnowledgeUserModel]:
         knowledge_bases = self.get_knowledge_bases()
+        user_group_ids = Groups.get_group_ids_by_member_id(user_id)
+
         return [
             knowledge_base
             for knowledge_base in knowledge_bases
             if knowledge_base.user_id == user_id
-            or has_access(user_id, permission, knowledge_base.access_control)
+            or has_access(
+                user_id,
+                permission,
+                knowledge_base.access_control,
+                user_group_ids=user_group_ids,
+            )
         ]
 
     def get_knowledge_by_id(self, id: str) -> Optional[KnowledgeModel]:
@@ -162,6 +170,14 @@ class KnowledgeTable:
         except Exception:
             return None
 
+    def get_knowledge_bases_by_file_id(self, file_id: str) -> list[KnowledgeModel]:
+        with get_db() as db:
+            return [
+                KnowledgeModel.model_validate(knowledge)
+                for knowledge in db.query(Knowledge).all()
+                if file_id in (knowledge.data or {}).get("file_ids", [])
+            ]
+
     def update_knowledge_by_id(
         self, id: str, form_data: KnowledgeForm, overwrite: bool = False
     ) -> Optional[KnowledgeModel]:
@@ -15,6 +15,7 @@ from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy import BigInteger, Column, Text, JSON, Boolean
 
 
+from open_webui.models.groups import Groups
 from open_webui.utils.access_control import has_access
 
 
@@ -199,11 +200,18 @@ class ModelsTable:
         self, user_id: str, permission: str = "write"
     ) -> list[ModelUserResponse]:
         models = self.get_models()
+        user_group_ids = Groups.get_group_ids_by_member_id(user_id)
+
         return [
             model
             for model in models
             if model.user_id == user_id
-            or has_access(user_id, permission, model.access_control)
+            or has_access(
+                user_id,
+                permission,
+                model.access_control,
+                user_group_ids=user_group_ids,
+            )
         ]
 
     def get_model_by_id(self, id: str) -> Optional[ModelModel]:
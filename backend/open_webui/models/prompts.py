@@ -7,6 +7,7 @@ from open_webui.models.users import Users, UserResponse
 from pydantic import BaseModel, ConfigDict
 from sqlalchemy import BigInteger, Column, String, Text, JSON
 
+from open_webui.models.groups import Groups
 from open_webui.utils.access_control import has_access
 
 ####################
@@ -122,12 +123,18 @@ class PromptsTable:
         self, user_id: str, permission: str = "write"
     ) -> list[PromptUserResponse]:
         prompts = self.get_prompts()
+        user_group_ids = Groups.get_group_ids_by_member_id(user_id)
 
         return [
             prompt
             for prompt in prompts
             if prompt.user_id == user_id
-            or has_access(user_id, permission, prompt.access_control)
+            or has_access(
+                user_id,
+                permission,
+                prompt.access_control,
+                user_group_ids=user_group_ids,
+            )
         ]
 
     def update_prompt_by_command(
@@ -8,6 +8,7 @@ from open_webui.env import SRC_LOG_LEVELS
 from pydantic import BaseModel, ConfigDict
 from sqlalchemy import BigInteger, Column, String, Text, JSON
 
+from open_webui.models.groups import Groups
 from open_webui.utils.access_control import has_access
 
 
@@ -161,12 +162,18 @@ class ToolsTable:
         self, user_id: str, permission: str = "write"
     ) -> list[ToolUserModel]:
         tools = self.get_tools()
+        user_group_ids = Groups.get_group_ids_by_member_id(user_id)
 
         return [
             tool
             for tool in tools
             if tool.user_id == user_id
-            or has_access(user_id, permission, tool.access_control)
+            or has_access(
+                user_id,
+                permission,
+                tool.access_control,
+                user_group_ids=user_group_ids,
+            )
         ]
 
     def get_tool_valves_by_id(self, id: str) -> Optional[dict]:
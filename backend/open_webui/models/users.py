@@ -9,7 +9,7 @@ from open_webui.models.groups import Groups
 
 
 from pydantic import BaseModel, ConfigDict
-from sqlalchemy import BigInteger, Column, String, Text
+from sqlalchemy import BigInteger, Column, String, Text, bindparam, update
 
 ####################
 # User DB Schema
@@ -246,6 +246,34 @@ class UsersTable:
         except Exception:
             return None
 
+    def update_users_last_active_by_ids(self, last_active: dict[str, int]) -> bool:
+        """
+        Bulk update `last_active_at` for many users in a single statement.
+        Timestamps never move backwards, so batches flushed out of order are harmless.
+        """
+        if not last_active:
+            return True
+
+        try:
+            with get_db() as db:
+                db.connection().execute(
+                    update(User.__table__)
+                    .where(User.__table__.c.id == bindparam("_id"))
+                    .where(
+                        (User.__table__.c.last_active_at == None)
+                        | (User.__table__.c.last_active_at < bindparam("_ts"))
+                    )
+                    .values(last_active_at=bindparam("_ts")),
+                    [
+                        {"_id": user_id, "_ts": timestamp}
+                        for user_id, timestamp in last_active.items()
+                    ],
+                )
+                db.commit()
+                return True
+        except Exception:
+            return False
+
     def update_user_oauth_sub_by_id(
         self, id: str, oauth_sub: str
     ) -> Optional[UserModel]:
@@ -356,9 +356,11 @@ def get_embedding_function(
     embedding_batch_size,
 ):
     if embedding_engine == "":
-        return lambda query, prefix=None, user=None: embedding_function.encode(
-            query, **({"prompt": prefix} if prefix else {})
-        ).tolist()
+        return lambda query, prefix=None, user=None: embedding_function.run(
+            lambda model: model.encode(
+                query, **({"prompt": prefix} if prefix else {})
+            ).tolist()
+        )
     elif embedding_engine in ["ollama", "openai"]:
         func = lambda query, prefix=None, user=None: generate_embeddings(
             engine=embedding_engine,
@@ -768,8 +770,10 @@ class RerankCompressor(BaseDocumentCompressor):
         reranking = self.reranking_function is not None
 
         if reranking:
-            scores = self.reranking_function.predict(
-                [(query, doc.page_content) for doc in documents]
+            scores = self.reranking_function.run(
+                lambda model: model.predict(
+                    [(query, doc.page_content) for doc in documents]
+                )
             )
         else:
             from sentence_transformers import util
@@ -3,10 +3,15 @@ import json
 import logging
 import os
 import uuid
+from bisect import bisect_right
+from collections import deque
 from functools import lru_cache
 from pathlib import Path
+from typing import Iterator, Optional
 from pydub import AudioSegment
-from pydub.silence import split_on_silence
+from pydub.silence import detect_silence, split_on_silence
+
+import numpy as np
 
 import aiohttp
 import aiofiles
@@ -18,21 +23,35 @@ from fastapi import (
     FastAPI,
     File,
     HTTPException,
+    Query,
     Request,
     UploadFile,
     status,
     APIRouter,
 )
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, StreamingResponse
 from pydantic import BaseModel
 
 
+from open_webui.utils.audio import AudioNormalizer
 from open_webui.utils.auth import get_admin_user, get_verified_user
+from open_webui.utils.file_cache import FileCache
+from open_webui.utils.model_manager import MODELS, ManagedModel
 from open_webui.config import (
     WHISPER_MODEL_AUTO_UPDATE,
     WHISPER_MODEL_DIR,
     CACHE_DIR,
+    AUDIO_STT_CHUNK_DURATION,
+    AUDIO_STT_MIN_SILENCE_DURATION,
+    AUDIO_STT_WORKERS,
+    AUDIO_STT_TRANSCODE_WORKERS,
+    AUDIO_STT_CACHE_MAX_SIZE,
+    AUDIO_STT_CACHE_TTL,
+    AUDIO_TTS_CACHE_MAX_SIZE,
+    AUDIO_TTS_CACHE_TTL,
+    ENABLE_AUDIO_TTS_STREAMING,
+    MODEL_INFERENCE_THREADS,
 )
 
 from open_webui.constants import ERROR_MESSAGES
@@ -57,6 +76,26 @@ log.setLevel(SRC_LOG_LEVELS["AUDIO"])
 SPEECH_CACHE_DIR = CACHE_DIR / "audio" / "speech"
 SPEECH_CACHE_DIR.mkdir(parents=True, exist_ok=True)
 
+SPEECH_CACHE = FileCache(
+    SPEECH_CACHE_DIR,
+    AUDIO_TTS_CACHE_MAX_SIZE,
+    ttl=AUDIO_TTS_CACHE_TTL,
+    name="audio.speech_cache",
+)
+SPEECH_CHUNK_SIZE = 16 * 1024
+
+# Clips cached before the cache was sharded are never looked up again
+for path in [*SPEECH_CACHE_DIR.glob("*.mp3"), *SPEECH_CACHE_DIR.glob("*.json")]:
+    path.unlink(missing_ok=True)
+
+# 16 kHz mono copies of the recordings to transcribe, by content
+AUDIO_NORMALIZER = AudioNormalizer(
+    CACHE_DIR / "audio" / "normalized",
+    AUDIO_STT_CACHE_MAX_SIZE,
+    ttl=AUDIO_STT_CACHE_TTL,
+    workers=AUDIO_STT_TRANSCODE_WORKERS,
+)
+
 
 ##########################################
 #
@@ -84,13 +123,6 @@ def is_mp4_audio(file_path):
     return False
 
 
-def convert_mp4_to_wav(file_path, output_path):
-    """Convert MP4 audio file to WAV format."""
-    audio = AudioSegment.from_file(file_path, format="mp4")
-    audio.export(output_path, format="wav")
-    log.info(f"Converted {file_path} to {output_path}")
-
-
 def set_faster_whisper_model(model: str, auto_update: bool = False):
     whisper_model = None
     if model:
@@ -102,6 +134,8 @@ def set_faster_whisper_model(model: str, auto_update: bool = False):
             "compute_type": "int8",
             "download_root": WHISPER_MODEL_DIR,
             "local_files_only": not auto_update,
+            # Lets the windows of a recording be transcribed in parallel
+            "num_workers": AUDIO_STT_WORKERS,
         }
 
         try:
@@ -197,9 +231,9 @@ async def update_audio_config(
     request.app.state.config.DEEPGRAM_API_KEY = form_data.stt.DEEPGRAM_API_KEY
 
     if request.app.state.config.STT_ENGINE == "":
-        request.app.state.faster_whisper_model = set_faster_whisper_model(
-            form_data.stt.WHISPER_MODEL, WHISPER_MODEL_AUTO_UPDATE
-        )
+        get_whisper_model(request).warmup()
+    else:
+        MODELS.remove("whisper")
 
     return {
         "tts": {
@@ -224,20 +258,122 @@ async def update_audio_config(
     }
 
 
-def load_speech_pipeline(request):
-    from transformers import pipeline
-    from datasets import load_dataset
+def get_whisper_model(request: Request) -> ManagedModel:
+    model = request.app.state.config.WHISPER_MODEL
+
+    # Shared by all requests, so its executor bounds how many windows are
+    # transcribed at a time
+    return MODELS.register(
+        "whisper",
+        model,
+        lambda: set_faster_whisper_model(model, WHISPER_MODEL_AUTO_UPDATE),
+        threads=AUDIO_STT_WORKERS,
+    )
+
+
+def get_speech_pipeline() -> ManagedModel:
+    def load():
+        from transformers import pipeline
+        from datasets import load_dataset
+
+        return (
+            pipeline("text-to-speech", "microsoft/speecht5_tts"),
+            load_dataset("Matthijs/cmu-arctic-xvectors", split="validation"),
+        )
+
+    return MODELS.register(
+        "speech", "microsoft/speecht5_tts", load, threads=MODEL_INFERENCE_THREADS
+    )
+
+
+def synthesize_speech(speech_pipeline, text: str, speaker: str):
+    import torch
+
+    synthesiser, embeddings_dataset = speech_pipeline
+
+    speaker_index = 6799
+    try:
+        speaker_index = embeddings_dataset["filename"].index(speaker)
+    except Exception:
+        pass
+
+    speaker_embedding = torch.tensor(
+        embeddings_dataset[speaker_index]["xvector"]
+    ).unsqueeze(0)
+
+    return synthesiser(
+        text,
+        forward_params={"speaker_embeddings": speaker_embedding},
+    )
+
+
+async def send_speech_request(
+    name: str, payload: dict, url: str, headers: dict, **kwargs
+):
+    """
+    Posts a synthesis request to an external TTS engine. The audio is streamed
+    to the client while it is written to the cache, or cached first and then
+    served as a file when streaming is disabled.
+    """
+    session = aiohttp.ClientSession(
+        timeout=aiohttp.ClientTimeout(total=AIOHTTP_CLIENT_TIMEOUT), trust_env=True
+    )
+
+    r = None
+    try:
+        r = await session.post(url, headers=headers, **kwargs)
+        r.raise_for_status()
+    except Exception as e:
+        log.exception(e)
+        detail = None
+
+        try:
+            if r is not None and r.status != 200:
+                res = await r.json()
+                if "error" in res:
+                    detail = f"External: {res['error'].get('message', '')}"
+        except Exception:
+            detail = f"External: {e}"
+
+        if r is not None:
+            r.release()
+        await session.close()
 
-    if request.app.state.speech_synthesiser is None:
-        request.app.state.speech_synthesiser = pipeline(
-            "text-to-speech", "microsoft/speecht5_tts"
+        raise HTTPException(
+            status_code=getattr(r, "status", 500),
+            detail=detail if detail else "Open WebUI: Server Connection Error",
         )
 
-    if request.app.state.speech_speaker_embeddings_dataset is None:
-        request.app.state.speech_speaker_embeddings_dataset = load_dataset(
-            "Matthijs/cmu-arctic-xvectors", split="validation"
+    async def stream_to_cache():
+        part_path = SPEECH_CACHE.part_path(name)
+        try:
+            async with aiofiles.open(part_path, "wb") as f:
+                async for chunk in r.content.iter_chunked(SPEECH_CHUNK_SIZE):
+                    await f.write(chunk)
+                    yield chunk
+
+            async with aiofiles.open(SPEECH_CACHE.path(name, ".json"), "w") as f:
+                await f.write(json.dumps(payload))
+
+            # Only complete clips are moved into the cache
+            os.replace(part_path, SPEECH_CACHE.path(name, ".mp3"))
+            SPEECH_CACHE.add(name)
+        finally:
+            # Left behind when the client or the engine went away mid-clip
+            part_path.unlink(missing_ok=True)
+            r.release()
+            await session.close()
+
+    if ENABLE_AUDIO_TTS_STREAMING:
+        return StreamingResponse(
+            stream_to_cache(),
+            media_type=r.headers.get("Content-Type", "audio/mpeg"),
         )
 
+    async for _ in stream_to_cache():
+        pass
+    return FileResponse(SPEECH_CACHE.path(name, ".mp3"))
+
 
 @router.post("/speech")
 async def speech(request: Request, user=Depends(get_verified_user)):
@@ -248,11 +384,9 @@ async def speech(request: Request, user=Depends(get_verified_user)):
         + str(request.app.state.config.TTS_MODEL).encode("utf-8")
     ).hexdigest()
 
-    file_path = SPEECH_CACHE_DIR.joinpath(f"{name}.mp3")
-    file_body_path = SPEECH_CACHE_DIR.joinpath(f"{name}.json")
-
     # Check if the file already exists in the cache
-    if file_path.is_file():
+    file_path = SPEECH_CACHE.get(name, ".mp3")
+    if file_path:
         return FileResponse(file_path)
 
     payload = None
@@ -265,56 +399,26 @@ async def speech(request: Request, user=Depends(get_verified_user)):
     if request.app.state.config.TTS_ENGINE == "openai":
         payload["model"] = request.app.state.config.TTS_MODEL
 
-        try:
-            timeout = aiohttp.ClientTimeout(total=AIOHTTP_CLIENT_TIMEOUT)
-            async with aiohttp.ClientSession(
-                timeout=timeout, trust_env=True
-            ) as session:
-                async with session.post(
-                    url=f"{request.app.state.config.TTS_OPENAI_API_BASE_URL}/audio/speech",
-                    json=payload,
-                    headers={
-                        "Content-Type": "application/json",
-                        "Authorization": f"Bearer {request.app.state.config.TTS_OPENAI_API_KEY}",
-                        **(
-                            {
-                                "X-OpenWebUI-User-Name": user.name,
-                                "X-OpenWebUI-User-Id": user.id,
-                                "X-OpenWebUI-User-Email": user.email,
-                                "X-OpenWebUI-User-Role": user.role,
-                            }
-                            if ENABLE_FORWARD_USER_INFO_HEADERS
-                            else {}
-                        ),
-                    },
-                ) as r:
-                    r.raise_for_status()
-
-                    async with aiofiles.open(file_path, "wb") as f:
-                        await f.write(await r.read())
-
-                    async with aiofiles.open(file_body_path, "w") as f:
-                        await f.write(json.dumps(payload))
-
-            return FileResponse(file_path)
-
-        except Exception as e:
-            log.exception(e)
-            detail = None
-
-            try:
-                if r.status != 200:
-                    res = await r.json()
-
-                    if "error" in res:
-                        detail = f"External: {res['error'].get('message', '')}"
-            except Exception:
-                detail = f"External: {e}"
-
-            raise HTTPException(
-                status_code=getattr(r, "status", 500),
-                detail=detail if detail else "Open WebUI: Server Connection Error",
-            )
+        return await send_speech_request(
+            name,
+            payload,
+            url=f"{request.app.state.config.TTS_OPENAI_API_BASE_URL}/audio/speech",
+            json=payload,
+            headers={
+                "Content-Type": "application/json",
+                "Authorization": f"Bearer {request.app.state.config.TTS_OPENAI_API_KEY}",
+                **(
+                    {
+                        "X-OpenWebUI-User-Name": user.name,
+                        "X-OpenWebUI-User-Id": user.id,
+                        "X-OpenWebUI-User-Email": user.email,
+                        "X-OpenWebUI-User-Role": user.role,
+                    }
+                    if ENABLE_FORWARD_USER_INFO_HEADERS
+                    else {}
+                ),
+            },
+        )
 
     elif request.app.state.config.TTS_ENGINE == "elevenlabs":
         voice_id = payload.get("voice", "")
@@ -325,181 +429,204 @@ async def speech(request: Request, user=Depends(get_verified_user)):
                 detail="Invalid voice id",
             )
 
-        try:
-            timeout = aiohttp.ClientTimeout(total=AIOHTTP_CLIENT_TIMEOUT)
-            async with aiohttp.ClientSession(
-                timeout=timeout, trust_env=True
-            ) as session:
-                async with session.post(
-                    f"https://api.elevenlabs.io/v1/text-to-speech/{voice_id}",
-                    json={
-                        "text": payload["input"],
-                        "model_id": request.app.state.config.TTS_MODEL,
-                        "voice_settings": {"stability": 0.5, "similarity_boost": 0.5},
-                    },
-                    headers={
-                        "Accept": "audio/mpeg",
-                        "Content-Type": "application/json",
-                        "xi-api-key": request.app.state.config.TTS_API_KEY,
-                    },
-                ) as r:
-                    r.raise_for_status()
-
-                    async with aiofiles.open(file_path, "wb") as f:
-                        await f.write(await r.read())
-
-                    async with aiofiles.open(file_body_path, "w") as f:
-                        await f.write(json.dumps(payload))
-
-            return FileResponse(file_path)
-
-        except Exception as e:
-            log.exception(e)
-            detail = None
-
-            try:
-                if r.status != 200:
-                    res = await r.json()
-                    if "error" in res:
-                        detail = f"External: {res['error'].get('message', '')}"
-            except Exception:
-                detail = f"External: {e}"
-
-            raise HTTPException(
-                status_code=getattr(r, "status", 500),
-                detail=detail if detail else "Open WebUI: Server Connection Error",
-            )
+        return await send_speech_request(
+            name,
+            payload,
+            url=f"https://api.elevenlabs.io/v1/text-to-speech/{voice_id}",
+            json={
+                "text": payload["input"],
+                "model_id": request.app.state.config.TTS_MODEL,
+                "voice_settings": {"stability": 0.5, "similarity_boost": 0.5},
+            },
+            headers={
+                "Accept": "audio/mpeg",
+                "Content-Type": "application/json",
+                "xi-api-key": request.app.state.config.TTS_API_KEY,
+            },
+        )
 
     elif request.app.state.config.TTS_ENGINE == "azure":
-        try:
-            payload = json.loads(body.decode("utf-8"))
-        except Exception as e:
-            log.exception(e)
-            raise HTTPException(status_code=400, detail="Invalid JSON payload")
-
         region = request.app.state.config.TTS_AZURE_SPEECH_REGION
         language = request.app.state.config.TTS_VOICE
         locale = "-".join(request.app.state.config.TTS_VOICE.split("-")[:1])
         output_format = request.app.state.config.TTS_AZURE_SPEECH_OUTPUT_FORMAT
 
-        try:
-            data = f"""<speak version="1.0" xmlns="http://www.w3.org/2001/10/synthesis" xml:lang="{locale}">
+        data = f"""<speak version="1.0" xmlns="http://www.w3.org/2001/10/synthesis" xml:lang="{locale}">
                 <voice name="{language}">{payload["input"]}</voice>
             </speak>"""
-            timeout = aiohttp.ClientTimeout(total=AIOHTTP_CLIENT_TIMEOUT)
-            async with aiohttp.ClientSession(
-                timeout=timeout, trust_env=True
-            ) as session:
-                async with session.post(
-                    f"https://{region}.tts.speech.microsoft.com/cognitiveservices/v1",
-                    headers={
-                        "Ocp-Apim-Subscription-Key": request.app.state.config.TTS_API_KEY,
-                        "Content-Type": "application/ssml+xml",
-                        "X-Microsoft-OutputFormat": output_format,
-                    },
-                    data=data,
-                ) as r:
-                    r.raise_for_status()
-
-                    async with aiofiles.open(file_path, "wb") as f:
-                        await f.write(await r.read())
-
-                    async with aiofiles.open(file_body_path, "w") as f:
-                        await f.write(json.dumps(payload))
-
-                    return FileResponse(file_path)
 
-        except Exception as e:
-            log.exception(e)
-            detail = None
+        return await send_speech_request(
+            name,
+            payload,
+            url=f"https://{region}.tts.speech.microsoft.com/cognitiveservices/v1",
+            headers={
+                "Ocp-Apim-Subscription-Key": request.app.state.config.TTS_API_KEY,
+                "Content-Type": "application/ssml+xml",
+                "X-Microsoft-OutputFormat": output_format,
+            },
+            data=data,
+        )
 
-            try:
-                if r.status != 200:
-                    res = await r.json()
-                    if "error" in res:
-                        detail = f"External: {res['error'].get('message', '')}"
-            except Exception:
-                detail = f"External: {e}"
+    elif request.app.state.config.TTS_ENGINE == "transformers":
+        import soundfile as sf
 
-            raise HTTPException(
-                status_code=getattr(r, "status", 500),
-                detail=detail if detail else "Open WebUI: Server Connection Error",
-            )
+        speech = await get_speech_pipeline().run_async(
+            synthesize_speech, payload["input"], request.app.state.config.TTS_MODEL
+        )
 
-    elif request.app.state.config.TTS_ENGINE == "transformers":
-        payload = None
-        try:
-            payload = json.loads(body.decode("utf-8"))
-        except Exception as e:
-            log.exception(e)
-            raise HTTPException(status_code=400, detail="Invalid JSON payload")
+        file_path = SPEECH_CACHE.path(name, ".mp3")
+        sf.write(file_path, speech["audio"], samplerate=speech["sampling_rate"])
 
-        import torch
-        import soundfile as sf
+        async with aiofiles.open(SPEECH_CACHE.path(name, ".json"), "w") as f:
+            await f.write(json.dumps(payload))
 
-        load_speech_pipeline(request)
+        SPEECH_CACHE.add(name)
+        return FileResponse(file_path)
 
-        embeddings_dataset = request.app.state.speech_speaker_embeddings_dataset
 
-        speaker_index = 6799
-        try:
-            speaker_index = embeddings_dataset["filename"].index(
-                request.app.state.config.TTS_MODEL
+def split_audio(
+    file_path: str, sha256: Optional[str] = None
+) -> Iterator[tuple[float, np.ndarray]]:
+    """
+    Splits the 16 kHz mono copy of a recording at pauses into windows of at
+    most AUDIO_STT_CHUNK_DURATION seconds, yielding the offset in seconds and
+    the samples of each window.
+    """
+    audio = AudioSegment.from_wav(AUDIO_NORMALIZER.normalize(file_path, "wav", sha256))
+
+    max_duration = AUDIO_STT_CHUNK_DURATION * 1000
+    cuts = []
+    if len(audio) > max_duration:
+        cuts = [
+            (start + end) // 2
+            for start, end in detect_silence(
+                audio,
+                min_silence_len=AUDIO_STT_MIN_SILENCE_DURATION,
+                silence_thresh=audio.dBFS - 16,
+                seek_step=50,
             )
-        except Exception:
-            pass
+        ]
 
-        speaker_embedding = torch.tensor(
-            embeddings_dataset[speaker_index]["xvector"]
-        ).unsqueeze(0)
+    start = 0
+    while start < len(audio):
+        end = min(start + max_duration, len(audio))
+        if end < len(audio):
+            # Cuts at the last pause of the window rather than mid-word
+            index = bisect_right(cuts, end) - 1
+            if index >= 0 and cuts[index] > start:
+                end = cuts[index]
 
-        speech = request.app.state.speech_synthesiser(
-            payload["input"],
-            forward_params={"speaker_embeddings": speaker_embedding},
-        )
+        samples = np.frombuffer(audio[start:end].raw_data, dtype=np.int16)
+        yield start / 1000, samples.astype(np.float32) / 32768.0
+        start = end
 
-        sf.write(file_path, speech["audio"], samplerate=speech["sampling_rate"])
 
-        async with aiofiles.open(file_body_path, "w") as f:
-            await f.write(json.dumps(payload))
+def transcribe_windows(
+    whisper_model: ManagedModel, file_path: str, sha256: Optional[str] = None
+) -> Iterator[dict]:
+    """
+    Transcribes the windows of a recording in parallel, yielding their
+    segments in order as soon as the earlier windows are done.
+    """
 
-        return FileResponse(file_path)
+    def run(model, offset: float, samples: np.ndarray, language: str = None):
+        segments, info = model.transcribe(samples, beam_size=5, language=language)
+        return info, [
+            {
+                "start": round(offset + segment.start, 2),
+                "end": round(offset + segment.end, 2),
+                "text": segment.text,
+            }
+            for segment in segments
+        ]
 
+    windows = split_audio(file_path, sha256)
+    window = next(windows, None)
+    if window is None:
+        return
+
+    # The language detected in the first window is used for the others, which
+    # may be too short to detect it reliably
+    info, segments = whisper_model.run(run, *window)
+    log.info(
+        "Detected language '%s' with probability %f"
+        % (info.language, info.language_probability)
+    )
+    yield from segments
 
-def transcribe(request: Request, file_path):
+    # Only a few windows are queued per worker, so a long recording does not
+    # hold up the transcriptions of other requests
+    pending = deque()
+    try:
+        for window in windows:
+            pending.append(whisper_model.submit(run, *window, info.language))
+            if len(pending) > AUDIO_STT_WORKERS * 2:
+                yield from pending.popleft().result()[1]
+
+        while pending:
+            yield from pending.popleft().result()[1]
+    finally:
+        # Left over when the client went away mid-transcription
+        for future in pending:
+            future.cancel()
+
+
+def transcribe_local(
+    request: Request, file_path: str, sha256: Optional[str] = None
+) -> Iterator[dict]:
+    transcript = ""
+    whisper_model = get_whisper_model(request)
+    for segment in transcribe_windows(whisper_model, file_path, sha256):
+        transcript += segment["text"]
+        yield segment
+
+    data = {"text": transcript.strip()}
+
+    # save the transcript to a json file
+    id = os.path.basename(file_path).split(".")[0]
+    transcript_file = f"{os.path.dirname(file_path)}/{id}.json"
+    with open(transcript_file, "w") as f:
+        json.dump(data, f)
+
+    log.debug(data)
+
+
+def transcribe_segments(
+    request: Request, file_path: str, sha256: Optional[str] = None
+) -> Iterator[dict]:
+    """
+    Yields the transcript of a recording as it is produced: segment by segment
+    for the local Whisper engine, all at once for the other engines. `sha256`
+    of the recording, when known, saves hashing it to find its cached copy.
+    """
+    if request.app.state.config.STT_ENGINE == "":
+        yield from transcribe_local(request, file_path, sha256)
+    else:
+        yield {"text": transcribe(request, file_path, sha256).get("text", "")}
+
+
+def transcribe(request: Request, file_path, sha256: Optional[str] = None):
     log.info(f"transcribe: {file_path}")
     filename = os.path.basename(file_path)
     file_dir = os.path.dirname(file_path)
     id = filename.split(".")[0]
 
     if request.app.state.config.STT_ENGINE == "":
-        if request.app.state.faster_whisper_model is None:
-            request.app.state.faster_whisper_model = set_faster_whisper_model(
-                request.app.state.config.WHISPER_MODEL
-            )
-
-        model = request.app.state.faster_whisper_model
-        segments, info = model.transcribe(file_path, beam_size=5)
-        log.info(
-            "Detected language '%s' with probability %f"
-            % (info.language, info.language_probability)
+        transcript = "".join(
+            [
+                segment["text"]
+                for segment in transcribe_local(request, file_path, sha256)
+            ]
         )
+        return {"text": transcript.strip()}
 
-        transcript = "".join([segment.text for segment in list(segments)])
-        data = {"text": transcript.strip()}
+    # The remote engines limit the size of uploads
+    upload_path = compress_audio(file_path, sha256)
 
-        # save the transcript to a json file
-        transcript_file = f"{file_dir}/{id}.json"
-        with open(transcript_file, "w") as f:
-            json.dump(data, f)
-
-        log.debug(data)
-        return data
-    elif request.app.state.config.STT_ENGINE == "openai":
-        if is_mp4_audio(file_path):
-            os.rename(file_path, file_path.replace(".wav", ".mp4"))
-            # Convert MP4 audio file to WAV format
-            convert_mp4_to_wav(file_path.replace(".wav", ".mp4"), file_path)
+    if request.app.state.config.STT_ENGINE == "openai":
+        if upload_path == file_path and is_mp4_audio(file_path):
+            # Sent as WAV, as MP4 audio is rejected under other extensions
+            upload_path = str(AUDIO_NORMALIZER.normalize(file_path, "wav", sha256))
 
         r = None
         try:
@@ -508,7 +635,12 @@ def transcribe(request: Request, file_path):
                 headers={
                     "Authorization": f"Bearer {request.app.state.config.STT_OPENAI_API_KEY}"
                 },
-                files={"file": (filename, open(file_path, "rb"))},
+                files={
+                    "file": (
+                        os.path.basename(upload_path),
+                        open(upload_path, "rb"),
+                    )
+                },
                 data={"model": request.app.state.config.STT_MODEL},
             )
 
@@ -538,12 +670,12 @@ def transcribe(request: Request, file_path):
     elif request.app.state.config.STT_ENGINE == "deepgram":
         try:
             # Determine the MIME type of the file
-            mime, _ = mimetypes.guess_type(file_path)
+            mime, _ = mimetypes.guess_type(upload_path)
             if not mime:
                 mime = "audio/wav"  # fallback to wav if undetectable
 
             # Read the audio file
-            with open(file_path, "rb") as f:
+            with open(upload_path, "rb") as f:
                 file_data = f.read()
 
             # Build headers and parameters
@@ -599,13 +731,9 @@ def transcribe(request: Request, file_path):
             raise Exception(detail if detail else "Open WebUI: Server Connection Error")
 
 
-def compress_audio(file_path):
+def compress_audio(file_path, sha256: Optional[str] = None):
     if os.path.getsize(file_path) > MAX_FILE_SIZE:
-        file_dir = os.path.dirname(file_path)
-        audio = AudioSegment.from_file(file_path)
-        audio = audio.set_frame_rate(16000).set_channels(1)  # Compress audio
-        compressed_path = f"{file_dir}/{id}_compressed.opus"
-        audio.export(compressed_path, format="opus", bitrate="32k")
+        compressed_path = str(AUDIO_NORMALIZER.normalize(file_path, "opus", sha256))
         log.debug(f"Compressed audio to {compressed_path}")
 
         if (
@@ -617,10 +745,27 @@ def compress_audio(file_path):
         return file_path
 
 
+def stream_transcription(
+    request: Request, file_path: str, sha256: Optional[str] = None
+):
+    transcript = ""
+    try:
+        for segment in transcribe_segments(request, file_path, sha256):
+            transcript += segment["text"]
+            yield f"data: {json.dumps({'segment': segment})}\n\n"
+
+        data = {"text": transcript.strip(), "filename": os.path.basename(file_path)}
+        yield f"data: {json.dumps(data)}\n\n"
+    except Exception as e:
+        log.exception(e)
+        yield f"data: {json.dumps({'error': ERROR_MESSAGES.DEFAULT(e)})}\n\n"
+
+
 @router.post("/transcriptions")
 def transcription(
     request: Request,
     file: UploadFile = File(...),
+    stream: bool = Query(False),
     user=Depends(get_verified_user),
 ):
     log.info(f"file.content_type: {file.content_type}")
@@ -639,6 +784,7 @@ def transcription(
 
         filename = f"{id}.{ext}"
         contents = file.file.read()
+        sha256 = hashlib.sha256(contents).hexdigest()
 
         file_dir = f"{CACHE_DIR}/audio/transcriptions"
         os.makedirs(file_dir, exist_ok=True)
@@ -648,17 +794,13 @@ def transcription(
             f.write(contents)
 
         try:
-            try:
-                file_path = compress_audio(file_path)
-            except Exception as e:
-                log.exception(e)
-
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail=ERROR_MESSAGES.DEFAULT(e),
+            if stream:
+                return StreamingResponse(
+                    stream_transcription(request, file_path, sha256),
+                    media_type="text/event-stream",
                 )
 
-            data = transcribe(request, file_path)
+            data = transcribe(request, file_path, sha256)
             file_path = file_path.split("/")[-1]
             return {**data, "filename": file_path}
         except Exception as e:
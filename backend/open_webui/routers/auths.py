@@ -41,9 +41,10 @@ from open_webui.utils.auth import (
     get_verified_user,
     get_current_user,
     get_password_hash,
+    invalidate_user_cache,
 )
 from open_webui.utils.webhook import post_webhook
-from open_webui.utils.access_control import get_permissions
+from open_webui.utils.access_control import get_auth_context, get_permissions
 
 from typing import Optional, List
 
@@ -98,8 +99,8 @@ async def get_session_user(
         secure=WEBUI_AUTH_COOKIE_SECURE,
     )
 
-    user_permissions = get_permissions(
-        user.id, request.app.state.config.USER_PERMISSIONS
+    user_permissions = get_auth_context(request, user).get_permissions(
+        request.app.state.config.USER_PERMISSIONS
     )
 
     return {
@@ -130,6 +131,7 @@ async def update_profile(
             {"profile_image_url": form_data.profile_image_url, "name": form_data.name},
         )
         if user:
+            await invalidate_user_cache(user.id)
             return user
         else:
             raise HTTPException(400, detail=ERROR_MESSAGES.DEFAULT())
@@ -839,6 +841,7 @@ async def generate_api_key(request: Request, user=Depends(get_current_user)):
     success = Users.update_user_api_key_by_id(user.id, api_key)
 
     if success:
+        await invalidate_user_cache(user.id)
         return {
             "api_key": api_key,
         }
@@ -850,6 +853,7 @@ async def generate_api_key(request: Request, user=Depends(get_current_user)):
 @router.delete("/api_key", response_model=bool)
 async def delete_api_key(user=Depends(get_current_user)):
     success = Users.update_user_api_key_by_id(user.id, None)
+    await invalidate_user_cache(user.id)
     return success
 
 
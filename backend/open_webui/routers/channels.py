@@ -7,7 +7,11 @@ from fastapi import APIRouter, Depends, HTTPException, Request, status, Backgrou
 from pydantic import BaseModel
 
 
-from open_webui.socket.main import sio, get_user_ids_from_room
+from open_webui.socket.main import (
+    sio,
+    get_user_ids_from_room,
+    invalidate_channel_membership,
+)
 from open_webui.models.users import Users, UserNameResponse
 
 from open_webui.models.channels import Channels, ChannelModel, ChannelForm
@@ -55,6 +59,7 @@ async def get_channels(user=Depends(get_verified_user)):
 async def create_new_channel(form_data: ChannelForm, user=Depends(get_admin_user)):
     try:
         channel = Channels.insert_new_channel(None, form_data, user.id)
+        await invalidate_channel_membership()
         return ChannelModel(**channel.model_dump())
     except Exception as e:
         log.exception(e)
@@ -103,6 +108,7 @@ async def update_channel_by_id(
 
     try:
         channel = Channels.update_channel_by_id(id, form_data)
+        await invalidate_channel_membership()
         return ChannelModel(**channel.model_dump())
     except Exception as e:
         log.exception(e)
@@ -126,6 +132,7 @@ async def delete_channel_by_id(id: str, user=Depends(get_admin_user)):
 
     try:
         Channels.delete_channel_by_id(id)
+        await invalidate_channel_membership()
         return True
     except Exception as e:
         log.exception(e)
@@ -299,7 +306,7 @@ async def post_new_message(
                         to=f"channel:{channel.id}",
                     )
 
-            active_user_ids = get_user_ids_from_room(f"channel:{channel.id}")
+            active_user_ids = await get_user_ids_from_room(f"channel:{channel.id}")
 
             background_tasks.add_task(
                 send_notification,
@@ -522,8 +529,8 @@ async def add_reaction_to_message(
 
     try:
         Messages.add_reaction_to_message(message_id, user.id, form_data.name)
-        message = Messages.get_message_by_id(message_id)
 
+        # Only the reactions changed, so only they are sent
         await sio.emit(
             "channel-events",
             {
@@ -532,15 +539,17 @@ async def add_reaction_to_message(
                 "data": {
                     "type": "message:reaction:add",
                     "data": {
-                        **message.model_dump(),
-                        "user": UserNameResponse(
-                            **Users.get_user_by_id(message.user_id).model_dump()
-                        ).model_dump(),
+                        "id": message.id,
                         "name": form_data.name,
+                        "reactions": [
+                            reaction.model_dump()
+                            for reaction in Messages.get_reactions_by_message_id(
+                                message.id
+                            )
+                        ],
                     },
                 },
                 "user": UserNameResponse(**user.model_dump()).model_dump(),
-                "channel": channel.model_dump(),
             },
             to=f"channel:{channel.id}",
         )
@@ -591,8 +600,7 @@ async def remove_reaction_by_id_and_user_id_and_name(
             message_id, user.id, form_data.name
         )
 
-        message = Messages.get_message_by_id(message_id)
-
+        # Only the reactions changed, so only they are sent
         await sio.emit(
             "channel-events",
             {
@@ -601,15 +609,17 @@ async def remove_reaction_by_id_and_user_id_and_name(
                 "data": {
                     "type": "message:reaction:remove",
                     "data": {
-                        **message.model_dump(),
-                        "user": UserNameResponse(
-                            **Users.get_user_by_id(message.user_id).model_dump()
-                        ).model_dump(),
+                        "id": message.id,
                         "name": form_data.name,
+                        "reactions": [
+                            reaction.model_dump()
+                            for reaction in Messages.get_reactions_by_message_id(
+                                message.id
+                            )
+                        ],
                     },
                 },
                 "user": UserNameResponse(**user.model_dump()).model_dump(),
-                "channel": channel.model_dump(),
             },
             to=f"channel:{channel.id}",
         )
@@ -1,12 +1,15 @@
 import logging
 import os
+import time
 import uuid
+from email.utils import formatdate, parsedate_to_datetime
 from pathlib import Path
 from typing import Optional
 from urllib.parse import quote
 
 from fastapi import (
     APIRouter,
+    BackgroundTasks,
     Depends,
     File,
     HTTPException,
@@ -15,7 +18,16 @@ from fastapi import (
     status,
     Query,
 )
-from fastapi.responses import FileResponse, StreamingResponse
+from fastapi.responses import (
+    FileResponse,
+    RedirectResponse,
+    Response,
+    StreamingResponse,
+)
+from open_webui.config import (
+    ENABLE_STORAGE_PRESIGNED_URLS,
+    STORAGE_PRESIGNED_URL_EXPIRY,
+)
 from open_webui.constants import ERROR_MESSAGES
 from open_webui.env import SRC_LOG_LEVELS
 from open_webui.models.files import (
@@ -28,9 +40,13 @@ from open_webui.models.knowledge import Knowledges
 
 from open_webui.routers.knowledge import get_knowledge, get_knowledge_list
 from open_webui.routers.retrieval import ProcessFileForm, process_file
-from open_webui.routers.audio import transcribe
+from open_webui.routers.audio import transcribe_segments
 from open_webui.storage.provider import Storage
 from open_webui.utils.auth import get_admin_user, get_verified_user
+from open_webui.utils.images.variants import (
+    get_file_storage_paths,
+    select_image_variant,
+)
 from pydantic import BaseModel
 
 log = logging.getLogger(__name__)
@@ -76,6 +92,83 @@ def has_access_to_file(
 # Upload File
 ############################
 
+# How often the partial transcript of an audio upload is saved, in seconds
+TRANSCRIPT_SAVE_INTERVAL = 5
+
+
+def process_audio_file(
+    request: Request, id: str, file_path: str, user, sha256: Optional[str] = None
+):
+    """
+    Transcribes an uploaded recording after the upload has returned. The
+    file's `data.status` is "pending" until the transcript is indexed, and
+    `data.content` holds the transcript so far. Knowledge bases the file was
+    added to in the meantime are indexed once the transcript is complete.
+    """
+    try:
+        file_path = Storage.get_file(file_path)
+
+        transcript = ""
+        saved_at = time.monotonic()
+        for segment in transcribe_segments(request, file_path, sha256):
+            transcript += segment["text"]
+            if time.monotonic() - saved_at > TRANSCRIPT_SAVE_INTERVAL:
+                Files.update_file_data_by_id(id, {"content": transcript.strip()})
+                saved_at = time.monotonic()
+
+        process_file(
+            request,
+            ProcessFileForm(file_id=id, content=transcript.strip()),
+            user=user,
+        )
+        Files.update_file_data_by_id(id, {"status": "completed"})
+
+        for knowledge in Knowledges.get_knowledge_bases_by_file_id(id):
+            process_file(
+                request,
+                ProcessFileForm(file_id=id, collection_name=knowledge.id),
+                user=user,
+            )
+    except Exception as e:
+        log.exception(e)
+        log.error(f"Error transcribing file: {id}")
+        Files.update_file_data_by_id(
+            id,
+            {
+                "status": "failed",
+                "error": str(e.detail) if hasattr(e, "detail") else str(e),
+            },
+        )
+
+
+def insert_file(
+    user,
+    id: str,
+    name: str,
+    content_type: str,
+    file_path: str,
+    upload: dict,
+    file_metadata: dict = {},
+) -> Optional[FileModel]:
+    """Adds the record of a file just uploaded to storage."""
+    return Files.insert_new_file(
+        user.id,
+        FileForm(
+            **{
+                "id": id,
+                "filename": name,
+                "path": file_path,
+                "meta": {
+                    "name": name,
+                    "content_type": content_type,
+                    "size": upload["size"],
+                    "sha256": upload["sha256"],
+                    "data": file_metadata,
+                },
+            }
+        ),
+    )
+
 
 @router.post("/", response_model=FileModelResponse)
 def upload_file(
@@ -84,6 +177,7 @@ def upload_file(
     user=Depends(get_verified_user),
     file_metadata: dict = {},
     process: bool = Query(True),
+    background_tasks: BackgroundTasks = None,
 ):
     log.info(f"file.content_type: {file.content_type}")
     try:
@@ -94,23 +188,15 @@ def upload_file(
         id = str(uuid.uuid4())
         name = filename
         filename = f"{id}_{filename}"
-        contents, file_path = Storage.upload_file(file.file, filename)
-
-        file_item = Files.insert_new_file(
-            user.id,
-            FileForm(
-                **{
-                    "id": id,
-                    "filename": name,
-                    "path": file_path,
-                    "meta": {
-                        "name": name,
-                        "content_type": file.content_type,
-                        "size": len(contents),
-                        "data": file_metadata,
-                    },
-                }
-            ),
+        max_size = request.app.state.config.FILE_MAX_SIZE
+        upload, file_path = Storage.upload_file(
+            file.file,
+            filename,
+            max_size=max_size * 1024 * 1024 if max_size else None,
+        )
+
+        file_item = insert_file(
+            user, id, name, file.content_type, file_path, upload, file_metadata
         )
         if process:
             try:
@@ -120,14 +206,21 @@ def upload_file(
                     "audio/ogg",
                     "audio/x-m4a",
                 ]:
-                    file_path = Storage.get_file(file_path)
-                    result = transcribe(request, file_path)
-
-                    process_file(
-                        request,
-                        ProcessFileForm(file_id=id, content=result.get("text", "")),
-                        user=user,
-                    )
+                    # Long recordings take minutes to transcribe
+                    Files.update_file_data_by_id(id, {"status": "pending"})
+                    if background_tasks is not None:
+                        background_tasks.add_task(
+                            process_audio_file,
+                            request,
+                            id,
+                            file_path,
+                            user,
+                            upload["sha256"],
+                        )
+                    else:
+                        process_audio_file(
+                            request, id, file_path, user, upload["sha256"]
+                        )
                 elif file.content_type not in ["image/png", "image/jpeg", "image/gif"]:
                     process_file(request, ProcessFileForm(file_id=id), user=user)
 
@@ -187,7 +280,7 @@ async def delete_all_files(user=Depends(get_admin_user)):
     result = Files.delete_all_files()
     if result:
         try:
-            Storage.delete_all_files()
+            await Storage.delete_all_files_async()
         except Exception as e:
             log.exception(e)
             log.error("Error deleting files")
@@ -309,9 +402,46 @@ async def update_file_data_content_by_id(
 ############################
 
 
+def get_file_validators(file: FileModel, variant: Optional[dict] = None) -> dict:
+    """
+    ETag and Last-Modified of the file content, or of one of its image
+    variants. They do not depend on the local copy, which may be downloaded
+    again or served from a cache.
+    """
+    sha256 = (variant or file.meta or {}).get("sha256")
+    updated_at = file.updated_at or file.created_at or 0
+
+    return {
+        "ETag": f'"{sha256}"' if sha256 else f'"{file.id}-{updated_at}"',
+        "Last-Modified": formatdate(updated_at, usegmt=True),
+    }
+
+
+def is_not_modified(request: Request, validators: dict) -> bool:
+    if_none_match = request.headers.get("If-None-Match")
+    if if_none_match is not None:
+        etags = [etag.strip().removeprefix("W/") for etag in if_none_match.split(",")]
+        return "*" in etags or validators["ETag"] in etags
+
+    if_modified_since = request.headers.get("If-Modified-Since")
+    if if_modified_since is not None:
+        try:
+            return parsedate_to_datetime(if_modified_since) >= parsedate_to_datetime(
+                validators["Last-Modified"]
+            )
+        except (TypeError, ValueError):
+            return False
+
+    return False
+
+
 @router.get("/{id}/content")
 async def get_file_content_by_id(
-    id: str, user=Depends(get_verified_user), attachment: bool = Query(False)
+    request: Request,
+    id: str,
+    user=Depends(get_verified_user),
+    attachment: bool = Query(False),
+    width: Optional[int] = Query(None),
 ):
     file = Files.get_file_by_id(id)
 
@@ -326,38 +456,69 @@ async def get_file_content_by_id(
         or user.role == "admin"
         or has_access_to_file(id, "read", user)
     ):
+        # Generated images are served as the smallest variant the client takes
+        variant = None
+        if not attachment:
+            variant = select_image_variant(
+                file, request.headers.get("Accept", ""), width
+            )
+
+        # Revalidated on every use, as the content is only available to some users
+        headers = {
+            **get_file_validators(file, variant),
+            "Cache-Control": "private, no-cache",
+        }
+        if file.meta.get("image"):
+            headers["Vary"] = "Accept"
+        if is_not_modified(request, headers):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+        # Handle Unicode filenames
+        content_type = file.meta.get("content_type")
+        filename = file.meta.get("name", file.filename)
+        file_path = file.path
+        if variant:
+            content_type = variant["content_type"]
+            filename = f"{Path(filename).stem}.{content_type.split('/')[-1]}"
+            file_path = variant["path"]
+        encoded_filename = quote(filename)  # RFC5987 encoding
+
+        if attachment:
+            headers["Content-Disposition"] = (
+                f"attachment; filename*=UTF-8''{encoded_filename}"
+            )
+        else:
+            if content_type == "application/pdf" or filename.lower().endswith(".pdf"):
+                headers["Content-Disposition"] = (
+                    f"inline; filename*=UTF-8''{encoded_filename}"
+                )
+                content_type = "application/pdf"
+            elif content_type != "text/plain":
+                headers["Content-Disposition"] = (
+                    f"attachment; filename*=UTF-8''{encoded_filename}"
+                )
+
         try:
-            file_path = Storage.get_file(file.path)
+            if ENABLE_STORAGE_PRESIGNED_URLS:
+                url = Storage.get_presigned_url(
+                    file_path,
+                    STORAGE_PRESIGNED_URL_EXPIRY,
+                    content_type=content_type,
+                    content_disposition=headers.get("Content-Disposition"),
+                )
+                if url:
+                    return RedirectResponse(
+                        url,
+                        status_code=status.HTTP_307_TEMPORARY_REDIRECT,
+                        headers={"Cache-Control": "no-store"},
+                    )
+
+            file_path = await Storage.get_file_async(file_path)
             file_path = Path(file_path)
 
             # Check if the file already exists in the cache
             if file_path.is_file():
-                # Handle Unicode filenames
-                filename = file.meta.get("name", file.filename)
-                encoded_filename = quote(filename)  # RFC5987 encoding
-
-                content_type = file.meta.get("content_type")
-                filename = file.meta.get("name", file.filename)
-                encoded_filename = quote(filename)
-                headers = {}
-
-                if attachment:
-                    headers["Content-Disposition"] = (
-                        f"attachment; filename*=UTF-8''{encoded_filename}"
-                    )
-                else:
-                    if content_type == "application/pdf" or filename.lower().endswith(
-                        ".pdf"
-                    ):
-                        headers["Content-Disposition"] = (
-                            f"inline; filename*=UTF-8''{encoded_filename}"
-                        )
-                        content_type = "application/pdf"
-                    elif content_type != "text/plain":
-                        headers["Content-Disposition"] = (
-                            f"attachment; filename*=UTF-8''{encoded_filename}"
-                        )
-
+                # Answers Range and If-Range requests with partial content
                 return FileResponse(file_path, headers=headers, media_type=content_type)
 
             else:
@@ -395,7 +556,7 @@ async def get_html_file_content_by_id(id: str, user=Depends(get_verified_user)):
         or has_access_to_file(id, "read", user)
     ):
         try:
-            file_path = Storage.get_file(file.path)
+            file_path = await Storage.get_file_async(file.path)
             file_path = Path(file_path)
 
             # Check if the file already exists in the cache
@@ -446,7 +607,7 @@ async def get_file_content_by_id(id: str, user=Depends(get_verified_user)):
         }
 
         if file_path:
-            file_path = Storage.get_file(file_path)
+            file_path = await Storage.get_file_async(file_path)
             file_path = Path(file_path)
 
             # Check if the file already exists in the cache
@@ -503,7 +664,7 @@ async def delete_file_by_id(id: str, user=Depends(get_verified_user)):
         result = Files.delete_file_by_id(id)
         if result:
             try:
-                Storage.delete_file(file.path)
+                await Storage.delete_files_async(get_file_storage_paths(file))
             except Exception as e:
                 log.exception(e)
                 log.error("Error deleting files")
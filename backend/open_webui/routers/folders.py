@@ -25,7 +25,7 @@ from fastapi.responses import FileResponse, StreamingResponse
 
 
 from open_webui.utils.auth import get_admin_user, get_verified_user
-from open_webui.utils.access_control import has_permission
+from open_webui.utils.access_control import get_auth_context
 
 
 log = logging.getLogger(__name__)
@@ -233,8 +233,8 @@ async def update_folder_is_expanded_by_id(
 async def delete_folder_by_id(
     request: Request, id: str, user=Depends(get_verified_user)
 ):
-    chat_delete_permission = has_permission(
-        user.id, "chat.delete", request.app.state.config.USER_PERMISSIONS
+    chat_delete_permission = get_auth_context(request, user).has_permission(
+        "chat.delete", request.app.state.config.USER_PERMISSIONS
     )
 
     if user.role != "admin" and not chat_delete_permission:
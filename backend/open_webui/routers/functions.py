@@ -13,7 +13,11 @@ from open_webui.utils.plugin import load_function_module_by_id, replace_imports
 from open_webui.config import CACHE_DIR
 from open_webui.constants import ERROR_MESSAGES
 from fastapi import APIRouter, Depends, HTTPException, Request, status
-from open_webui.utils.auth import get_admin_user, get_verified_user
+from open_webui.utils.auth import (
+    get_admin_user,
+    get_verified_user,
+    invalidate_user_cache,
+)
 from open_webui.env import SRC_LOG_LEVELS
 
 log = logging.getLogger(__name__)
@@ -392,6 +396,7 @@ async def update_function_user_valves_by_id(
                 Functions.update_user_valves_by_id_and_user_id(
                     id, user.id, user_valves.model_dump()
                 )
+                await invalidate_user_cache(user.id)
                 return user_valves.model_dump()
             except Exception as e:
                 log.exception(f"Error updating function user valves by id {id}: {e}")
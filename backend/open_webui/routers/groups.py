@@ -11,6 +11,7 @@ from open_webui.models.groups import (
     GroupResponse,
 )
 
+from open_webui.socket.main import invalidate_channel_membership
 from open_webui.config import CACHE_DIR
 from open_webui.constants import ERROR_MESSAGES
 from fastapi import APIRouter, Depends, HTTPException, Request, status
@@ -91,8 +92,17 @@ async def update_group_by_id(
         if form_data.user_ids:
             form_data.user_ids = Users.get_valid_user_ids(form_data.user_ids)
 
+        previous_group = Groups.get_group_by_id(id)
+
         group = Groups.update_group_by_id(id, form_data)
         if group:
+            # Channel access granted through the group may have changed
+            await invalidate_channel_membership(
+                list(
+                    set(previous_group.user_ids if previous_group else [])
+                    | set(group.user_ids)
+                )
+            )
             return group
         else:
             raise HTTPException(
@@ -115,8 +125,12 @@ async def update_group_by_id(
 @router.delete("/id/{id}/delete", response_model=bool)
 async def delete_group_by_id(id: str, user=Depends(get_admin_user)):
     try:
+        group = Groups.get_group_by_id(id)
+
         result = Groups.delete_group_by_id(id)
         if result:
+            if group:
+                await invalidate_channel_membership(group.user_ids)
             return result
         else:
             raise HTTPException(
@@ -5,6 +5,7 @@ import json
 import logging
 import mimetypes
 import re
+import uuid
 from pathlib import Path
 from typing import Optional
 
@@ -13,13 +14,17 @@ from fastapi import APIRouter, Depends, HTTPException, Request, UploadFile
 from open_webui.config import CACHE_DIR
 from open_webui.constants import ERROR_MESSAGES
 from open_webui.env import ENABLE_FORWARD_USER_INFO_HEADERS, SRC_LOG_LEVELS
-from open_webui.routers.files import upload_file
+from open_webui.routers.files import insert_file
+from open_webui.storage.provider import Storage
 from open_webui.utils.auth import get_admin_user, get_verified_user
+from open_webui.utils.images.client import ResponseReader, get_session
 from open_webui.utils.images.comfyui import (
     ComfyUIGenerateImageForm,
     ComfyUIWorkflow,
     comfyui_generate_image,
+    get_comfyui_client,
 )
+from open_webui.utils.images.variants import schedule_image_variants
 from pydantic import BaseModel
 
 log = logging.getLogger(__name__)
@@ -191,33 +196,36 @@ def get_automatic1111_api_auth(request: Request):
         return f"Basic {auth1111_base64_encoded_string}"
 
 
+async def automatic1111_request(request: Request, method: str, path: str, **kwargs):
+    async with get_session().request(
+        method,
+        f"{request.app.state.config.AUTOMATIC1111_BASE_URL}{path}",
+        headers={"authorization": get_automatic1111_api_auth(request)},
+        **kwargs,
+    ) as r:
+        r.raise_for_status()
+        return await r.json(content_type=None)
+
+
+async def get_comfyui(request: Request):
+    return await get_comfyui_client(
+        request.app.state.config.COMFYUI_BASE_URL,
+        request.app.state.config.COMFYUI_API_KEY,
+    )
+
+
 @router.get("/config/url/verify")
 async def verify_url(request: Request, user=Depends(get_admin_user)):
     if request.app.state.config.IMAGE_GENERATION_ENGINE == "automatic1111":
         try:
-            r = requests.get(
-                url=f"{request.app.state.config.AUTOMATIC1111_BASE_URL}/sdapi/v1/options",
-                headers={"authorization": get_automatic1111_api_auth(request)},
-            )
-            r.raise_for_status()
+            await automatic1111_request(request, "GET", "/sdapi/v1/options")
             return True
         except Exception:
             request.app.state.config.ENABLE_IMAGE_GENERATION = False
             raise HTTPException(status_code=400, detail=ERROR_MESSAGES.INVALID_URL)
     elif request.app.state.config.IMAGE_GENERATION_ENGINE == "comfyui":
-
-        headers = None
-        if request.app.state.config.COMFYUI_API_KEY:
-            headers = {
-                "Authorization": f"Bearer {request.app.state.config.COMFYUI_API_KEY}"
-            }
-
         try:
-            r = requests.get(
-                url=f"{request.app.state.config.COMFYUI_BASE_URL}/object_info",
-                headers=headers,
-            )
-            r.raise_for_status()
+            await (await get_comfyui(request)).get_object_info()
             return True
         except Exception:
             request.app.state.config.ENABLE_IMAGE_GENERATION = False
@@ -226,27 +234,20 @@ async def verify_url(request: Request, user=Depends(get_admin_user)):
         return True
 
 
-def set_image_model(request: Request, model: str):
+async def set_image_model(request: Request, model: str):
     log.info(f"Setting image model to {model}")
     request.app.state.config.IMAGE_GENERATION_MODEL = model
     if request.app.state.config.IMAGE_GENERATION_ENGINE in ["", "automatic1111"]:
-        api_auth = get_automatic1111_api_auth(request)
-        r = requests.get(
-            url=f"{request.app.state.config.AUTOMATIC1111_BASE_URL}/sdapi/v1/options",
-            headers={"authorization": api_auth},
-        )
-        options = r.json()
+        options = await automatic1111_request(request, "GET", "/sdapi/v1/options")
         if model != options["sd_model_checkpoint"]:
             options["sd_model_checkpoint"] = model
-            r = requests.post(
-                url=f"{request.app.state.config.AUTOMATIC1111_BASE_URL}/sdapi/v1/options",
-                json=options,
-                headers={"authorization": api_auth},
+            await automatic1111_request(
+                request, "POST", "/sdapi/v1/options", json=options
             )
     return request.app.state.config.IMAGE_GENERATION_MODEL
 
 
-def get_image_model(request):
+async def get_image_model(request):
     if request.app.state.config.IMAGE_GENERATION_ENGINE == "openai":
         return (
             request.app.state.config.IMAGE_GENERATION_MODEL
@@ -270,11 +271,7 @@ def get_image_model(request):
         or request.app.state.config.IMAGE_GENERATION_ENGINE == ""
     ):
         try:
-            r = requests.get(
-                url=f"{request.app.state.config.AUTOMATIC1111_BASE_URL}/sdapi/v1/options",
-                headers={"authorization": get_automatic1111_api_auth(request)},
-            )
-            options = r.json()
+            options = await automatic1111_request(request, "GET", "/sdapi/v1/options")
             return options["sd_model_checkpoint"]
         except Exception as e:
             request.app.state.config.ENABLE_IMAGE_GENERATION = False
@@ -300,7 +297,7 @@ async def get_image_config(request: Request, user=Depends(get_admin_user)):
 async def update_image_config(
     request: Request, form_data: ImageConfigForm, user=Depends(get_admin_user)
 ):
-    set_image_model(request, form_data.MODEL)
+    await set_image_model(request, form_data.MODEL)
 
     pattern = r"^\d+x\d+$"
     if re.match(pattern, form_data.IMAGE_SIZE):
@@ -327,7 +324,7 @@ async def update_image_config(
 
 
 @router.get("/models")
-def get_models(request: Request, user=Depends(get_verified_user)):
+async def get_models(request: Request, user=Depends(get_verified_user)):
     try:
         if request.app.state.config.IMAGE_GENERATION_ENGINE == "openai":
             return [
@@ -340,14 +337,7 @@ def get_models(request: Request, user=Depends(get_verified_user)):
             ]
         elif request.app.state.config.IMAGE_GENERATION_ENGINE == "comfyui":
             # TODO - get models from comfyui
-            headers = {
-                "Authorization": f"Bearer {request.app.state.config.COMFYUI_API_KEY}"
-            }
-            r = requests.get(
-                url=f"{request.app.state.config.COMFYUI_BASE_URL}/object_info",
-                headers=headers,
-            )
-            info = r.json()
+            info = await (await get_comfyui(request)).get_object_info()
 
             workflow = json.loads(request.app.state.config.COMFYUI_WORKFLOW)
             model_node_id = None
@@ -391,11 +381,7 @@ def get_models(request: Request, user=Depends(get_verified_user)):
             request.app.state.config.IMAGE_GENERATION_ENGINE == "automatic1111"
             or request.app.state.config.IMAGE_GENERATION_ENGINE == ""
         ):
-            r = requests.get(
-                url=f"{request.app.state.config.AUTOMATIC1111_BASE_URL}/sdapi/v1/sd-models",
-                headers={"authorization": get_automatic1111_api_auth(request)},
-            )
-            models = r.json()
+            models = await automatic1111_request(request, "GET", "/sdapi/v1/sd-models")
             return list(
                 map(
                     lambda model: {"id": model["title"], "name": model["model_name"]},
@@ -430,40 +416,44 @@ def load_b64_image_data(b64_str):
         return None
 
 
-def load_url_image_data(url, headers=None):
-    try:
-        if headers:
-            r = requests.get(url, headers=headers)
-        else:
-            r = requests.get(url)
-
-        r.raise_for_status()
-        if r.headers["content-type"].split("/")[0] == "image":
-            mime_type = r.headers["content-type"]
-            return r.content, mime_type
-        else:
-            log.error("Url does not point to an image.")
-            return None
-
-    except Exception as e:
-        log.exception(f"Error saving image: {e}")
-        return None
+async def upload_image(request, image_metadata, image_data, content_type, user):
+    """
+    Stores a generated image, given as bytes or as a file object, e.g. the
+    body of a response still being received, which is read off the event loop.
+    """
+    content_type = content_type.split(";")[0]
+    image_format = mimetypes.guess_extension(content_type)
 
+    id = str(uuid.uuid4())
+    name = f"generated-image{image_format}"
+    max_size = request.app.state.config.FILE_MAX_SIZE
+    upload, file_path = await Storage.upload_file_async(
+        io.BytesIO(image_data) if isinstance(image_data, bytes) else image_data,
+        f"{id}_{name}",
+        max_size=max_size * 1024 * 1024 if max_size else None,
+    )
 
-def upload_image(request, image_metadata, image_data, content_type, user):
-    image_format = mimetypes.guess_extension(content_type)
-    file = UploadFile(
-        file=io.BytesIO(image_data),
-        filename=f"generated-image{image_format}",  # will be converted to a unique ID on upload_file
-        headers={
-            "content-type": content_type,
-        },
+    file_item = insert_file(
+        user, id, name, content_type, file_path, upload, image_metadata
     )
-    file_item = upload_file(request, file, user, file_metadata=image_metadata)
+    schedule_image_variants(file_item)
     url = request.app.url_path_for("get_file_content_by_id", id=file_item.id)
     return url
 
 
+async def upload_url_image(request, url, image_metadata, user, headers=None):
+    """Streams the image at `url` into storage."""
+    async with get_session().get(url, headers=headers) as r:
+        r.raise_for_status()
+        content_type = r.headers.get("content-type", "")
+        if content_type.split("/")[0] != "image":
+            raise Exception("Url does not point to an image.")
+
+        return await upload_image(
+            request, image_metadata, ResponseReader(r), content_type, user
+        )
+
+
 @router.post("/generations")
 async def image_generations(
     request: Request,
@@ -514,24 +504,24 @@ async def image_generations(
             r.raise_for_status()
             res = r.json()
 
-            images = []
-
-            for image in res["data"]:
+            async def upload(image):
                 if image_url := image.get("url", None):
-                    image_data, content_type = load_url_image_data(image_url, headers)
-                else:
-                    image_data, content_type = load_b64_image_data(image["b64_json"])
+                    return await upload_url_image(
+                        request, image_url, data, user, headers
+                    )
+
+                image_data, content_type = load_b64_image_data(image["b64_json"])
+                return await upload_image(request, data, image_data, content_type, user)
 
-                url = upload_image(request, data, image_data, content_type, user)
-                images.append({"url": url})
-            return images
+            urls = await asyncio.gather(*[upload(image) for image in res["data"]])
+            return [{"url": url} for url in urls]
 
         elif request.app.state.config.IMAGE_GENERATION_ENGINE == "gemini":
             headers = {}
             headers["Content-Type"] = "application/json"
             headers["x-goog-api-key"] = request.app.state.config.IMAGES_GEMINI_API_KEY
 
-            model = get_image_model(request)
+            model = await get_image_model(request)
             data = {
                 "instances": {"prompt": form_data.prompt},
                 "parameters": {
@@ -551,15 +541,18 @@ async def image_generations(
             r.raise_for_status()
             res = r.json()
 
-            images = []
-            for image in res["predictions"]:
-                image_data, content_type = load_b64_image_data(
-                    image["bytesBase64Encoded"]
-                )
-                url = upload_image(request, data, image_data, content_type, user)
-                images.append({"url": url})
-
-            return images
+            urls = await asyncio.gather(
+                *[
+                    upload_image(
+                        request,
+                        data,
+                        *load_b64_image_data(image["bytesBase64Encoded"]),
+                        user,
+                    )
+                    for image in res["predictions"]
+                ]
+            )
+            return [{"url": url} for url in urls]
 
         elif request.app.state.config.IMAGE_GENERATION_ENGINE == "comfyui":
             data = {
@@ -589,37 +582,37 @@ async def image_generations(
             res = await comfyui_generate_image(
                 request.app.state.config.IMAGE_GENERATION_MODEL,
                 form_data,
-                user.id,
                 request.app.state.config.COMFYUI_BASE_URL,
                 request.app.state.config.COMFYUI_API_KEY,
             )
             log.debug(f"res: {res}")
 
-            images = []
-
-            for image in res["data"]:
-                headers = None
-                if request.app.state.config.COMFYUI_API_KEY:
-                    headers = {
-                        "Authorization": f"Bearer {request.app.state.config.COMFYUI_API_KEY}"
-                    }
-
-                image_data, content_type = load_url_image_data(image["url"], headers)
-                url = upload_image(
-                    request,
-                    form_data.model_dump(exclude_none=True),
-                    image_data,
-                    content_type,
-                    user,
-                )
-                images.append({"url": url})
-            return images
+            headers = None
+            if request.app.state.config.COMFYUI_API_KEY:
+                headers = {
+                    "Authorization": f"Bearer {request.app.state.config.COMFYUI_API_KEY}"
+                }
+
+            # Each image is streamed into storage as it is downloaded
+            urls = await asyncio.gather(
+                *[
+                    upload_url_image(
+                        request,
+                        image["url"],
+                        form_data.model_dump(exclude_none=True),
+                        user,
+                        headers,
+                    )
+                    for image in res["data"]
+                ]
+            )
+            return [{"url": url} for url in urls]
         elif (
             request.app.state.config.IMAGE_GENERATION_ENGINE == "automatic1111"
             or request.app.state.config.IMAGE_GENERATION_ENGINE == ""
         ):
             if form_data.model:
-                set_image_model(form_data.model)
+                await set_image_model(request, form_data.model)
 
             data = {
                 "prompt": form_data.prompt,
@@ -643,30 +636,23 @@ async def image_generations(
             if request.app.state.config.AUTOMATIC1111_SCHEDULER:
                 data["scheduler"] = request.app.state.config.AUTOMATIC1111_SCHEDULER
 
-            # Use asyncio.to_thread for the requests.post call
-            r = await asyncio.to_thread(
-                requests.post,
-                url=f"{request.app.state.config.AUTOMATIC1111_BASE_URL}/sdapi/v1/txt2img",
-                json=data,
-                headers={"authorization": get_automatic1111_api_auth(request)},
+            res = await automatic1111_request(
+                request, "POST", "/sdapi/v1/txt2img", json=data
             )
-
-            res = r.json()
             log.debug(f"res: {res}")
 
-            images = []
-
-            for image in res["images"]:
-                image_data, content_type = load_b64_image_data(image)
-                url = upload_image(
-                    request,
-                    {**data, "info": res["info"]},
-                    image_data,
-                    content_type,
-                    user,
-                )
-                images.append({"url": url})
-            return images
+            urls = await asyncio.gather(
+                *[
+                    upload_image(
+                        request,
+                        {**data, "info": res["info"]},
+                        *load_b64_image_data(image),
+                        user,
+                    )
+                    for image in res["images"]
+                ]
+            )
+            return [{"url": url} for url in urls]
     except Exception as e:
         error = e
         if r != None:
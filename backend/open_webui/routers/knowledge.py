@@ -21,7 +21,8 @@ from open_webui.storage.provider import Storage
 
 from open_webui.constants import ERROR_MESSAGES
 from open_webui.utils.auth import get_verified_user
-from open_webui.utils.access_control import has_access, has_permission
+from open_webui.utils.images.variants import get_file_storage_paths
+from open_webui.utils.access_control import has_access, get_auth_context
 
 
 from open_webui.env import SRC_LOG_LEVELS
@@ -142,8 +143,8 @@ async def get_knowledge_list(user=Depends(get_verified_user)):
 async def create_new_knowledge(
     request: Request, form_data: KnowledgeForm, user=Depends(get_verified_user)
 ):
-    if user.role != "admin" and not has_permission(
-        user.id, "workspace.knowledge", request.app.state.config.USER_PERMISSIONS
+    if user.role != "admin" and not get_auth_context(request, user).has_permission(
+        "workspace.knowledge", request.app.state.config.USER_PERMISSIONS
     ):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -285,21 +286,27 @@ def add_file_to_knowledge_by_id(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=ERROR_MESSAGES.FILE_NOT_PROCESSED,
         )
-
-    # Add content to the vector database
-    try:
-        process_file(
-            request,
-            ProcessFileForm(file_id=form_data.file_id, collection_name=id),
-            user=user,
-        )
-    except Exception as e:
-        log.debug(e)
+    if file.data.get("status") == "failed":
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail=str(e),
+            detail=file.data.get("error", ERROR_MESSAGES.FILE_NOT_PROCESSED),
         )
 
+    # Audio uploads are added to the vector database once transcribed
+    if file.data.get("status") != "pending":
+        try:
+            process_file(
+                request,
+                ProcessFileForm(file_id=form_data.file_id, collection_name=id),
+                user=user,
+            )
+        except Exception as e:
+            log.debug(e)
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(e),
+            )
+
     if knowledge:
         data = knowledge.data or {}
         file_ids = data.get("file_ids", [])
@@ -310,6 +317,16 @@ def add_file_to_knowledge_by_id(
 
             knowledge = Knowledges.update_knowledge_data_by_id(id=id, data=data)
 
+            # The transcript may have completed before the file was listed here
+            if file.data.get("status") == "pending":
+                file = Files.get_file_by_id(form_data.file_id)
+                if file and file.data.get("status") == "completed":
+                    process_file(
+                        request,
+                        ProcessFileForm(file_id=form_data.file_id, collection_name=id),
+                        user=user,
+                    )
+
             if knowledge:
                 files = Files.get_files_by_ids(file_ids)
 
@@ -456,8 +473,13 @@ def remove_file_from_knowledge_by_id(
         log.debug(e)
         pass
 
-    # Delete file from database
-    Files.delete_file_by_id(form_data.file_id)
+    # Delete file from database and storage
+    if Files.delete_file_by_id(form_data.file_id):
+        try:
+            Storage.delete_files(get_file_storage_paths(file))
+        except Exception as e:
+            log.exception(e)
+            log.error("Error deleting files")
 
     if knowledge:
         data = knowledge.data or {}
@@ -46,6 +46,7 @@ from open_webui.utils.payload import (
 )
 from open_webui.utils.auth import get_admin_user, get_verified_user
 from open_webui.utils.access_control import has_access
+from open_webui.utils.proxy import UpstreamStreamingResponse
 
 
 from open_webui.config import (
@@ -116,6 +117,7 @@ async def send_post_request(
     key: Optional[str] = None,
     content_type: Optional[str] = None,
     user: UserModel = None,
+    passthrough: bool = False,
 ):
 
     r = None
@@ -150,6 +152,12 @@ async def send_post_request(
             if content_type:
                 response_headers["Content-Type"] = content_type
 
+            if passthrough:
+                # Nothing downstream inspects the stream, forward upstream chunks as-is
+                return UpstreamStreamingResponse(
+                    r, session=session, headers=response_headers
+                )
+
             return StreamingResponse(
                 r.content,
                 status_code=r.status,
@@ -581,6 +589,7 @@ async def pull_model(
         payload=json.dumps(payload),
         key=get_api_key(url_idx, url, request.app.state.config.OLLAMA_API_CONFIGS),
         user=user,
+        passthrough=True,
     )
 
 
@@ -618,6 +627,7 @@ async def push_model(
         payload=form_data.model_dump_json(exclude_none=True).encode(),
         key=get_api_key(url_idx, url, request.app.state.config.OLLAMA_API_CONFIGS),
         user=user,
+        passthrough=True,
     )
 
 
@@ -645,6 +655,7 @@ async def create_model(
         payload=form_data.model_dump_json(exclude_none=True).encode(),
         key=get_api_key(url_idx, url, request.app.state.config.OLLAMA_API_CONFIGS),
         user=user,
+        passthrough=True,
     )
 
 
@@ -1056,6 +1067,7 @@ async def generate_completion(
         payload=form_data.model_dump_json(exclude_none=True).encode(),
         key=get_api_key(url_idx, url, request.app.state.config.OLLAMA_API_CONFIGS),
         user=user,
+        passthrough=True,
     )
 
 
@@ -1289,6 +1301,7 @@ async def generate_openai_completion(
         stream=payload.get("stream", False),
         key=get_api_key(url_idx, url, request.app.state.config.OLLAMA_API_CONFIGS),
         user=user,
+        passthrough=True,
     )
 
 
@@ -1368,6 +1381,7 @@ async def generate_openai_chat_completion(
         stream=payload.get("stream", False),
         key=get_api_key(url_idx, url, request.app.state.config.OLLAMA_API_CONFIGS),
         user=user,
+        passthrough=True,
     )
 
 
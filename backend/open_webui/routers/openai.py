@@ -42,6 +42,8 @@ from open_webui.utils.misc import (
 
 from open_webui.utils.auth import get_admin_user, get_verified_user
 from open_webui.utils.access_control import has_access
+from open_webui.utils.proxy import UpstreamStreamingResponse
+from open_webui.routers.audio import SPEECH_CACHE
 
 
 log = logging.getLogger(__name__)
@@ -195,15 +197,14 @@ async def speech(request: Request, user=Depends(get_verified_user)):
         body = await request.body()
         name = hashlib.sha256(body).hexdigest()
 
-        SPEECH_CACHE_DIR = CACHE_DIR / "audio" / "speech"
-        SPEECH_CACHE_DIR.mkdir(parents=True, exist_ok=True)
-        file_path = SPEECH_CACHE_DIR.joinpath(f"{name}.mp3")
-        file_body_path = SPEECH_CACHE_DIR.joinpath(f"{name}.json")
-
         # Check if the file already exists in the cache
-        if file_path.is_file():
+        file_path = SPEECH_CACHE.get(name, ".mp3")
+        if file_path:
             return FileResponse(file_path)
 
+        file_path = SPEECH_CACHE.path(name, ".mp3")
+        file_body_path = SPEECH_CACHE.path(name, ".json")
+
         url = request.app.state.config.OPENAI_API_BASE_URLS[idx]
 
         r = None
@@ -246,6 +247,8 @@ async def speech(request: Request, user=Depends(get_verified_user)):
             with open(file_body_path, "w") as f:
                 json.dump(json.loads(body.decode("utf-8")), f)
 
+            SPEECH_CACHE.add(name)
+
             # Return the saved file
             return FileResponse(file_path)
 
@@ -819,14 +822,8 @@ async def proxy(path: str, request: Request, user=Depends(get_verified_user)):
         # Check if response is SSE
         if "text/event-stream" in r.headers.get("Content-Type", ""):
             streaming = True
-            return StreamingResponse(
-                r.content,
-                status_code=r.status,
-                headers=dict(r.headers),
-                background=BackgroundTask(
-                    cleanup_response, response=r, session=session
-                ),
-            )
+            # Forward upstream chunks as-is, nothing downstream inspects the stream
+            return UpstreamStreamingResponse(r, session=session)
         else:
             response_data = await r.json()
             return response_data
@@ -73,9 +73,11 @@ from open_webui.utils.misc import (
     calculate_sha256_string,
 )
 from open_webui.utils.auth import get_admin_user, get_verified_user
+from open_webui.utils.model_manager import MODELS, ManagedModel
 
 from open_webui.config import (
     ENV,
+    MODEL_INFERENCE_THREADS,
     RAG_EMBEDDING_MODEL_AUTO_UPDATE,
     RAG_EMBEDDING_MODEL_TRUST_REMOTE_CODE,
     RAG_RERANKING_MODEL_AUTO_UPDATE,
@@ -106,34 +108,46 @@ def get_ef(
     engine: str,
     embedding_model: str,
     auto_update: bool = False,
-):
-    ef = None
-    if embedding_model and engine == "":
+) -> Optional[ManagedModel]:
+    """
+    Returns the local embedding model, which is loaded in the background, or
+    None when embeddings come from an external engine.
+    """
+    if not (embedding_model and engine == ""):
+        MODELS.remove("embedding")
+        return None
+
+    def load():
         from sentence_transformers import SentenceTransformer
 
-        try:
-            ef = SentenceTransformer(
-                get_model_path(embedding_model, auto_update),
-                device=DEVICE_TYPE,
-                trust_remote_code=RAG_EMBEDDING_MODEL_TRUST_REMOTE_CODE,
-            )
-        except Exception as e:
-            log.debug(f"Error loading SentenceTransformer: {e}")
+        return SentenceTransformer(
+            get_model_path(embedding_model, auto_update),
+            device=DEVICE_TYPE,
+            trust_remote_code=RAG_EMBEDDING_MODEL_TRUST_REMOTE_CODE,
+        )
 
+    ef = MODELS.register(
+        "embedding", embedding_model, load, threads=MODEL_INFERENCE_THREADS
+    )
+    ef.warmup()
     return ef
 
 
 def get_rf(
     reranking_model: Optional[str] = None,
     auto_update: bool = False,
-):
-    rf = None
-    if reranking_model:
+) -> Optional[ManagedModel]:
+    """Returns the reranking model, which is loaded in the background."""
+    if not reranking_model:
+        MODELS.remove("reranking")
+        return None
+
+    def load():
         if any(model in reranking_model for model in ["jinaai/jina-colbert-v2"]):
             try:
                 from open_webui.retrieval.models.colbert import ColBERT
 
-                rf = ColBERT(
+                return ColBERT(
                     get_model_path(reranking_model, auto_update),
                     env="docker" if DOCKER else None,
                 )
@@ -145,7 +159,7 @@ def get_rf(
             import sentence_transformers
 
             try:
-                rf = sentence_transformers.CrossEncoder(
+                return sentence_transformers.CrossEncoder(
                     get_model_path(reranking_model, auto_update),
                     device=DEVICE_TYPE,
                     trust_remote_code=RAG_RERANKING_MODEL_TRUST_REMOTE_CODE,
@@ -153,6 +167,11 @@ def get_rf(
             except Exception as e:
                 log.error(f"CrossEncoder: {e}")
                 raise Exception(ERROR_MESSAGES.DEFAULT("CrossEncoder error"))
+
+    rf = MODELS.register(
+        "reranking", reranking_model, load, threads=MODEL_INFERENCE_THREADS
+    )
+    rf.warmup()
     return rf
 
 
@@ -764,6 +783,7 @@ async def update_query_settings(
 
     if not request.app.state.config.ENABLE_RAG_HYBRID_SEARCH:
         request.app.state.rf = None
+        MODELS.remove("reranking")
 
     return {
         "status": True,
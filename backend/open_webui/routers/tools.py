@@ -15,8 +15,12 @@ from open_webui.config import CACHE_DIR
 from open_webui.constants import ERROR_MESSAGES
 from fastapi import APIRouter, Depends, HTTPException, Request, status
 from open_webui.utils.tools import get_tools_specs
-from open_webui.utils.auth import get_admin_user, get_verified_user
-from open_webui.utils.access_control import has_access, has_permission
+from open_webui.utils.auth import (
+    get_admin_user,
+    get_verified_user,
+    invalidate_user_cache,
+)
+from open_webui.utils.access_control import has_access, get_auth_context
 from open_webui.env import SRC_LOG_LEVELS
 
 from open_webui.utils.tools import get_tool_servers_data
@@ -117,8 +121,8 @@ async def create_new_tools(
     form_data: ToolForm,
     user=Depends(get_verified_user),
 ):
-    if user.role != "admin" and not has_permission(
-        user.id, "workspace.tools", request.app.state.config.USER_PERMISSIONS
+    if user.role != "admin" and not get_auth_context(request, user).has_permission(
+        "workspace.tools", request.app.state.config.USER_PERMISSIONS
     ):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -467,6 +471,7 @@ async def update_tools_user_valves_by_id(
                 Tools.update_user_valves_by_id_and_user_id(
                     id, user.id, user_valves.model_dump()
                 )
+                await invalidate_user_cache(user.id)
                 return user_valves.model_dump()
             except Exception as e:
                 log.exception(f"Failed to update user valves by id {id}: {e}")
@@ -19,8 +19,13 @@ from open_webui.env import SRC_LOG_LEVELS
 from fastapi import APIRouter, Depends, HTTPException, Request, status
 from pydantic import BaseModel
 
-from open_webui.utils.auth import get_admin_user, get_password_hash, get_verified_user
-from open_webui.utils.access_control import get_permissions
+from open_webui.utils.auth import (
+    get_admin_user,
+    get_password_hash,
+    get_verified_user,
+    invalidate_user_cache,
+)
+from open_webui.utils.access_control import get_auth_context
 
 
 log = logging.getLogger(__name__)
@@ -59,8 +64,8 @@ async def get_user_groups(user=Depends(get_verified_user)):
 
 @router.get("/permissions")
 async def get_user_permissisions(request: Request, user=Depends(get_verified_user)):
-    user_permissions = get_permissions(
-        user.id, request.app.state.config.USER_PERMISSIONS
+    user_permissions = get_auth_context(request, user).get_permissions(
+        request.app.state.config.USER_PERMISSIONS
     )
 
     return user_permissions
@@ -140,7 +145,9 @@ async def update_default_user_permissions(
 @router.post("/update/role", response_model=Optional[UserModel])
 async def update_user_role(form_data: UserRoleUpdateForm, user=Depends(get_admin_user)):
     if user.id != form_data.id and form_data.id != Users.get_first_user().id:
-        return Users.update_user_role_by_id(form_data.id, form_data.role)
+        updated_user = Users.update_user_role_by_id(form_data.id, form_data.role)
+        await invalidate_user_cache(form_data.id)
+        return updated_user
 
     raise HTTPException(
         status_code=status.HTTP_403_FORBIDDEN,
@@ -176,6 +183,7 @@ async def update_user_settings_by_session_user(
 ):
     user = Users.update_user_settings_by_id(user.id, form_data.model_dump())
     if user:
+        await invalidate_user_cache(user.id)
         return user.settings
     else:
         raise HTTPException(
@@ -217,6 +225,7 @@ async def update_user_info_by_session_user(
 
         user = Users.update_user_by_id(user.id, {"info": {**user.info, **form_data}})
         if user:
+            await invalidate_user_cache(user.id)
             return user.info
         else:
             raise HTTPException(
@@ -263,7 +272,7 @@ async def get_user_by_id(user_id: str, user=Depends(get_verified_user)):
             **{
                 "name": user.name,
                 "profile_image_url": user.profile_image_url,
-                "active": get_active_status_by_user_id(user_id),
+                "active": await get_active_status_by_user_id(user_id),
             }
         )
     else:
@@ -311,6 +320,7 @@ async def update_user_by_id(
         )
 
         if updated_user:
+            await invalidate_user_cache(user_id)
             return updated_user
 
         raise HTTPException(
@@ -335,6 +345,7 @@ async def delete_user_by_id(user_id: str, user=Depends(get_admin_user)):
         result = Auths.delete_auth_by_id(user_id)
 
         if result:
+            await invalidate_user_cache(user_id)
             return True
 
         raise HTTPException(
@@ -1,8 +1,10 @@
 import asyncio
+import random
 import socketio
 import logging
 import sys
 import time
+from contextlib import asynccontextmanager
 from redis import asyncio as aioredis
 
 from open_webui.models.users import Users, UserNameResponse
@@ -21,9 +23,35 @@ from open_webui.env import (
     WEBSOCKET_REDIS_LOCK_TIMEOUT,
     WEBSOCKET_SENTINEL_PORT,
     WEBSOCKET_SENTINEL_HOSTS,
+    WEBSOCKET_USER_POOL_CACHE_TTL,
+    WEBSOCKET_USAGE_BROADCAST_INTERVAL,
+    WEBSOCKET_PRESENCE_BATCH_INTERVAL,
+    WEBSOCKET_MAX_CONCURRENT_HANDSHAKES,
+    WEBSOCKET_HANDSHAKE_TIMEOUT,
+    WEBSOCKET_RECONNECT_DELAY_MAX,
+    WEBSOCKET_CHANNEL_MEMBERSHIP_CACHE_TTL,
+    WEBSOCKET_EVENT_STREAM_MAXLEN,
+    WEBSOCKET_EVENT_STREAM_TTL,
+    WEBSOCKET_TYPING_EVENT_INTERVAL,
+    WEBSOCKET_OUTBOUND_QUEUE_SIZE,
 )
+from open_webui.utils import metrics
 from open_webui.utils.auth import decode_token
-from open_webui.socket.utils import RedisDict, RedisLock
+from open_webui.socket.utils import (
+    ChannelMembershipIndex,
+    ChatEventStream,
+    OutboundEventQueue,
+    RedisChannelMembershipIndex,
+    RedisChatEventStream,
+    RedisLock,
+    RedisSessionPool,
+    RedisUsagePool,
+    RedisUserPool,
+    SessionPool,
+    UsagePool,
+    UserPool,
+    get_chat_event_kind,
+)
 
 from open_webui.env import (
     GLOBAL_LOG_LEVEL,
@@ -78,20 +106,34 @@ if WEBSOCKET_MANAGER == "redis":
     redis_sentinels = get_sentinels_from_env(
         WEBSOCKET_SENTINEL_HOSTS, WEBSOCKET_SENTINEL_PORT
     )
-    SESSION_POOL = RedisDict(
+    SESSION_POOL = RedisSessionPool(
         "open-webui:session_pool",
         redis_url=WEBSOCKET_REDIS_URL,
         redis_sentinels=redis_sentinels,
     )
-    USER_POOL = RedisDict(
-        "open-webui:user_pool",
+    USER_POOL = RedisUserPool(
+        "open-webui:user_sessions",
+        redis_url=WEBSOCKET_REDIS_URL,
+        redis_sentinels=redis_sentinels,
+        cache_ttl=WEBSOCKET_USER_POOL_CACHE_TTL,
+    )
+    USAGE_POOL = RedisUsagePool(
+        "open-webui:models_in_use",
+        redis_url=WEBSOCKET_REDIS_URL,
+        redis_sentinels=redis_sentinels,
+    )
+    CHAT_EVENT_STREAM = RedisChatEventStream(
+        "open-webui:chat_events",
         redis_url=WEBSOCKET_REDIS_URL,
         redis_sentinels=redis_sentinels,
+        maxlen=WEBSOCKET_EVENT_STREAM_MAXLEN,
+        ttl=WEBSOCKET_EVENT_STREAM_TTL,
     )
-    USAGE_POOL = RedisDict(
-        "open-webui:usage_pool",
+    CHANNEL_MEMBERSHIP = RedisChannelMembershipIndex(
+        "open-webui:channel_membership",
         redis_url=WEBSOCKET_REDIS_URL,
         redis_sentinels=redis_sentinels,
+        ttl=WEBSOCKET_CHANNEL_MEMBERSHIP_CACHE_TTL,
     )
 
     clean_up_lock = RedisLock(
@@ -104,9 +146,15 @@ if WEBSOCKET_MANAGER == "redis":
     renew_func = clean_up_lock.renew_lock
     release_func = clean_up_lock.release_lock
 else:
-    SESSION_POOL = {}
-    USER_POOL = {}
-    USAGE_POOL = {}
+    SESSION_POOL = SessionPool()
+    USER_POOL = UserPool()
+    USAGE_POOL = UsagePool()
+    CHAT_EVENT_STREAM = ChatEventStream(
+        maxlen=WEBSOCKET_EVENT_STREAM_MAXLEN, ttl=WEBSOCKET_EVENT_STREAM_TTL
+    )
+    CHANNEL_MEMBERSHIP = ChannelMembershipIndex(
+        ttl=WEBSOCKET_CHANNEL_MEMBERSHIP_CACHE_TTL
+    )
     aquire_func = release_func = renew_func = lambda: True
 
 
@@ -121,30 +169,9 @@ async def periodic_usage_pool_cleanup():
                 log.error(f"Unable to renew cleanup lock. Exiting usage pool cleanup.")
                 raise Exception("Unable to renew usage pool cleanup lock.")
 
-            now = int(time.time())
-            send_usage = False
-            for model_id, connections in list(USAGE_POOL.items()):
-                # Creating a list of sids to remove if they have timed out
-                expired_sids = [
-                    sid
-                    for sid, details in connections.items()
-                    if now - details["updated_at"] > TIMEOUT_DURATION
-                ]
-
-                for sid in expired_sids:
-                    del connections[sid]
-
-                if not connections:
-                    log.debug(f"Cleaning up model {model_id} from usage pool")
-                    del USAGE_POOL[model_id]
-                else:
-                    USAGE_POOL[model_id] = connections
-
-                send_usage = True
-
-            if send_usage:
-                # Emit updated usage information after cleaning
-                await sio.emit("usage", {"models": get_models_in_use()})
+            # Only announce usage when a model actually went idle
+            if await USAGE_POOL.expire(time.time() - TIMEOUT_DURATION):
+                schedule_usage_broadcast()
 
             await asyncio.sleep(TIMEOUT_DURATION)
     finally:
@@ -156,48 +183,268 @@ app = socketio.ASGIApp(
     socketio_path="/ws/socket.io",
 )
 
+# Returned to events that arrive before the session is stored. Clients send
+# them again once the server emits "session-ready" at the end of the handshake.
+SESSION_NOT_READY = {"error": "Session not ready", "retry": True}
 
-def get_models_in_use():
+
+async def get_models_in_use():
     # List models that are currently in use
-    models_in_use = list(USAGE_POOL.keys())
+    models_in_use = await USAGE_POOL.keys()
     return models_in_use
 
 
+# Clients interested in model usage (e.g. the user menu) join this room
+USAGE_ROOM = "usage"
+
+usage_broadcast_task = None
+last_usage_broadcast_at = 0.0
+
+
+async def broadcast_usage():
+    global usage_broadcast_task, last_usage_broadcast_at
+
+    delay = (
+        last_usage_broadcast_at + WEBSOCKET_USAGE_BROADCAST_INTERVAL - time.monotonic()
+    )
+    if delay > 0:
+        await asyncio.sleep(delay)
+
+    # Changes from here on schedule another broadcast
+    usage_broadcast_task = None
+
+    models_in_use = await get_models_in_use()
+    last_usage_broadcast_at = time.monotonic()
+    await sio.emit("usage", {"models": models_in_use}, room=USAGE_ROOM)
+
+
+def schedule_usage_broadcast():
+    """
+    Broadcast the models in use to the usage room, at most once per
+    WEBSOCKET_USAGE_BROADCAST_INTERVAL. Only called when the usage pool
+    reports a model going in or out of use; the result is not compared with
+    this node's last broadcast, as another node may have broadcast since.
+    """
+    global usage_broadcast_task
+
+    if usage_broadcast_task is None:
+        usage_broadcast_task = asyncio.create_task(broadcast_usage())
+
+
 @sio.on("usage")
 async def usage(sid, data):
     model_id = data["model"]
-    # Record the timestamp for the last update
-    current_time = int(time.time())
 
-    # Store the new usage data and task
-    USAGE_POOL[model_id] = {
-        **(USAGE_POOL[model_id] if model_id in USAGE_POOL else {}),
-        sid: {"updated_at": current_time},
-    }
+    # Record the heartbeat, only a model that was idle changes the usage
+    if await USAGE_POOL.touch(model_id, sid, time.time()):
+        schedule_usage_broadcast()
+
+
+@sio.on("usage:subscribe")
+async def usage_subscribe(sid):
+    if not await SESSION_POOL.get(sid):
+        return SESSION_NOT_READY
+
+    await sio.enter_room(sid, USAGE_ROOM)
+    await sio.emit("usage", {"models": await get_models_in_use()}, to=sid)
+
+
+@sio.on("usage:unsubscribe")
+async def usage_unsubscribe(sid):
+    await sio.leave_room(sid, USAGE_ROOM)
+
+
+# Clients showing who is online (e.g. the channels UI) join this room
+PRESENCE_ROOM = "presence"
+
+presence_broadcast_task = None
+pending_joined_user_ids = set()
+pending_left_user_ids = set()
+
+
+async def broadcast_presence():
+    global presence_broadcast_task
+
+    await asyncio.sleep(WEBSOCKET_PRESENCE_BATCH_INTERVAL)
+
+    # Changes from here on go into the next batch
+    presence_broadcast_task = None
+
+    joined, left = list(pending_joined_user_ids), list(pending_left_user_ids)
+    pending_joined_user_ids.clear()
+    pending_left_user_ids.clear()
+
+    if joined or left:
+        await sio.emit(
+            "user-presence", {"joined": joined, "left": left}, room=PRESENCE_ROOM
+        )
+
+
+def record_presence(user_id, online):
+    """
+    Queue a user coming online or going offline. Changes are sent to the
+    presence room as one diff per WEBSOCKET_PRESENCE_BATCH_INTERVAL, and a
+    user that goes offline and back online within a batch is not announced.
+    """
+    global presence_broadcast_task
+
+    added, removed = (
+        (pending_joined_user_ids, pending_left_user_ids)
+        if online
+        else (pending_left_user_ids, pending_joined_user_ids)
+    )
+    if user_id in removed:
+        removed.discard(user_id)
+    else:
+        added.add(user_id)
+
+    if presence_broadcast_task is None:
+        presence_broadcast_task = asyncio.create_task(broadcast_presence())
+
+
+@sio.on("presence:subscribe")
+async def presence_subscribe(sid):
+    if not await SESSION_POOL.get(sid):
+        return SESSION_NOT_READY
+
+    await sio.enter_room(sid, PRESENCE_ROOM)
+    await sio.emit("user-list", {"user_ids": await USER_POOL.get_user_ids()}, to=sid)
+
+
+@sio.on("presence:unsubscribe")
+async def presence_unsubscribe(sid):
+    await sio.leave_room(sid, PRESENCE_ROOM)
+
+
+####################
+# Admission control
+####################
+
+# Bounds the handshakes (token decoding, user and channel lookups) running at
+# once, so a reconnect storm after a restart queues instead of stalling the loop
+handshake_semaphore = asyncio.Semaphore(WEBSOCKET_MAX_CONCURRENT_HANDSHAKES)
+waiting_handshakes = 0
+
+handshake_latency = metrics.histogram("websocket.handshake.seconds")
+handshakes_rejected = metrics.counter("websocket.handshake.rejected")
+metrics.gauge("websocket.handshake.waiting", lambda: waiting_handshakes)
+
+
+class HandshakeRejected(Exception):
+    pass
+
+
+@asynccontextmanager
+async def admit_handshake(timeout=None):
+    """
+    Run a handshake once a slot is free. Raises HandshakeRejected when no slot
+    frees up within `timeout` seconds.
+    """
+    global waiting_handshakes
+
+    start = time.perf_counter()
+    waiting_handshakes += 1
+    try:
+        await asyncio.wait_for(handshake_semaphore.acquire(), timeout)
+    except asyncio.TimeoutError:
+        handshakes_rejected.inc()
+        raise HandshakeRejected()
+    finally:
+        waiting_handshakes -= 1
+
+    try:
+        yield
+    finally:
+        handshake_semaphore.release()
+        handshake_latency.observe(time.perf_counter() - start)
+
+
+def get_reconnect_delay():
+    """
+    Jittered delay in seconds clients should wait before reconnecting. It
+    grows with the handshake backlog, so reconnects are spread out over time.
+    """
+    backlog = waiting_handshakes / WEBSOCKET_MAX_CONCURRENT_HANDSHAKES
+    upper = min(WEBSOCKET_RECONNECT_DELAY_MAX, 1 + backlog)
+    return round(random.uniform(upper / 2, upper), 2)
+
+
+async def get_user_from_token(token, session_user=None):
+    data = decode_token(token)
+    if data is None or "id" not in data:
+        return None
+
+    # Reuse the user stored when the socket connected
+    if session_user and session_user["id"] == data["id"]:
+        return session_user
+
+    user = await asyncio.to_thread(Users.get_user_by_id, data["id"])
+    return user.model_dump() if user else None
+
 
-    # Broadcast the usage data to all clients
-    await sio.emit("usage", {"models": get_models_in_use()})
+async def get_channel_ids_by_user_id(user_id):
+    channel_ids, version = await CHANNEL_MEMBERSHIP.get(user_id)
+    if channel_ids is None:
+        channels = await asyncio.to_thread(Channels.get_channels_by_user_id, user_id)
+        channel_ids = [channel.id for channel in channels]
+        await CHANNEL_MEMBERSHIP.set(user_id, channel_ids, version)
+    return channel_ids
+
+
+def start_chat_event_stream(chat_id, message_id):
+    """
+    Forget the events kept for resuming a message when a new generation of it
+    starts, e.g. on "continue response".
+    """
+    CHAT_EVENT_STREAM.start(chat_id, message_id)
+
+
+async def invalidate_channel_membership(user_ids=None):
+    """
+    Drop the indexed channel membership of the given users, or of everyone.
+    Called whenever channels or groups change.
+    """
+    await CHANNEL_MEMBERSHIP.invalidate(user_ids)
+
+
+def is_in_room(sid, room, namespace="/"):
+    return sid in sio.manager.rooms.get(namespace, {}).get(room, {})
+
+
+async def enter_channel_rooms(sid, user_id):
+    channel_ids = await get_channel_ids_by_user_id(user_id)
+    log.debug(f"{channel_ids=}")
+    for channel_id in channel_ids:
+        await sio.enter_room(sid, f"channel:{channel_id}")
 
 
 @sio.event
 async def connect(sid, environ, auth):
     user = None
     if auth and "token" in auth:
-        data = decode_token(auth["token"])
-
-        if data is not None and "id" in data:
-            user = Users.get_user_by_id(data["id"])
-
-        if user:
-            SESSION_POOL[sid] = user.model_dump()
-            if user.id in USER_POOL:
-                USER_POOL[user.id] = USER_POOL[user.id] + [sid]
-            else:
-                USER_POOL[user.id] = [sid]
+        try:
+            async with admit_handshake(WEBSOCKET_HANDSHAKE_TIMEOUT):
+                user = await get_user_from_token(auth["token"])
+
+                if user:
+                    await SESSION_POOL.set(sid, user)
+                    if await USER_POOL.add(user["id"], sid):
+                        record_presence(user["id"], True)
+
+                    # print(f"user {user['name']}({user['id']}) connected with session ID {sid}")
+        except HandshakeRejected:
+            log.debug(f"Too many handshakes in progress, rejecting {sid}")
+            await sio.emit(
+                "reconnect-delay",
+                {"delay": get_reconnect_delay(), "rejected": True},
+                to=sid,
+            )
+            return False
 
-            # print(f"user {user.name}({user.id}) connected with session ID {sid}")
-            await sio.emit("user-list", {"user_ids": list(USER_POOL.keys())})
-            await sio.emit("usage", {"models": get_models_in_use()})
+    await sio.emit("reconnect-delay", {"delay": get_reconnect_delay()}, to=sid)
+    if user:
+        # Clients wait for this before sending events that need the session
+        await sio.emit("session-ready", to=sid)
 
 
 @sio.on("user-join")
@@ -207,30 +454,27 @@ async def user_join(sid, data):
     if not auth or "token" not in auth:
         return
 
-    data = decode_token(auth["token"])
-    if data is None or "id" not in data:
-        return
+    async with admit_handshake():
+        session_user = await SESSION_POOL.get(sid)
+        user = await get_user_from_token(auth["token"], session_user)
+        if not user:
+            return
 
-    user = Users.get_user_by_id(data["id"])
-    if not user:
-        return
+        await SESSION_POOL.set(sid, user)
+        session_display_info.pop(sid, None)
+        if await USER_POOL.add(user["id"], sid):
+            record_presence(user["id"], True)
 
-    SESSION_POOL[sid] = user.model_dump()
-    if user.id in USER_POOL:
-        USER_POOL[user.id] = USER_POOL[user.id] + [sid]
-    else:
-        USER_POOL[user.id] = [sid]
+        # Join all the channels
+        await enter_channel_rooms(sid, user["id"])
 
-    # Join all the channels
-    channels = Channels.get_channels_by_user_id(user.id)
-    log.debug(f"{channels=}")
-    for channel in channels:
-        await sio.enter_room(sid, f"channel:{channel.id}")
+    # print(f"user {user['name']}({user['id']}) connected with session ID {sid}")
 
-    # print(f"user {user.name}({user.id}) connected with session ID {sid}")
+    # Not ready yet when the socket connected without a token (e.g. on login)
+    if not session_user or session_user["id"] != user["id"]:
+        await sio.emit("session-ready", to=sid)
 
-    await sio.emit("user-list", {"user_ids": list(USER_POOL.keys())})
-    return {"id": user.id, "name": user.name}
+    return {"id": user["id"], "name": user["name"]}
 
 
 @sio.on("join-channels")
@@ -239,79 +483,162 @@ async def join_channel(sid, data):
     if not auth or "token" not in auth:
         return
 
-    data = decode_token(auth["token"])
-    if data is None or "id" not in data:
-        return
+    async with admit_handshake():
+        user = await get_user_from_token(auth["token"], await SESSION_POOL.get(sid))
+        if not user:
+            return
 
-    user = Users.get_user_by_id(data["id"])
-    if not user:
+        # Join all the channels
+        await enter_channel_rooms(sid, user["id"])
+
+
+# sid -> display info (id, name, profile image) sent along with channel events
+session_display_info = {}
+
+
+async def get_session_display_info(sid):
+    if sid not in session_display_info:
+        session_user = await SESSION_POOL.get(sid)
+        if not session_user:
+            return None
+        session_display_info[sid] = UserNameResponse(**session_user).model_dump()
+    return session_display_info[sid]
+
+
+# (room, message id, user id) -> (time, data) of the last typing event sent
+typing_last_sent = {}
+# (room, message id, user id) -> latest typing event held back by the interval
+typing_pending = {}
+
+
+async def send_typing_event(key, event, room):
+    await sio.emit("channel-events", event, room=room)
+    typing_last_sent[key] = (time.monotonic(), event["data"])
+
+
+async def flush_typing_event(key, room, delay):
+    await asyncio.sleep(delay)
+
+    event = typing_pending.pop(key, None)
+    last_sent = typing_last_sent.get(key)
+    if event and (not last_sent or last_sent[1] != event["data"]):
+        await send_typing_event(key, event, room)
+
+
+async def emit_typing_event(event, room):
+    """
+    Send at most one typing event per user, room and thread every
+    WEBSOCKET_TYPING_EVENT_INTERVAL. Events within the interval are held back
+    and only the latest one is sent at its end, if it changes anything.
+    """
+    key = (room, event["message_id"], event["user"]["id"])
+    now = time.monotonic()
+
+    last_sent = typing_last_sent.get(key)
+    if not last_sent or now - last_sent[0] >= WEBSOCKET_TYPING_EVENT_INTERVAL:
+        if len(typing_last_sent) > 1024:
+            for stale_key in [
+                k
+                for k, (sent_at, _) in typing_last_sent.items()
+                if now - sent_at >= WEBSOCKET_TYPING_EVENT_INTERVAL
+            ]:
+                del typing_last_sent[stale_key]
+
+        await send_typing_event(key, event, room)
         return
 
-    # Join all the channels
-    channels = Channels.get_channels_by_user_id(user.id)
-    log.debug(f"{channels=}")
-    for channel in channels:
-        await sio.enter_room(sid, f"channel:{channel.id}")
+    if key not in typing_pending:
+        asyncio.create_task(
+            flush_typing_event(
+                key, room, last_sent[0] + WEBSOCKET_TYPING_EVENT_INTERVAL - now
+            )
+        )
+    typing_pending[key] = event
 
 
 @sio.on("channel-events")
 async def channel_events(sid, data):
     room = f"channel:{data['channel_id']}"
-    participants = sio.manager.get_participants(
-        namespace="/",
-        room=room,
-    )
-
-    sids = [sid for sid, _ in participants]
-    if sid not in sids:
+    if not is_in_room(sid, room):
         return
 
     event_data = data["data"]
     event_type = event_data["type"]
 
     if event_type == "typing":
-        await sio.emit(
-            "channel-events",
+        user = await get_session_display_info(sid)
+        if not user:
+            return
+
+        await emit_typing_event(
             {
                 "channel_id": data["channel_id"],
                 "message_id": data.get("message_id", None),
                 "data": event_data,
-                "user": UserNameResponse(**SESSION_POOL[sid]).model_dump(),
+                "user": user,
             },
-            room=room,
+            room,
         )
 
 
 @sio.on("user-list")
 async def user_list(sid):
-    await sio.emit("user-list", {"user_ids": list(USER_POOL.keys())})
+    await sio.emit("user-list", {"user_ids": await USER_POOL.get_user_ids()}, to=sid)
 
 
 @sio.event
 async def disconnect(sid):
-    if sid in SESSION_POOL:
-        user = SESSION_POOL[sid]
-        del SESSION_POOL[sid]
-
-        user_id = user["id"]
-        USER_POOL[user_id] = [_sid for _sid in USER_POOL[user_id] if _sid != sid]
+    session_display_info.pop(sid, None)
 
-        if len(USER_POOL[user_id]) == 0:
-            del USER_POOL[user_id]
+    queue = OUTBOUND_QUEUES.pop(sid, None)
+    if queue:
+        queue.close()
 
-        await sio.emit("user-list", {"user_ids": list(USER_POOL.keys())})
+    user = await SESSION_POOL.delete(sid)
+    if user:
+        if await USER_POOL.remove(user["id"], sid) == 0:
+            record_presence(user["id"], False)
     else:
         pass
         # print(f"Unknown session ID {sid} disconnected")
 
 
+# sid -> chat events waiting to be sent to it, dropped once drained
+OUTBOUND_QUEUES = {}
+
+metrics.gauge("websocket.outbound.queues", lambda: len(OUTBOUND_QUEUES))
+metrics.gauge(
+    "websocket.outbound.queued_events",
+    lambda: sum(len(queue) for queue in OUTBOUND_QUEUES.values()),
+)
+metrics.gauge(
+    "websocket.outbound.max_queue_depth",
+    lambda: max((len(queue) for queue in OUTBOUND_QUEUES.values()), default=0),
+)
+
+
+def get_outbound_queue(sid):
+    queue = OUTBOUND_QUEUES.get(sid)
+    if queue is None:
+
+        async def send(event):
+            await sio.emit("chat-events", event, to=sid)
+
+        queue = OUTBOUND_QUEUES[sid] = OutboundEventQueue(
+            send,
+            maxsize=WEBSOCKET_OUTBOUND_QUEUE_SIZE,
+            on_empty=lambda: OUTBOUND_QUEUES.pop(sid, None),
+        )
+    return queue
+
+
 def get_event_emitter(request_info, update_db=True):
     async def __event_emitter__(event_data):
         user_id = request_info["user_id"]
 
         session_ids = list(
             set(
-                USER_POOL.get(user_id, [])
+                await USER_POOL.get_sids(user_id)
                 + (
                     [request_info.get("session_id")]
                     if request_info.get("session_id")
@@ -320,17 +647,25 @@ def get_event_emitter(request_info, update_db=True):
             )
         )
 
-        for session_id in session_ids:
-            await sio.emit(
-                "chat-events",
-                {
-                    "chat_id": request_info.get("chat_id", None),
-                    "message_id": request_info.get("message_id", None),
-                    "data": event_data,
-                },
-                to=session_id,
+        event = {
+            "chat_id": request_info.get("chat_id", None),
+            "message_id": request_info.get("message_id", None),
+            "data": event_data,
+        }
+
+        # Keep the event so clients reconnecting mid-generation can catch up
+        if event["chat_id"] and event["message_id"]:
+            event["seq"] = CHAT_EVENT_STREAM.append(
+                event["chat_id"],
+                event["message_id"],
+                {**event},
+                done=is_final_chat_event(event_data),
             )
 
+        # Queued rather than awaited, so slow clients do not hold up the generation
+        for session_id in session_ids:
+            get_outbound_queue(session_id).put(event)
+
         if update_db:
             if "type" in event_data and event_data["type"] == "status":
                 Chats.add_message_status_to_chat_by_id_and_message_id(
@@ -370,6 +705,58 @@ def get_event_emitter(request_info, update_db=True):
     return __event_emitter__
 
 
+def is_final_chat_event(event_data):
+    return event_data.get("type") == "task-cancelled" or (
+        event_data.get("type") == "chat:completion"
+        and event_data.get("data", {}).get("done", False)
+    )
+
+
+def coalesce_chat_events(events):
+    """
+    Completion events carrying only a content snapshot are superseded by the
+    next snapshot, so a resuming client only needs the latest of them.
+    """
+
+    def is_snapshot(event):
+        return get_chat_event_kind(event) == "snapshot"
+
+    last_snapshot = max(
+        (i for i, event in enumerate(events) if is_snapshot(event)), default=None
+    )
+    return [
+        event
+        for i, event in enumerate(events)
+        if not is_snapshot(event) or i == last_snapshot
+    ]
+
+
+@sio.on("chat:resume")
+async def chat_resume(sid, data):
+    """
+    Returns the events emitted for a message after sequence number `seq`, and
+    whether its generation has ended.
+    """
+    user = await SESSION_POOL.get(sid)
+    if not user:
+        # Not a finished generation, the client resumes again once ready
+        return SESSION_NOT_READY
+
+    chat_id, message_id = data.get("chat_id"), data.get("message_id")
+    if not chat_id or not message_id:
+        return {"events": [], "done": True}
+
+    chat = await asyncio.to_thread(
+        Chats.get_chat_by_id_and_user_id, chat_id, user["id"]
+    )
+    if not chat:
+        return {"events": [], "done": True}
+
+    entries, done = await CHAT_EVENT_STREAM.read(chat_id, message_id, data.get("seq"))
+    events = [{**event, "seq": seq} for seq, event in entries]
+    return {"events": coalesce_chat_events(events), "done": done}
+
+
 def get_event_call(request_info):
     async def __event_caller__(event_data):
         response = await sio.call(
@@ -389,28 +776,29 @@ def get_event_call(request_info):
 get_event_caller = get_event_call
 
 
-def get_user_id_from_session_pool(sid):
-    user = SESSION_POOL.get(sid)
+async def get_user_id_from_session_pool(sid):
+    user = await SESSION_POOL.get(sid)
     if user:
         return user["id"]
     return None
 
 
-def get_user_ids_from_room(room):
+async def get_user_ids_from_room(room):
     active_session_ids = sio.manager.get_participants(
         namespace="/",
         room=room,
     )
 
-    active_user_ids = list(
-        set(
-            [SESSION_POOL.get(session_id[0])["id"] for session_id in active_session_ids]
-        )
+    # Fetch all the sessions of the room in a single round trip
+    sessions = await SESSION_POOL.get_many(
+        [session_id[0] for session_id in active_session_ids]
     )
+
+    active_user_ids = list(set([session["id"] for session in sessions if session]))
     return active_user_ids
 
 
-def get_active_status_by_user_id(user_id):
-    if user_id in USER_POOL:
+async def get_active_status_by_user_id(user_id):
+    if await USER_POOL.contains(user_id):
         return True
     return False
@@ -1,7 +1,16 @@
+import asyncio
 import json
+import logging
+import time
 import uuid
+from collections import deque
+from typing import Awaitable, Callable, Optional
+
+from open_webui.utils import metrics
 from open_webui.utils.redis import get_redis_connection
 
+log = logging.getLogger(__name__)
+
 
 class RedisLock:
     def __init__(self, redis_url, lock_name, timeout_secs, redis_sentinels=[]):
@@ -32,60 +41,734 @@ class RedisLock:
             self.redis.delete(self.lock_name)
 
 
-class RedisDict:
+####################
+# Async pools
+####################
+
+
+class SessionPool:
+    """In-memory pool of connected sessions (sid -> user dict)."""
+
+    def __init__(self):
+        self._sessions: dict[str, dict] = {}
+
+    async def get(self, sid: str) -> Optional[dict]:
+        return self._sessions.get(sid)
+
+    async def get_many(self, sids: list[str]) -> list[Optional[dict]]:
+        return [self._sessions.get(sid) for sid in sids]
+
+    async def set(self, sid: str, user: dict):
+        self._sessions[sid] = user
+
+    async def delete(self, sid: str) -> Optional[dict]:
+        return self._sessions.pop(sid, None)
+
+
+class RedisSessionPool(SessionPool):
+    """Session pool stored in a Redis hash, shared by every node."""
+
     def __init__(self, name, redis_url, redis_sentinels=[]):
         self.name = name
         self.redis = get_redis_connection(
-            redis_url, redis_sentinels, decode_responses=True
+            redis_url, redis_sentinels, decode_responses=True, async_mode=True
         )
 
-    def __setitem__(self, key, value):
-        serialized_value = json.dumps(value)
-        self.redis.hset(self.name, key, serialized_value)
+    async def get(self, sid: str) -> Optional[dict]:
+        value = await self.redis.hget(self.name, sid)
+        return json.loads(value) if value is not None else None
 
-    def __getitem__(self, key):
-        value = self.redis.hget(self.name, key)
-        if value is None:
-            raise KeyError(key)
-        return json.loads(value)
+    async def get_many(self, sids: list[str]) -> list[Optional[dict]]:
+        if not sids:
+            return []
+        values = await self.redis.hmget(self.name, sids)
+        return [json.loads(value) if value is not None else None for value in values]
 
-    def __delitem__(self, key):
-        result = self.redis.hdel(self.name, key)
-        if result == 0:
-            raise KeyError(key)
+    async def set(self, sid: str, user: dict):
+        await self.redis.hset(self.name, sid, json.dumps(user))
 
-    def __contains__(self, key):
-        return self.redis.hexists(self.name, key)
+    async def delete(self, sid: str) -> Optional[dict]:
+        pipe = self.redis.pipeline(transaction=True)
+        pipe.hget(self.name, sid)
+        pipe.hdel(self.name, sid)
+        value, _ = await pipe.execute()
+        return json.loads(value) if value is not None else None
 
-    def __len__(self):
-        return self.redis.hlen(self.name)
 
-    def keys(self):
-        return self.redis.hkeys(self.name)
+class UserPool:
+    """In-memory pool of online users and their session ids."""
+
+    def __init__(self):
+        self._users: dict[str, set[str]] = {}
+
+    async def add(self, user_id: str, sid: str) -> bool:
+        """Adds a session and returns whether it is the user's first one."""
+        is_new = user_id not in self._users
+        self._users.setdefault(user_id, set()).add(sid)
+        return is_new
+
+    async def remove(self, user_id: str, sid: str) -> int:
+        """Removes a session and returns how many sessions the user has left."""
+        sids = self._users.get(user_id, set())
+        sids.discard(sid)
+        if not sids:
+            self._users.pop(user_id, None)
+        return len(sids)
+
+    async def get_sids(self, user_id: str) -> list[str]:
+        return list(self._users.get(user_id, ()))
+
+    async def get_user_ids(self) -> list[str]:
+        return list(self._users.keys())
+
+    async def contains(self, user_id: str) -> bool:
+        return user_id in self._users
+
+
+class RedisUserPool(UserPool):
+    """
+    User pool stored as one Redis set of sids per user plus a set of online
+    user ids. Adds and removes are atomic, so concurrent connects on different
+    nodes can no longer overwrite each other's sessions.
+
+    Session id lookups go through a short-lived local cache, as they are made
+    for every event emitted to a user.
+    """
+
+    # Removes a sid and, in the same step, the user once no session is left
+    REMOVE_SCRIPT = """
+        redis.call('SREM', KEYS[1], ARGV[1])
+        local remaining = redis.call('SCARD', KEYS[1])
+        if remaining == 0 then
+            redis.call('SREM', KEYS[2], ARGV[2])
+        end
+        return remaining
+    """
+
+    def __init__(self, name, redis_url, redis_sentinels=[], cache_ttl=1.0):
+        self.name = name
+        self.redis = get_redis_connection(
+            redis_url, redis_sentinels, decode_responses=True, async_mode=True
+        )
+        self._remove_script = self.redis.register_script(self.REMOVE_SCRIPT)
+
+        self.cache_ttl = cache_ttl
+        self._cache: dict[str, tuple[float, list[str]]] = {}
+
+    def _get_user_key(self, user_id: str) -> str:
+        return f"{self.name}:{user_id}"
+
+    async def add(self, user_id: str, sid: str) -> bool:
+        pipe = self.redis.pipeline(transaction=True)
+        pipe.sadd(self._get_user_key(user_id), sid)
+        pipe.sadd(self.name, user_id)
+        _, added = await pipe.execute()
+        self._cache.pop(user_id, None)
+        return bool(added)
+
+    async def remove(self, user_id: str, sid: str) -> int:
+        remaining = await self._remove_script(
+            keys=[self._get_user_key(user_id), self.name], args=[sid, user_id]
+        )
+        self._cache.pop(user_id, None)
+        return int(remaining)
+
+    async def get_sids(self, user_id: str) -> list[str]:
+        now = time.monotonic()
+        cached = self._cache.get(user_id)
+        if cached and cached[0] > now:
+            return cached[1]
+
+        sids = list(await self.redis.smembers(self._get_user_key(user_id)))
+        self._cache[user_id] = (now + self.cache_ttl, sids)
+        return sids
+
+    async def get_user_ids(self) -> list[str]:
+        return list(await self.redis.smembers(self.name))
+
+    async def contains(self, user_id: str) -> bool:
+        return bool(await self.redis.sismember(self.name, user_id))
+
 
-    def values(self):
-        return [json.loads(v) for v in self.redis.hvals(self.name)]
+class UsagePool:
+    """In-memory pool of models in use (model id -> {sid: last seen})."""
 
-    def items(self):
-        return [(k, json.loads(v)) for k, v in self.redis.hgetall(self.name).items()]
+    def __init__(self):
+        self._usage: dict[str, dict[str, float]] = {}
 
-    def get(self, key, default=None):
+    async def touch(self, model_id: str, sid: str, now: float) -> bool:
+        """Records a heartbeat and returns whether the model was not in use before."""
+        connections = self._usage.setdefault(model_id, {})
+        is_new = not connections
+        connections[sid] = now
+        return is_new
+
+    async def expire(self, cutoff: float) -> bool:
+        """Drops heartbeats older than `cutoff` and returns whether a model went idle."""
+        changed = False
+        for model_id, connections in list(self._usage.items()):
+            for sid in [sid for sid, seen in connections.items() if seen < cutoff]:
+                del connections[sid]
+
+            if not connections:
+                del self._usage[model_id]
+                changed = True
+        return changed
+
+    async def keys(self) -> list[str]:
+        return sorted(self._usage.keys())
+
+
+class RedisUsagePool(UsagePool):
+    """
+    Usage pool stored as one Redis sorted set of sids per model, scored by the
+    time of their last heartbeat, plus a set of the model ids in use.
+
+    Heartbeats are a single ZADD and expiry a ZREMRANGEBYSCORE per model, so
+    neither reads nor rewrites the connections of a model.
+    """
+
+    # Expires the sids of a model and, in the same step, the model once idle
+    EXPIRE_SCRIPT = """
+        redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', '(' .. ARGV[1])
+        if redis.call('ZCARD', KEYS[1]) == 0 then
+            return redis.call('SREM', KEYS[2], ARGV[2])
+        end
+        return 0
+    """
+
+    def __init__(self, name, redis_url, redis_sentinels=[]):
+        self.name = name
+        self.redis = get_redis_connection(
+            redis_url, redis_sentinels, decode_responses=True, async_mode=True
+        )
+        self._expire_script = self.redis.register_script(self.EXPIRE_SCRIPT)
+
+    def _get_model_key(self, model_id: str) -> str:
+        return f"{self.name}:{model_id}"
+
+    async def touch(self, model_id: str, sid: str, now: float) -> bool:
+        pipe = self.redis.pipeline(transaction=True)
+        pipe.zadd(self._get_model_key(model_id), {sid: now})
+        pipe.sadd(self.name, model_id)
+        _, added = await pipe.execute()
+        return bool(added)
+
+    async def expire(self, cutoff: float) -> bool:
+        changed = False
+        for model_id in await self.redis.smembers(self.name):
+            removed = await self._expire_script(
+                keys=[self._get_model_key(model_id), self.name],
+                args=[cutoff, model_id],
+            )
+            changed = changed or bool(removed)
+        return changed
+
+    async def keys(self) -> list[str]:
+        return sorted(await self.redis.smembers(self.name))
+
+
+def get_chat_event_kind(event: dict) -> Optional[str]:
+    """
+    "snapshot" for completion events carrying only the message content so
+    far, which supersede each other, and "delta" for events appending to it.
+    """
+    data = event.get("data", {})
+    if data.get("type") == "chat:completion" and set(
+        data.get("data", {}).keys()
+    ) == {"content"}:
+        return "snapshot"
+    if data.get("type") in ("chat:message:delta", "message"):
+        return "delta"
+    return None
+
+
+def parse_seq(seq: str) -> tuple[int, int]:
+    ms, n = seq.split("-")
+    return int(ms), int(n)
+
+
+class ChatEventStream:
+    """
+    In-memory ring buffer of the events emitted for each generating message,
+    so a client that reconnects mid-generation can resume where it left off.
+
+    Sequence numbers have the "<ms>-<n>" form of Redis Stream ids and are
+    assigned locally, so appending never waits on storage. A content snapshot
+    following another one replaces it, as only the latest one is replayed.
+    """
+
+    def __init__(self, maxlen=500, ttl=3600, finished_ttl=60):
+        self.maxlen = maxlen
+        self.ttl = ttl
+        self.finished_ttl = finished_ttl
+
+        # stream key -> {"events": deque of (seq, event), "expires_at": float, "done": bool}
+        self._streams: dict[str, dict] = {}
+        self._next_expiry_check = 0.0
+
+        # stream key -> last sequence number assigned, while generating
+        self._last_seqs: dict[str, tuple[int, int]] = {}
+
+    def _get_key(self, chat_id: str, message_id: str) -> str:
+        return f"{chat_id}:{message_id}"
+
+    def _next_seq(self, key: str, done: bool) -> str:
+        ms = int(time.time() * 1000)
+        last_ms, last_n = self._last_seqs.get(key, (0, -1))
+        ms, n = (ms, 0) if ms > last_ms else (last_ms, last_n + 1)
+
+        if done:
+            self._last_seqs.pop(key, None)
+        else:
+            self._last_seqs[key] = (ms, n)
+        return f"{ms}-{n}"
+
+    @staticmethod
+    def _add_event(events, seq: str, event: dict):
+        if (
+            events
+            and get_chat_event_kind(event) == "snapshot"
+            and get_chat_event_kind(events[-1][1]) == "snapshot"
+        ):
+            events.pop()
+        events.append((seq, event))
+
+    def _expire(self, now: float):
+        if now < self._next_expiry_check:
+            return
+        self._next_expiry_check = now + 1
+
+        for key in [k for k, s in self._streams.items() if s["expires_at"] < now]:
+            del self._streams[key]
+            self._last_seqs.pop(key, None)
+
+    def start(self, chat_id: str, message_id: str):
+        """
+        Drops the events of an earlier generation of the message (e.g. before
+        "continue response"), so resuming does not report it as done.
+        """
+        self._streams.pop(self._get_key(chat_id, message_id), None)
+
+    def append(
+        self, chat_id: str, message_id: str, event: dict, done: bool = False
+    ) -> str:
+        """Records an event and returns its sequence number."""
+        now = time.time()
+        self._expire(now)
+
+        key = self._get_key(chat_id, message_id)
+        seq = self._next_seq(key, done)
+
+        stream = self._streams.setdefault(
+            key, {"events": deque(maxlen=self.maxlen), "done": False}
+        )
+        self._add_event(stream["events"], seq, event)
+
+        stream["done"] = stream["done"] or done
+        stream["expires_at"] = now + (self.finished_ttl if stream["done"] else self.ttl)
+        return seq
+
+    async def read(
+        self, chat_id: str, message_id: str, after: Optional[str] = None
+    ) -> tuple[list[tuple[str, dict]], bool]:
+        """Returns the events after sequence number `after` and whether the stream ended."""
+        stream = self._streams.get(self._get_key(chat_id, message_id))
+        if not stream or stream["expires_at"] < time.time():
+            return [], True
+
+        after_seq = parse_seq(after) if after else (-1, -1)
+        events = [
+            (seq, event)
+            for seq, event in stream["events"]
+            if parse_seq(seq) > after_seq
+        ]
+        return events, stream["done"]
+
+
+class RedisChatEventStream(ChatEventStream):
+    """
+    Chat event stream stored as one capped Redis Stream per message, so a
+    client can resume on any node.
+
+    Events are written by a background task per message, so the generation
+    never waits on Redis. Content snapshots are written at most once per
+    `flush_interval`, other events as soon as the previous write finished.
+    """
+
+    def __init__(
+        self,
+        name,
+        redis_url,
+        redis_sentinels=[],
+        maxlen=500,
+        ttl=3600,
+        finished_ttl=60,
+        flush_interval=0.5,
+    ):
+        super().__init__(maxlen=maxlen, ttl=ttl, finished_ttl=finished_ttl)
+        self.name = name
+        self.flush_interval = flush_interval
+        self.redis = get_redis_connection(
+            redis_url, redis_sentinels, decode_responses=True, async_mode=True
+        )
+
+        # stream key -> {"events": [(seq, event)], "done": bool, "reset": bool}
+        # not yet written
+        self._pending: dict[str, dict] = {}
+        # stream key -> first sequence number of a new generation, until the
+        # events of the earlier one are deleted
+        self._resets: dict[str, tuple[int, int]] = {}
+        self._flush_tasks: dict[str, asyncio.Task] = {}
+
+    def _get_key(self, chat_id: str, message_id: str) -> str:
+        return f"{self.name}:{chat_id}:{message_id}"
+
+    def _schedule_flush(self, key: str):
+        if key not in self._flush_tasks:
+            self._flush_tasks[key] = asyncio.create_task(self._flush(key))
+
+    def start(self, chat_id: str, message_id: str):
+        # The earlier events are deleted by the flush task, in order with the
+        # writes of the earlier generation that are still pending
+        key = self._get_key(chat_id, message_id)
+        self._resets[key] = (int(time.time() * 1000), 0)
+        self._pending[key] = {"events": [], "done": False, "reset": True}
+        self._schedule_flush(key)
+
+    def append(
+        self, chat_id: str, message_id: str, event: dict, done: bool = False
+    ) -> str:
+        key = self._get_key(chat_id, message_id)
+        seq = self._next_seq(key, done)
+
+        pending = self._pending.setdefault(
+            key, {"events": [], "done": False, "reset": False}
+        )
+        self._add_event(pending["events"], seq, event)
+        pending["done"] = pending["done"] or done
+
+        self._schedule_flush(key)
+        return seq
+
+    async def _flush(self, key: str):
+        last_write = 0.0
         try:
-            return self[key]
-        except KeyError:
-            return default
-
-    def clear(self):
-        self.redis.delete(self.name)
-
-    def update(self, other=None, **kwargs):
-        if other is not None:
-            for k, v in other.items() if hasattr(other, "items") else other:
-                self[k] = v
-        for k, v in kwargs.items():
-            self[k] = v
-
-    def setdefault(self, key, default=None):
-        if key not in self:
-            self[key] = default
-        return self[key]
+            while key in self._pending:
+                pending = self._pending[key]
+                delay = last_write + self.flush_interval - time.monotonic()
+                if (
+                    delay > 0
+                    and not pending["done"]
+                    and not pending["reset"]
+                    and all(
+                        get_chat_event_kind(event) == "snapshot"
+                        for _, event in pending["events"]
+                    )
+                ):
+                    await asyncio.sleep(delay)
+                    continue
+
+                pending = self._pending.pop(key)
+                pipe = self.redis.pipeline(transaction=False)
+                if pending["reset"]:
+                    pipe.delete(key, f"{key}:done")
+                for seq, event in pending["events"]:
+                    pipe.xadd(
+                        key,
+                        {"event": json.dumps(event)},
+                        id=seq,
+                        maxlen=self.maxlen,
+                        approximate=True,
+                    )
+                if pending["done"]:
+                    pipe.set(f"{key}:done", 1, ex=self.finished_ttl)
+                    pipe.expire(key, self.finished_ttl)
+                else:
+                    pipe.expire(key, self.ttl)
+
+                last_write = time.monotonic()
+                reset = self._resets.get(key) if pending["reset"] else None
+                try:
+                    await pipe.execute()
+                    if reset and self._resets.get(key) == reset:
+                        del self._resets[key]
+                except Exception as e:
+                    log.warning(f"Error writing chat events to {key}: {e}")
+        finally:
+            self._flush_tasks.pop(key, None)
+
+    async def read(
+        self, chat_id: str, message_id: str, after: Optional[str] = None
+    ) -> tuple[list[tuple[str, dict]], bool]:
+        key = self._get_key(chat_id, message_id)
+
+        # XRANGE is inclusive, so start right after the last entry seen
+        if after:
+            ms, n = parse_seq(after)
+            start = f"{ms}-{n + 1}"
+        else:
+            start = "-"
+
+        pipe = self.redis.pipeline(transaction=False)
+        pipe.xrange(key, min=start)
+        pipe.exists(key)
+        pipe.exists(f"{key}:done")
+        entries, exists, finished = await pipe.execute()
+
+        events = [(seq, json.loads(fields["event"])) for seq, fields in entries]
+        done = not exists or bool(finished)
+
+        reset = self._resets.get(key)
+        if reset:
+            # The events of the earlier generation may not be deleted yet
+            events = [(seq, event) for seq, event in events if parse_seq(seq) >= reset]
+            done = False
+
+        # Include the events generated on this node that are not written yet
+        pending = self._pending.get(key)
+        if pending:
+            after_seq = parse_seq(events[-1][0] if events else after or "0-0")
+            events += [
+                (seq, event)
+                for seq, event in pending["events"]
+                if parse_seq(seq) > after_seq
+            ]
+            done = pending["done"]
+        return events, done
+
+
+class ChannelMembershipIndex:
+    """
+    In-memory index of the channels each user can read (user id -> channel
+    ids), so sockets do not scan every channel's access control on join.
+
+    Every invalidation bumps a version; an entry computed before it is not
+    stored, so a slow lookup cannot bring back stale membership.
+    """
+
+    def __init__(self, ttl=30):
+        self.ttl = ttl
+        self._index: dict[str, tuple[float, list[str]]] = {}
+        self._version = 0
+
+    async def get(self, user_id: str) -> tuple[Optional[list[str]], int]:
+        """Returns the user's channel ids, if indexed, and the index version."""
+        entry = self._index.get(user_id)
+        if entry and entry[0] > time.monotonic():
+            return entry[1], self._version
+        return None, self._version
+
+    async def set(self, user_id: str, channel_ids: list[str], version: int):
+        if version == self._version:
+            self._index[user_id] = (time.monotonic() + self.ttl, channel_ids)
+
+    async def invalidate(self, user_ids: Optional[list[str]] = None):
+        self._version += 1
+        if user_ids is None:
+            self._index.clear()
+        else:
+            for user_id in user_ids:
+                self._index.pop(user_id, None)
+
+
+class RedisChannelMembershipIndex(ChannelMembershipIndex):
+    """
+    Channel membership index stored as one Redis key per user, shared by
+    every node. Each entry expires on its own after `ttl` seconds.
+
+    Entries are tagged with an epoch, which is bumped to invalidate every
+    entry at once without scanning for their keys.
+    """
+
+    # Stores an entry only if no invalidation happened since it was computed
+    SET_SCRIPT = """
+        if tonumber(redis.call('GET', KEYS[2]) or '0') ~= tonumber(ARGV[1]) then
+            return 0
+        end
+        local epoch = redis.call('GET', KEYS[3]) or '0'
+        redis.call('SET', KEYS[1], epoch .. ':' .. ARGV[2], 'EX', ARGV[3])
+        return 1
+    """
+
+    def __init__(self, name, redis_url, redis_sentinels=[], ttl=30):
+        self.name = name
+        self.version_key = f"{name}:version"
+        self.epoch_key = f"{name}:epoch"
+        self.ttl = ttl
+        self.redis = get_redis_connection(
+            redis_url, redis_sentinels, decode_responses=True, async_mode=True
+        )
+        self._set_script = self.redis.register_script(self.SET_SCRIPT)
+
+    def _get_user_key(self, user_id: str) -> str:
+        return f"{self.name}:user:{user_id}"
+
+    async def get(self, user_id: str) -> tuple[Optional[list[str]], int]:
+        pipe = self.redis.pipeline(transaction=False)
+        pipe.get(self._get_user_key(user_id))
+        pipe.get(self.epoch_key)
+        pipe.get(self.version_key)
+        value, epoch, version = await pipe.execute()
+
+        channel_ids = None
+        if value is not None:
+            entry_epoch, channel_ids = value.split(":", 1)
+            channel_ids = (
+                json.loads(channel_ids) if entry_epoch == (epoch or "0") else None
+            )
+        return channel_ids, int(version or 0)
+
+    async def set(self, user_id: str, channel_ids: list[str], version: int):
+        await self._set_script(
+            keys=[self._get_user_key(user_id), self.version_key, self.epoch_key],
+            args=[version, json.dumps(channel_ids), max(int(self.ttl), 1)],
+        )
+
+    async def invalidate(self, user_ids: Optional[list[str]] = None):
+        pipe = self.redis.pipeline(transaction=True)
+        pipe.incr(self.version_key)
+        if user_ids is None:
+            pipe.incr(self.epoch_key)
+        elif user_ids:
+            pipe.delete(*[self._get_user_key(user_id) for user_id in user_ids])
+        await pipe.execute()
+
+
+outbound_events_coalesced = metrics.counter("websocket.outbound.coalesced")
+outbound_events_dropped = metrics.counter("websocket.outbound.dropped")
+
+
+class OutboundEventQueue:
+    """
+    Bounded queue of the chat events waiting to be sent to one session. It is
+    drained by its own task, so a slow client never holds up the generation.
+
+    A content snapshot supersedes the snapshot of the same message still
+    waiting in the queue, and deltas are merged into a delta of the same
+    message at its tail.
+
+    Once the queue is full, the queued events of the message with the oldest
+    event are replaced by a "chat:resync" event, and its further events are
+    dropped until that is sent. The client then fetches what it missed from
+    the message's event stream with chat:resume.
+    """
+
+    def __init__(
+        self,
+        send: Callable[[dict], Awaitable],
+        maxsize: int = 256,
+        on_empty: Optional[Callable[[], None]] = None,
+    ):
+        self.send = send
+        self.maxsize = maxsize
+        self.on_empty = on_empty
+
+        self._events = deque()
+        self._task = None
+
+        # (chat id, message id) of the messages waiting for a resync event
+        self._resyncing: set[tuple] = set()
+
+    def __len__(self):
+        return len(self._events)
+
+    @staticmethod
+    def _get_message_key(event: dict) -> tuple:
+        return event.get("chat_id"), event.get("message_id")
+
+    @staticmethod
+    def _is_resync(event: dict) -> bool:
+        return event.get("data", {}).get("type") == "chat:resync"
+
+    def _resync_oldest(self) -> bool:
+        """Replaces the events of the message with the oldest resumable event."""
+        oldest = next((event for event in self._events if event.get("seq")), None)
+        if oldest is None:
+            return False
+
+        key = self._get_message_key(oldest)
+        events = deque()
+        for event in self._events:
+            if event.get("seq") and self._get_message_key(event) == key:
+                outbound_events_dropped.inc()
+                if event is oldest:
+                    events.append(
+                        {
+                            "chat_id": key[0],
+                            "message_id": key[1],
+                            "data": {"type": "chat:resync"},
+                        }
+                    )
+            else:
+                events.append(event)
+
+        self._events = events
+        self._resyncing.add(key)
+        return True
+
+    def _coalesce(self, event: dict) -> bool:
+        kind = get_chat_event_kind(event)
+        if not kind or not self._events:
+            return False
+
+        def is_same_message(queued):
+            return (
+                get_chat_event_kind(queued) == kind
+                and queued.get("chat_id") == event.get("chat_id")
+                and queued.get("message_id") == event.get("message_id")
+            )
+
+        if kind == "delta":
+            tail = self._events[-1]
+            if not is_same_message(tail):
+                return False
+
+            delta = event["data"]["data"]
+            content = tail["data"]["data"].get("content", "") + delta.get("content", "")
+            self._events[-1] = {
+                **event,
+                "data": {**event["data"], "data": {**delta, "content": content}},
+            }
+            return True
+
+        # Moved to the tail, so events keep the order of their sequence numbers
+        for i in range(len(self._events) - 1, -1, -1):
+            if is_same_message(self._events[i]):
+                del self._events[i]
+                self._events.append(event)
+                return True
+        return False
+
+    def put(self, event: dict):
+        if event.get("seq") and self._get_message_key(event) in self._resyncing:
+            # Fetched by the client once it gets the resync event
+            outbound_events_dropped.inc()
+        elif self._coalesce(event):
+            outbound_events_coalesced.inc()
+        else:
+            while len(self._events) >= self.maxsize and self._resync_oldest():
+                pass
+            self._events.append(event)
+
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._drain())
+
+    async def _drain(self):
+        while self._events:
+            event = self._events.popleft()
+            if self._is_resync(event):
+                self._resyncing.discard(self._get_message_key(event))
+            try:
+                await self.send(event)
+            except Exception as e:
+                log.debug(f"Error sending event: {e}")
+
+        if self.on_empty:
+            self.on_empty()
+
+    def close(self):
+        self._events.clear()
+        self._resyncing.clear()
+        if self._task:
+            self._task.cancel()
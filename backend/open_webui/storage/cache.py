@@ -0,0 +1,189 @@
+import hashlib
+import logging
+import os
+import shutil
+import threading
+import uuid
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Callable, Iterator
+
+from open_webui.env import SRC_LOG_LEVELS
+from open_webui.utils import metrics
+from open_webui.utils.file_cache import DiskCache
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["MAIN"])
+
+
+def _digest(value: str) -> str:
+    return hashlib.sha256(value.encode()).hexdigest()
+
+
+class StorageCache(DiskCache):
+    """
+    Read-through disk cache for objects kept in cloud storage.
+
+    Each version of an object (its ETag or generation) is stored under
+    `<cache_dir>/<sha256(key)>/<sha256(version)>/<filename>`, so a changed
+    object is downloaded again while an unchanged one is served from disk.
+    Entries are evicted least recently used first once they take up more than
+    `max_size` bytes. Concurrent requests for the same version share a single
+    download.
+    """
+
+    def __init__(self, cache_dir: str, max_size: int):
+        super().__init__(cache_dir, max_size, name="storage.cache")
+        self.cache_dir = str(cache_dir)
+
+        self._downloads: dict[str, tuple[threading.Lock, int]] = {}
+        self.coalesced = metrics.counter("storage.cache.coalesced")
+
+    def _key_dir(self, key: str) -> str:
+        return os.path.join(self.cache_dir, _digest(key)[:32])
+
+    def _entry_dir(self, key: str, version: str) -> str:
+        return os.path.join(self._key_dir(key), _digest(version)[:16])
+
+    def _scan_entries(self) -> Iterator[tuple[str, float, int]]:
+        if not os.path.isdir(self.cache_dir):
+            return
+
+        for key_dir in os.scandir(self.cache_dir):
+            if not key_dir.is_dir():
+                continue
+            for entry_dir in os.scandir(key_dir.path):
+                if not entry_dir.is_dir():
+                    continue
+                try:
+                    files = [
+                        f.stat()
+                        for f in os.scandir(entry_dir.path)
+                        if f.is_file() and not f.name.endswith(".part")
+                    ]
+                except FileNotFoundError:
+                    continue
+                yield (
+                    entry_dir.path,
+                    max([f.st_mtime for f in files], default=0),
+                    sum(f.st_size for f in files),
+                )
+
+    def _remove_entry(self, entry_dir: str):
+        shutil.rmtree(entry_dir, ignore_errors=True)
+        try:
+            # Drop the object's directory once its last version is gone
+            os.rmdir(os.path.dirname(entry_dir))
+        except OSError:
+            pass
+
+    def _forget(self, path: str):
+        """Drops an entry, or all entries of an object, from the index."""
+        with self._lock:
+            if self._entries is None:
+                return
+            for entry_dir in [
+                e for e in self._entries if e == path or e.startswith(path + os.sep)
+            ]:
+                self._size -= self._entries.pop(entry_dir)[1]
+
+    @contextmanager
+    def _download_lock(self, entry_dir: str):
+        with self._lock:
+            lock, waiters = self._downloads.get(entry_dir, (threading.Lock(), 0))
+            self._downloads[entry_dir] = (lock, waiters + 1)
+        try:
+            with lock:
+                yield
+        finally:
+            with self._lock:
+                lock, waiters = self._downloads[entry_dir]
+                if waiters == 1:
+                    del self._downloads[entry_dir]
+                else:
+                    self._downloads[entry_dir] = (lock, waiters - 1)
+
+    def get(
+        self,
+        key: str,
+        version: str,
+        filename: str,
+        download: Callable[[str], None],
+    ) -> str:
+        """
+        Returns the local path of `version` of the object `key`, calling
+        `download(path)` to fetch it on a miss.
+        """
+        entry_dir = self._entry_dir(key, version)
+        path = os.path.join(entry_dir, filename)
+
+        if os.path.isfile(path):
+            self.hits.inc()
+            self._touch(entry_dir, path)
+            return path
+
+        with self._download_lock(entry_dir):
+            # Downloaded by another request while this one was waiting
+            if os.path.isfile(path):
+                self.coalesced.inc()
+                self._touch(entry_dir, path)
+                return path
+
+            self.misses.inc()
+
+            # Older versions of the object are stale now
+            key_dir = self._key_dir(key)
+            if os.path.isdir(key_dir):
+                for stale in os.scandir(key_dir):
+                    if stale.path != entry_dir:
+                        self._forget(stale.path)
+                        shutil.rmtree(stale.path, ignore_errors=True)
+
+            os.makedirs(entry_dir, exist_ok=True)
+            part_path = f"{path}.{uuid.uuid4().hex}.part"
+            try:
+                download(part_path)
+                os.replace(part_path, path)
+            except BaseException:
+                if os.path.exists(part_path):
+                    os.remove(part_path)
+                raise
+
+        self._add(entry_dir, os.path.getsize(path))
+        return path
+
+    def put(self, key: str, version: str, filename: str, source_path: str):
+        """
+        Seeds the cache with a local copy of a just uploaded object, linking
+        rather than copying it where the filesystem allows.
+        """
+        entry_dir = self._entry_dir(key, version)
+        path = os.path.join(entry_dir, filename)
+
+        try:
+            os.makedirs(entry_dir, exist_ok=True)
+            try:
+                os.link(source_path, path)
+            except FileExistsError:
+                pass
+            except OSError:
+                shutil.copyfile(source_path, path)
+        except OSError as e:
+            log.warning(f"Unable to cache {key}: {e}")
+            return
+
+        self._add(entry_dir, os.path.getsize(path))
+
+    def delete(self, key: str):
+        key_dir = self._key_dir(key)
+        self._forget(key_dir)
+        shutil.rmtree(key_dir, ignore_errors=True)
+
+    def clear(self):
+        with self._lock:
+            self._entries = OrderedDict()
+            self._size = 0
+
+        if os.path.isdir(self.cache_dir):
+            for entry in os.scandir(self.cache_dir):
+                shutil.rmtree(entry.path, ignore_errors=True)
@@ -1,11 +1,17 @@
 import os
 import shutil
 import json
+import asyncio
+import hashlib
 import logging
 from abc import ABC, abstractmethod
-from typing import BinaryIO, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from functools import partial
+from typing import BinaryIO, Optional, Tuple
 
 import boto3
+from boto3.s3.transfer import TransferConfig
 from botocore.config import Config
 from botocore.exceptions import ClientError
 from open_webui.config import (
@@ -22,21 +28,40 @@ from open_webui.config import (
     AZURE_STORAGE_ENDPOINT,
     AZURE_STORAGE_CONTAINER_NAME,
     AZURE_STORAGE_KEY,
+    STORAGE_CACHE_DIR,
+    STORAGE_CACHE_MAX_SIZE,
     STORAGE_PROVIDER,
+    STORAGE_THREAD_POOL_SIZE,
+    STORAGE_UPLOAD_CHUNK_SIZE,
     UPLOAD_DIR,
 )
 from google.cloud import storage
 from google.cloud.exceptions import GoogleCloudError, NotFound
 from open_webui.constants import ERROR_MESSAGES
 from azure.identity import DefaultAzureCredential
-from azure.storage.blob import BlobServiceClient
+from azure.storage.blob import (
+    BlobSasPermissions,
+    BlobServiceClient,
+    generate_blob_sas,
+)
+from azure.core import MatchConditions
 from azure.core.exceptions import ResourceNotFoundError
 from open_webui.env import SRC_LOG_LEVELS
-
+from open_webui.storage.cache import StorageCache
 
 log = logging.getLogger(__name__)
 log.setLevel(SRC_LOG_LEVELS["MAIN"])
 
+# The storage SDKs are blocking, the async methods run them on this bounded pool
+executor = ThreadPoolExecutor(
+    max_workers=STORAGE_THREAD_POOL_SIZE, thread_name_prefix="storage"
+)
+
+
+def batched(items: list, size: int):
+    for i in range(0, len(items), size):
+        yield items[i : i + size]
+
 
 class StorageProvider(ABC):
     @abstractmethod
@@ -44,7 +69,9 @@ class StorageProvider(ABC):
         pass
 
     @abstractmethod
-    def upload_file(self, file: BinaryIO, filename: str) -> Tuple[bytes, str]:
+    def upload_file(
+        self, file: BinaryIO, filename: str, max_size: Optional[int] = None
+    ) -> Tuple[dict, str]:
         pass
 
     @abstractmethod
@@ -55,17 +82,83 @@ class StorageProvider(ABC):
     def delete_file(self, file_path: str) -> None:
         pass
 
+    def delete_files(self, file_paths: list[str]) -> None:
+        """Handles deletion of several files, batched where the backend allows."""
+        for file_path in file_paths:
+            self.delete_file(file_path)
+
+    def get_presigned_url(
+        self,
+        file_path: str,
+        expires_in: int,
+        content_type: Optional[str] = None,
+        content_disposition: Optional[str] = None,
+    ) -> Optional[str]:
+        """
+        Returns a URL to download the file directly from the storage backend
+        for `expires_in` seconds, or None if the provider cannot sign one.
+        """
+        return None
+
+    async def _run(self, func, *args, **kwargs):
+        return await asyncio.get_running_loop().run_in_executor(
+            executor, partial(func, *args, **kwargs)
+        )
+
+    async def get_file_async(self, file_path: str) -> str:
+        return await self._run(self.get_file, file_path)
+
+    async def upload_file_async(
+        self, file: BinaryIO, filename: str, max_size: Optional[int] = None
+    ) -> Tuple[dict, str]:
+        return await self._run(self.upload_file, file, filename, max_size)
+
+    async def delete_file_async(self, file_path: str) -> None:
+        await self._run(self.delete_file, file_path)
+
+    async def delete_files_async(self, file_paths: list[str]) -> None:
+        await self._run(self.delete_files, file_paths)
+
+    async def delete_all_files_async(self) -> None:
+        await self._run(self.delete_all_files)
+
 
 class LocalStorageProvider(StorageProvider):
     @staticmethod
-    def upload_file(file: BinaryIO, filename: str) -> Tuple[bytes, str]:
-        contents = file.read()
-        if not contents:
-            raise ValueError(ERROR_MESSAGES.EMPTY_CONTENT)
+    def upload_file(
+        file: BinaryIO, filename: str, max_size: Optional[int] = None
+    ) -> Tuple[dict, str]:
+        """
+        Copies the file to local storage chunk by chunk, computing its size and
+        SHA-256 on the way. Returns them along with the local path.
+        """
         file_path = f"{UPLOAD_DIR}/{filename}"
-        with open(file_path, "wb") as f:
-            f.write(contents)
-        return contents, file_path
+        size = 0
+        sha256 = hashlib.sha256()
+
+        try:
+            with open(file_path, "wb") as f:
+                while chunk := file.read(STORAGE_UPLOAD_CHUNK_SIZE):
+                    size += len(chunk)
+                    if max_size is not None and size > max_size:
+                        raise ValueError(
+                            ERROR_MESSAGES.FILE_TOO_LARGE(
+                                f"{max_size / (1024 * 1024):g} MB"
+                            )
+                        )
+
+                    sha256.update(chunk)
+                    f.write(chunk)
+
+            if not size:
+                raise ValueError(ERROR_MESSAGES.EMPTY_CONTENT)
+        except BaseException:
+            # Do not leave partial uploads behind
+            if os.path.isfile(file_path):
+                os.remove(file_path)
+            raise
+
+        return {"size": size, "sha256": sha256.hexdigest()}, file_path
 
     @staticmethod
     def get_file(file_path: str) -> str:
@@ -131,16 +224,30 @@ class S3StorageProvider(StorageProvider):
         self.bucket_name = S3_BUCKET_NAME
         self.key_prefix = S3_KEY_PREFIX if S3_KEY_PREFIX else ""
 
-    def upload_file(self, file: BinaryIO, filename: str) -> Tuple[bytes, str]:
+        # Files larger than a chunk are sent in a multipart upload, S3 parts are at least 5 MiB
+        chunk_size = max(STORAGE_UPLOAD_CHUNK_SIZE, 5 * 1024 * 1024)
+        self.transfer_config = TransferConfig(
+            multipart_threshold=chunk_size, multipart_chunksize=chunk_size
+        )
+        self.cache = StorageCache(STORAGE_CACHE_DIR, STORAGE_CACHE_MAX_SIZE)
+
+    def upload_file(
+        self, file: BinaryIO, filename: str, max_size: Optional[int] = None
+    ) -> Tuple[dict, str]:
         """Handles uploading of the file to S3 storage."""
-        _, file_path = LocalStorageProvider.upload_file(file, filename)
+        meta, file_path = LocalStorageProvider.upload_file(file, filename, max_size)
         try:
             s3_key = os.path.join(self.key_prefix, filename)
-            self.s3_client.upload_file(file_path, self.bucket_name, s3_key)
-            return (
-                open(file_path, "rb").read(),
-                "s3://" + self.bucket_name + "/" + s3_key,
+            self.s3_client.upload_file(
+                file_path, self.bucket_name, s3_key, Config=self.transfer_config
             )
+            s3_file_path = "s3://" + self.bucket_name + "/" + s3_key
+
+            etag = self.s3_client.head_object(Bucket=self.bucket_name, Key=s3_key)[
+                "ETag"
+            ]
+            self.cache.put(s3_file_path, etag, filename, file_path)
+            return meta, s3_file_path
         except ClientError as e:
             raise RuntimeError(f"Error uploading file to S3: {e}")
 
@@ -148,12 +255,41 @@ class S3StorageProvider(StorageProvider):
         """Handles downloading of the file from S3 storage."""
         try:
             s3_key = self._extract_s3_key(file_path)
-            local_file_path = self._get_local_file_path(s3_key)
-            self.s3_client.download_file(self.bucket_name, s3_key, local_file_path)
-            return local_file_path
+            etag = self.s3_client.head_object(Bucket=self.bucket_name, Key=s3_key)[
+                "ETag"
+            ]
+            return self.cache.get(
+                file_path,
+                etag,
+                self._get_local_file_path(s3_key).split("/")[-1],
+                lambda path: self.s3_client.download_file(
+                    self.bucket_name, s3_key, path, ExtraArgs={"IfMatch": etag}
+                ),
+            )
         except ClientError as e:
             raise RuntimeError(f"Error downloading file from S3: {e}")
 
+    def get_presigned_url(
+        self,
+        file_path: str,
+        expires_in: int,
+        content_type: Optional[str] = None,
+        content_disposition: Optional[str] = None,
+    ) -> Optional[str]:
+        params = {"Bucket": self.bucket_name, "Key": self._extract_s3_key(file_path)}
+        if content_type:
+            params["ResponseContentType"] = content_type
+        if content_disposition:
+            params["ResponseContentDisposition"] = content_disposition
+
+        try:
+            return self.s3_client.generate_presigned_url(
+                "get_object", Params=params, ExpiresIn=expires_in
+            )
+        except ClientError as e:
+            log.warning(f"Unable to presign {file_path}: {e}")
+            return None
+
     def delete_file(self, file_path: str) -> None:
         """Handles deletion of the file from S3 storage."""
         try:
@@ -164,25 +300,50 @@ class S3StorageProvider(StorageProvider):
 
         # Always delete from local storage
         LocalStorageProvider.delete_file(file_path)
+        self.cache.delete(file_path)
+
+    def _delete_keys(self, keys: list[str]) -> None:
+        # DeleteObjects takes up to 1000 keys per request
+        for batch in batched(keys, 1000):
+            response = self.s3_client.delete_objects(
+                Bucket=self.bucket_name,
+                Delete={"Objects": [{"Key": key} for key in batch], "Quiet": True},
+            )
+            errors = response.get("Errors", [])
+            if errors:
+                raise RuntimeError(
+                    f"Error deleting {len(errors)} files from S3: {errors[0].get('Message')}"
+                )
+
+    def delete_files(self, file_paths: list[str]) -> None:
+        """Handles deletion of several files from S3 storage."""
+        try:
+            self._delete_keys([self._extract_s3_key(path) for path in file_paths])
+        except ClientError as e:
+            raise RuntimeError(f"Error deleting files from S3: {e}")
+
+        # Always delete from local storage
+        for file_path in file_paths:
+            LocalStorageProvider.delete_file(file_path)
+            self.cache.delete(file_path)
 
     def delete_all_files(self) -> None:
         """Handles deletion of all files from S3 storage."""
         try:
-            response = self.s3_client.list_objects_v2(Bucket=self.bucket_name)
-            if "Contents" in response:
-                for content in response["Contents"]:
-                    # Skip objects that were not uploaded from open-webui in the first place
-                    if not content["Key"].startswith(self.key_prefix):
-                        continue
-
-                    self.s3_client.delete_object(
-                        Bucket=self.bucket_name, Key=content["Key"]
-                    )
+            paginator = self.s3_client.get_paginator("list_objects_v2")
+            # Skip objects that were not uploaded from open-webui in the first place
+            for page in paginator.paginate(
+                Bucket=self.bucket_name, Prefix=self.key_prefix
+            ):
+                keys = [content["Key"] for content in page.get("Contents", [])]
+                if keys:
+                    self._delete_keys(keys)
         except ClientError as e:
             raise RuntimeError(f"Error deleting all files from S3: {e}")
 
         # Always delete from local storage
         LocalStorageProvider.delete_all_files()
+        self.cache.clear()
 
     # The s3 key is the name assigned to an object. It excludes the bucket name, but includes the internal path and the file name.
     def _extract_s3_key(self, full_file_path: str) -> str:
@@ -206,14 +367,23 @@ class GCSStorageProvider(StorageProvider):
             # if running on a Compute Engine instance, credentials would be from Google Metadata server
             self.gcs_client = storage.Client()
         self.bucket = self.gcs_client.bucket(GCS_BUCKET_NAME)
+        self.cache = StorageCache(STORAGE_CACHE_DIR, STORAGE_CACHE_MAX_SIZE)
 
-    def upload_file(self, file: BinaryIO, filename: str) -> Tuple[bytes, str]:
+    def upload_file(
+        self, file: BinaryIO, filename: str, max_size: Optional[int] = None
+    ) -> Tuple[dict, str]:
         """Handles uploading of the file to GCS storage."""
-        contents, file_path = LocalStorageProvider.upload_file(file, filename)
+        meta, file_path = LocalStorageProvider.upload_file(file, filename, max_size)
         try:
-            blob = self.bucket.blob(filename)
+            # A chunk size makes it a resumable upload, in multiples of 256 KiB
+            chunk_size = -(-STORAGE_UPLOAD_CHUNK_SIZE // (256 * 1024)) * (256 * 1024)
+            blob = self.bucket.blob(filename, chunk_size=chunk_size)
             blob.upload_from_filename(file_path)
-            return contents, "gs://" + self.bucket_name + "/" + filename
+            gcs_file_path = "gs://" + self.bucket_name + "/" + filename
+
+            # The upload response sets the generation of the new object
+            self.cache.put(gcs_file_path, str(blob.generation), filename, file_path)
+            return meta, gcs_file_path
         except GoogleCloudError as e:
             raise RuntimeError(f"Error uploading file to GCS: {e}")
 
@@ -221,14 +391,37 @@ class GCSStorageProvider(StorageProvider):
         """Handles downloading of the file from GCS storage."""
         try:
             filename = file_path.removeprefix("gs://").split("/")[1]
-            local_file_path = f"{UPLOAD_DIR}/{filename}"
             blob = self.bucket.get_blob(filename)
-            blob.download_to_filename(local_file_path)
+            if blob is None:
+                raise NotFound(f"{filename} not found in bucket {self.bucket_name}")
 
-            return local_file_path
+            # The blob is pinned to the generation just fetched
+            return self.cache.get(
+                file_path, str(blob.generation), filename, blob.download_to_filename
+            )
         except NotFound as e:
             raise RuntimeError(f"Error downloading file from GCS: {e}")
 
+    def get_presigned_url(
+        self,
+        file_path: str,
+        expires_in: int,
+        content_type: Optional[str] = None,
+        content_disposition: Optional[str] = None,
+    ) -> Optional[str]:
+        filename = file_path.removeprefix("gs://").split("/")[1]
+        try:
+            # Needs credentials able to sign, e.g. a service account key
+            return self.bucket.blob(filename).generate_signed_url(
+                version="v4",
+                expiration=timedelta(seconds=expires_in),
+                response_type=content_type,
+                response_disposition=content_disposition,
+            )
+        except Exception as e:
+            log.warning(f"Unable to presign {file_path}: {e}")
+            return None
+
     def delete_file(self, file_path: str) -> None:
         """Handles deletion of the file from GCS storage."""
         try:
@@ -240,20 +433,44 @@ class GCSStorageProvider(StorageProvider):
 
         # Always delete from local storage
         LocalStorageProvider.delete_file(file_path)
+        self.cache.delete(file_path)
+
+    def _delete_blobs(self, blobs: list) -> None:
+        # A batch request holds up to 100 calls
+        for batch in batched(blobs, 100):
+            with self.gcs_client.batch():
+                for blob in batch:
+                    blob.delete()
+
+    def delete_files(self, file_paths: list[str]) -> None:
+        """Handles deletion of several files from GCS storage."""
+        try:
+            self._delete_blobs(
+                [
+                    self.bucket.blob(path.removeprefix("gs://").split("/")[1])
+                    for path in file_paths
+                ]
+            )
+        except NotFound as e:
+            raise RuntimeError(f"Error deleting files from GCS: {e}")
+
+        # Always delete from local storage
+        for file_path in file_paths:
+            LocalStorageProvider.delete_file(file_path)
+            self.cache.delete(file_path)
 
     def delete_all_files(self) -> None:
         """Handles deletion of all files from GCS storage."""
         try:
-            blobs = self.bucket.list_blobs()
-
-            for blob in blobs:
-                blob.delete()
+            for page in self.bucket.list_blobs(page_size=1000).pages:
+                self._delete_blobs(list(page))
 
         except NotFound as e:
             raise RuntimeError(f"Error deleting all files from GCS: {e}")
 
         # Always delete from local storage
         LocalStorageProvider.delete_all_files()
+        self.cache.clear()
 
 
 class AzureStorageProvider(StorageProvider):
@@ -265,25 +482,44 @@ class AzureStorageProvider(StorageProvider):
         if storage_key:
             # Configure using the Azure Storage Account Endpoint and Key
             self.blob_service_client = BlobServiceClient(
-                account_url=self.endpoint, credential=storage_key
+                account_url=self.endpoint,
+                credential=storage_key,
+                max_single_put_size=STORAGE_UPLOAD_CHUNK_SIZE,
+                max_block_size=STORAGE_UPLOAD_CHUNK_SIZE,
             )
         else:
             # Configure using the Azure Storage Account Endpoint and DefaultAzureCredential
             # If the key is not configured, then the DefaultAzureCredential will be used to support Managed Identity authentication
             self.blob_service_client = BlobServiceClient(
-                account_url=self.endpoint, credential=DefaultAzureCredential()
+                account_url=self.endpoint,
+                credential=DefaultAzureCredential(),
+                max_single_put_size=STORAGE_UPLOAD_CHUNK_SIZE,
+                max_block_size=STORAGE_UPLOAD_CHUNK_SIZE,
             )
         self.container_client = self.blob_service_client.get_container_client(
             self.container_name
         )
+        self.cache = StorageCache(STORAGE_CACHE_DIR, STORAGE_CACHE_MAX_SIZE)
 
-    def upload_file(self, file: BinaryIO, filename: str) -> Tuple[bytes, str]:
+    def upload_file(
+        self, file: BinaryIO, filename: str, max_size: Optional[int] = None
+    ) -> Tuple[dict, str]:
         """Handles uploading of the file to Azure Blob Storage."""
-        contents, file_path = LocalStorageProvider.upload_file(file, filename)
+        meta, file_path = LocalStorageProvider.upload_file(file, filename, max_size)
         try:
             blob_client = self.container_client.get_blob_client(filename)
-            blob_client.upload_blob(contents, overwrite=True)
-            return contents, f"{self.endpoint}/{self.container_name}/{filename}"
+            # Streamed from disk, larger files are staged as blocks and committed
+            with open(file_path, "rb") as f:
+                result = blob_client.upload_blob(
+                    f,
+                    length=meta["size"],
+                    overwrite=True,
+                    max_concurrency=4,
+                )
+            azure_file_path = f"{self.endpoint}/{self.container_name}/{filename}"
+
+            self.cache.put(azure_file_path, str(result["etag"]), filename, file_path)
+            return meta, azure_file_path
         except Exception as e:
             raise RuntimeError(f"Error uploading file to Azure Blob Storage: {e}")
 
@@ -291,14 +527,43 @@ class AzureStorageProvider(StorageProvider):
         """Handles downloading of the file from Azure Blob Storage."""
         try:
             filename = file_path.split("/")[-1]
-            local_file_path = f"{UPLOAD_DIR}/{filename}"
             blob_client = self.container_client.get_blob_client(filename)
-            with open(local_file_path, "wb") as download_file:
-                download_file.write(blob_client.download_blob().readall())
-            return local_file_path
+            etag = blob_client.get_blob_properties().etag
+
+            def download(path):
+                with open(path, "wb") as download_file:
+                    blob_client.download_blob(
+                        etag=etag, match_condition=MatchConditions.IfNotModified
+                    ).readinto(download_file)
+
+            return self.cache.get(file_path, str(etag), filename, download)
         except ResourceNotFoundError as e:
             raise RuntimeError(f"Error downloading file from Azure Blob Storage: {e}")
 
+    def get_presigned_url(
+        self,
+        file_path: str,
+        expires_in: int,
+        content_type: Optional[str] = None,
+        content_disposition: Optional[str] = None,
+    ) -> Optional[str]:
+        # A SAS token is signed with the account key
+        if not AZURE_STORAGE_KEY:
+            return None
+
+        filename = file_path.split("/")[-1]
+        sas_token = generate_blob_sas(
+            account_name=self.blob_service_client.account_name,
+            container_name=self.container_name,
+            blob_name=filename,
+            account_key=AZURE_STORAGE_KEY,
+            permission=BlobSasPermissions(read=True),
+            expiry=datetime.now(timezone.utc) + timedelta(seconds=expires_in),
+            content_type=content_type,
+            content_disposition=content_disposition,
+        )
+        return f"{self.endpoint}/{self.container_name}/{filename}?{sas_token}"
+
     def delete_file(self, file_path: str) -> None:
         """Handles deletion of the file from Azure Blob Storage."""
         try:
@@ -310,18 +575,44 @@ class AzureStorageProvider(StorageProvider):
 
         # Always delete from local storage
         LocalStorageProvider.delete_file(file_path)
+        self.cache.delete(file_path)
+
+    def _delete_blobs(self, names: list[str]) -> None:
+        # A batch request holds up to 256 deletes
+        for batch in batched(names, 256):
+            responses = self.container_client.delete_blobs(
+                *batch, raise_on_any_failure=False
+            )
+            failed = [r for r in responses if r.status_code not in (202, 404)]
+            if failed:
+                raise RuntimeError(
+                    f"{len(failed)} deletes failed with status {failed[0].status_code}"
+                )
+
+    def delete_files(self, file_paths: list[str]) -> None:
+        """Handles deletion of several files from Azure Blob Storage."""
+        try:
+            self._delete_blobs([path.split("/")[-1] for path in file_paths])
+        except Exception as e:
+            raise RuntimeError(f"Error deleting files from Azure Blob Storage: {e}")
+
+        # Always delete from local storage
+        for file_path in file_paths:
+            LocalStorageProvider.delete_file(file_path)
+            self.cache.delete(file_path)
 
     def delete_all_files(self) -> None:
         """Handles deletion of all files from Azure Blob Storage."""
         try:
-            blobs = self.container_client.list_blobs()
-            for blob in blobs:
-                self.container_client.delete_blob(blob.name)
+            self._delete_blobs(
+                [blob.name for blob in self.container_client.list_blobs()]
+            )
         except Exception as e:
             raise RuntimeError(f"Error deleting all files from Azure Blob Storage: {e}")
 
         # Always delete from local storage
         LocalStorageProvider.delete_all_files()
+        self.cache.clear()
 
 
 def get_storage_provider(storage_provider: str):
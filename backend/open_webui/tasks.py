@@ -1,24 +1,102 @@
 # tasks.py
 import asyncio
-from typing import Dict
+import json
+import logging
+import time
+from typing import Dict, Optional
 from uuid import uuid4
 
+from open_webui.env import (
+    REDIS_URL,
+    REDIS_SENTINEL_HOSTS,
+    REDIS_SENTINEL_PORT,
+    SRC_LOG_LEVELS,
+)
+from open_webui.utils.redis import get_redis_connection, get_sentinels_from_env
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["MAIN"])
+
 # A dictionary to keep track of active tasks
 tasks: Dict[str, asyncio.Task] = {}
 
+# Owner and chat of each active task on this node
+task_infos: Dict[str, dict] = {}
+
+# Identifies this process in the cluster-wide task registry
+NODE_ID = str(uuid4())
+
+REDIS_TASKS_KEY = "open-webui:tasks"
+REDIS_TASKS_CANCEL_CHANNEL = "open-webui:tasks:cancel"
+REDIS_NODE_KEY_PREFIX = "open-webui:tasks:node"
+
+# A node whose heartbeat is older than this is considered gone and its tasks orphaned
+NODE_HEARTBEAT_INTERVAL = 10
+NODE_HEARTBEAT_TTL = 3 * NODE_HEARTBEAT_INTERVAL
+
+redis = (
+    get_redis_connection(
+        REDIS_URL,
+        get_sentinels_from_env(REDIS_SENTINEL_HOSTS, REDIS_SENTINEL_PORT),
+        decode_responses=True,
+        async_mode=True,
+    )
+    if REDIS_URL
+    else None
+)
+
+
+async def register_task(task_id: str, user_id: Optional[str], chat_id: Optional[str]):
+    """
+    Record a task in the cluster-wide registry so any node can list and stop it.
+    """
+    task_infos[task_id] = {
+        "node_id": NODE_ID,
+        "user_id": user_id,
+        "chat_id": chat_id,
+        "created_at": int(time.time()),
+    }
+
+    if not redis:
+        return
+
+    try:
+        await redis.hset(REDIS_TASKS_KEY, task_id, json.dumps(task_infos[task_id]))
+    except Exception as e:
+        log.warning(f"Unable to register task {task_id}: {e}")
+
+
+async def unregister_task(task_id: str):
+    if not redis:
+        return
+
+    try:
+        await redis.hdel(REDIS_TASKS_KEY, task_id)
+    except Exception as e:
+        log.warning(f"Unable to unregister task {task_id}: {e}")
+
 
 def cleanup_task(task_id: str):
     """
     Remove a completed or canceled task from the global `tasks` dictionary.
     """
     tasks.pop(task_id, None)  # Remove the task if it exists
+    task_infos.pop(task_id, None)
 
+    if redis:
+        asyncio.ensure_future(unregister_task(task_id))
 
-def create_task(coroutine):
+
+async def create_task(
+    coroutine, user_id: Optional[str] = None, chat_id: Optional[str] = None
+):
     """
     Create a new asyncio task and add it to the global task dictionary.
     """
     task_id = str(uuid4())  # Generate a unique ID for the task
+
+    # Register before starting, so a fast task cannot unregister before it is registered
+    await register_task(task_id, user_id, chat_id)
     task = asyncio.create_task(coroutine)  # Create the task
 
     # Add a done callback for cleanup
@@ -35,20 +113,54 @@ def get_task(task_id: str):
     return tasks.get(task_id)
 
 
-def list_tasks():
+async def get_task_info(task_id: str) -> Optional[dict]:
     """
-    List all currently active task IDs.
+    Retrieve the registry entry (node, owner and chat) of a task running on any node.
     """
-    return list(tasks.keys())
+    if not redis:
+        return task_infos.get(task_id)
 
+    value = await redis.hget(REDIS_TASKS_KEY, task_id)
+    return json.loads(value) if value else None
 
-async def stop_task(task_id: str):
+
+async def get_task_infos() -> Dict[str, dict]:
+    if not redis:
+        return dict(task_infos)
+
+    return {
+        task_id: json.loads(value)
+        for task_id, value in (await redis.hgetall(REDIS_TASKS_KEY)).items()
+    }
+
+
+async def list_tasks(user_id: Optional[str] = None):
     """
-    Cancel a running task and remove it from the global task list.
+    List all currently active task IDs, optionally only the ones owned by a user.
+    """
+    return [
+        task_id
+        for task_id, info in (await get_task_infos()).items()
+        if user_id is None or info.get("user_id") == user_id
+    ]
+
+
+async def list_task_ids_by_chat_id(chat_id: str, user_id: Optional[str] = None):
+    """
+    List the IDs of the active tasks generating into a chat.
     """
+    return [
+        task_id
+        for task_id, info in (await get_task_infos()).items()
+        if info.get("chat_id") == chat_id
+        and (user_id is None or info.get("user_id") == user_id)
+    ]
+
+
+async def cancel_local_task(task_id: str) -> bool:
     task = tasks.get(task_id)
     if not task:
-        raise ValueError(f"Task with ID {task_id} not found.")
+        return False
 
     task.cancel()  # Request task cancellation
     try:
@@ -56,6 +168,109 @@ async def stop_task(task_id: str):
     except asyncio.CancelledError:
         # Task successfully canceled
         tasks.pop(task_id, None)  # Remove it from the dictionary
-        return {"status": True, "message": f"Task {task_id} successfully stopped."}
+        task_infos.pop(task_id, None)
+        return True
+
+    return False
+
+
+async def stop_task(task_id: str):
+    """
+    Cancel a running task and remove it from the global task list.
+    Tasks running on another node are cancelled through the Redis cancel channel.
+    """
+    if task_id in tasks:
+        if await cancel_local_task(task_id):
+            return {"status": True, "message": f"Task {task_id} successfully stopped."}
+        return {"status": False, "message": f"Failed to stop task {task_id}."}
+
+    info = await get_task_info(task_id) if redis else None
+    if not info:
+        raise ValueError(f"Task with ID {task_id} not found.")
+
+    receivers = await redis.publish(REDIS_TASKS_CANCEL_CHANNEL, task_id)
+    if receivers:
+        return {"status": True, "message": f"Task {task_id} stop requested."}
 
     return {"status": False, "message": f"Failed to stop task {task_id}."}
+
+
+async def listen_for_task_cancellations():
+    """
+    Cancel local tasks when another node asks for it on the cancel channel.
+    """
+    if not redis:
+        return
+
+    while True:
+        pubsub = redis.pubsub(ignore_subscribe_messages=True)
+        try:
+            await pubsub.subscribe(REDIS_TASKS_CANCEL_CHANNEL)
+            async for message in pubsub.listen():
+                if message.get("type") != "message":
+                    continue
+
+                task_id = message["data"]
+                if task_id in tasks:
+                    log.debug(f"Cancelling task {task_id} on request of another node")
+                    asyncio.create_task(cancel_local_task(task_id))
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            log.warning(f"Task cancel listener disconnected, retrying: {e}")
+            await asyncio.sleep(1)
+        finally:
+            await pubsub.close()
+
+
+async def cleanup_orphaned_tasks():
+    """
+    Remove registry entries of tasks whose node stopped sending heartbeats.
+    """
+    entries = await redis.hgetall(REDIS_TASKS_KEY)
+
+    node_ids = list({json.loads(value)["node_id"] for value in entries.values()})
+    if not node_ids:
+        return
+
+    alive = await redis.mget(
+        [f"{REDIS_NODE_KEY_PREFIX}:{node_id}" for node_id in node_ids]
+    )
+    dead_node_ids = {
+        node_id for node_id, heartbeat in zip(node_ids, alive) if heartbeat is None
+    }
+
+    orphaned_task_ids = [
+        task_id
+        for task_id, value in entries.items()
+        if json.loads(value)["node_id"] in dead_node_ids
+    ]
+    if orphaned_task_ids:
+        log.info(f"Removing {len(orphaned_task_ids)} orphaned tasks from the registry")
+        await redis.hdel(REDIS_TASKS_KEY, *orphaned_task_ids)
+
+
+async def periodic_task_registry_maintenance():
+    """
+    Keep this node's heartbeat alive and clean up tasks left by crashed nodes.
+    """
+    if not redis:
+        return
+
+    node_key = f"{REDIS_NODE_KEY_PREFIX}:{NODE_ID}"
+    try:
+        while True:
+            try:
+                await redis.set(node_key, int(time.time()), ex=NODE_HEARTBEAT_TTL)
+                await cleanup_orphaned_tasks()
+            except Exception as e:
+                log.warning(f"Task registry maintenance failed: {e}")
+
+            await asyncio.sleep(NODE_HEARTBEAT_INTERVAL)
+    finally:
+        try:
+            await redis.delete(node_key)
+            if tasks:
+                await redis.hdel(REDIS_TASKS_KEY, *tasks.keys())
+        except Exception:
+            pass
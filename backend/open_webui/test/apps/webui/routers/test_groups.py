@@ -0,0 +1,70 @@
+from test.util.abstract_integration_test import AbstractPostgresTest
+
+
+class TestGroups(AbstractPostgresTest):
+    BASE_PATH = "/api/v1/groups"
+
+    def setup_class(cls):
+        super().setup_class()
+        from open_webui.models.groups import Groups
+
+        cls.groups = Groups
+
+    def _get_members(self):
+        from open_webui.internal.db import get_db
+        from open_webui.models.groups import GroupMember
+
+        with get_db() as db:
+            return {
+                (member.group_id, member.user_id)
+                for member in db.query(GroupMember).all()
+            }
+
+    def test_group_members_stay_in_sync(self):
+        from open_webui.models.groups import GroupForm, GroupUpdateForm
+
+        group_1 = self.groups.insert_new_group(
+            "1",
+            GroupForm(name="group 1", description="", user_ids=["1", "2", "2"]),
+        )
+        group_2 = self.groups.insert_new_group(
+            "1", GroupForm(name="group 2", description="", user_ids=["2"])
+        )
+        assert self._get_members() == {
+            (group_1.id, "1"),
+            (group_1.id, "2"),
+            (group_2.id, "2"),
+        }
+
+        # Updates that leave out `user_ids` keep the members
+        self.groups.update_group_by_id(
+            group_1.id, GroupUpdateForm(name="group 1", description="updated")
+        )
+        assert self._get_members() == {
+            (group_1.id, "1"),
+            (group_1.id, "2"),
+            (group_2.id, "2"),
+        }
+
+        self.groups.update_group_by_id(
+            group_1.id,
+            GroupUpdateForm(name="group 1", description="", user_ids=["1", "3"]),
+        )
+        assert self._get_members() == {
+            (group_1.id, "1"),
+            (group_1.id, "3"),
+            (group_2.id, "2"),
+        }
+        assert self.groups.get_group_ids_by_member_id("3") == [group_1.id]
+
+        self.groups.remove_user_from_all_groups("1")
+        assert self._get_members() == {(group_1.id, "3"), (group_2.id, "2")}
+        assert self.groups.get_group_by_id(group_1.id).user_ids == ["3"]
+        assert self.groups.get_groups_by_member_id("1") == []
+
+        self.groups.delete_group_by_id(group_2.id)
+        assert self._get_members() == {(group_1.id, "3")}
+        assert self.groups.get_member_ids_by_group_ids([group_2.id]) == []
+
+        self.groups.delete_all_groups()
+        assert self._get_members() == set()
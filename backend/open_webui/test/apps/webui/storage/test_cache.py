@@ -0,0 +1,111 @@
+import os
+import threading
+import time
+
+from open_webui.storage.cache import StorageCache
+
+
+def writer(content: bytes, calls: list = None, delay: float = 0):
+    def download(path):
+        if calls is not None:
+            calls.append(path)
+        time.sleep(delay)
+        with open(path, "wb") as f:
+            f.write(content)
+
+    return download
+
+
+def test_get_hit_and_miss(tmp_path):
+    cache = StorageCache(tmp_path, 1024)
+    calls = []
+    hits, misses = cache.hits.value, cache.misses.value
+
+    path = cache.get("s3://bucket/a.txt", "v1", "a.txt", writer(b"one", calls))
+    assert open(path, "rb").read() == b"one"
+    assert path.endswith("a.txt")
+
+    assert cache.get("s3://bucket/a.txt", "v1", "a.txt", writer(b"one", calls)) == path
+    assert len(calls) == 1
+    assert cache.hits.value == hits + 1
+    assert cache.misses.value == misses + 1
+
+
+def test_get_new_version(tmp_path):
+    cache = StorageCache(tmp_path, 1024)
+    old_path = cache.get("key", "v1", "a.txt", writer(b"one"))
+    new_path = cache.get("key", "v2", "a.txt", writer(b"two"))
+
+    assert new_path != old_path
+    assert open(new_path, "rb").read() == b"two"
+    # The stale version is removed
+    assert not os.path.exists(old_path)
+
+
+def test_evicts_least_recently_used(tmp_path):
+    cache = StorageCache(tmp_path, 10)
+    a = cache.get("a", "v1", "a.txt", writer(b"aaaa"))
+    b = cache.get("b", "v1", "b.txt", writer(b"bbbb"))
+    # Using `a` makes `b` the least recently used entry
+    time.sleep(0.01)
+    cache.get("a", "v1", "a.txt", writer(b"aaaa"))
+    c = cache.get("c", "v1", "c.txt", writer(b"cccc"))
+    cache.evict()
+
+    assert os.path.exists(a)
+    assert not os.path.exists(b)
+    assert os.path.exists(c)
+    assert cache._size == 8
+
+
+def test_coalesces_concurrent_downloads(tmp_path):
+    cache = StorageCache(tmp_path, 1024)
+    calls = []
+    paths = []
+
+    def get():
+        paths.append(cache.get("key", "v1", "a.txt", writer(b"one", calls, 0.1)))
+
+    threads = [threading.Thread(target=get) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert len(set(paths)) == 1
+
+
+def test_failed_download_leaves_nothing(tmp_path):
+    cache = StorageCache(tmp_path, 1024)
+
+    def download(path):
+        with open(path, "wb") as f:
+            f.write(b"partial")
+        raise IOError("connection reset")
+
+    try:
+        cache.get("key", "v1", "a.txt", download)
+    except IOError:
+        pass
+
+    path = cache.get("key", "v1", "a.txt", writer(b"one"))
+    assert os.listdir(os.path.dirname(path)) == ["a.txt"]
+
+
+def test_put_delete_and_clear(tmp_path):
+    cache = StorageCache(tmp_path / "cache", 1024)
+    source = tmp_path / "a.txt"
+    source.write_bytes(b"one")
+
+    cache.put("key", "v1", "a.txt", str(source))
+    path = cache.get("key", "v1", "a.txt", writer(b"unused"))
+    assert open(path, "rb").read() == b"one"
+
+    cache.delete("key")
+    assert not os.path.exists(path)
+
+    cache.put("key", "v1", "a.txt", str(source))
+    cache.clear()
+    assert os.listdir(tmp_path / "cache") == []
+    assert source.exists()
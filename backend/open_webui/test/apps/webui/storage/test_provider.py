@@ -1,3 +1,5 @@
+import asyncio
+import hashlib
 import io
 import os
 import boto3
@@ -5,9 +7,11 @@ import pytest
 from botocore.exceptions import ClientError
 from moto import mock_aws
 from open_webui.storage import provider
+from open_webui.storage.cache import StorageCache
 from gcp_storage_emulator.server import create_server
 from google.cloud import storage
 from azure.storage.blob import BlobServiceClient, ContainerClient, BlobClient
+from types import SimpleNamespace
 from unittest.mock import MagicMock
 
 
@@ -19,6 +23,17 @@ def mock_upload_dir(monkeypatch, tmp_path):
     return directory
 
 
+def mock_cache(monkeypatch, storage, tmp_path, max_size=1024 * 1024):
+    """Fixture to give a provider a cache in a temporary directory."""
+    cache = StorageCache(tmp_path / "cache", max_size)
+    monkeypatch.setattr(storage, "cache", cache)
+    return cache
+
+
+def file_meta(content: bytes) -> dict:
+    return {"size": len(content), "sha256": hashlib.sha256(content).hexdigest()}
+
+
 def test_imports():
     provider.StorageProvider
     provider.LocalStorageProvider
@@ -66,14 +81,35 @@ class TestLocalStorageProvider:
 
     def test_upload_file(self, monkeypatch, tmp_path):
         upload_dir = mock_upload_dir(monkeypatch, tmp_path)
-        contents, file_path = self.Storage.upload_file(self.file_bytesio, self.filename)
+        meta, file_path = self.Storage.upload_file(self.file_bytesio, self.filename)
         assert (upload_dir / self.filename).exists()
         assert (upload_dir / self.filename).read_bytes() == self.file_content
-        assert contents == self.file_content
+        assert meta == file_meta(self.file_content)
         assert file_path == str(upload_dir / self.filename)
         with pytest.raises(ValueError):
             self.Storage.upload_file(self.file_bytesio_empty, self.filename)
 
+    def test_upload_file_in_chunks(self, monkeypatch, tmp_path):
+        upload_dir = mock_upload_dir(monkeypatch, tmp_path)
+        monkeypatch.setattr(provider, "STORAGE_UPLOAD_CHUNK_SIZE", 5)
+        meta, file_path = self.Storage.upload_file(
+            io.BytesIO(self.file_content), self.filename
+        )
+        assert (upload_dir / self.filename).read_bytes() == self.file_content
+        assert meta == file_meta(self.file_content)
+
+    def test_upload_file_too_large(self, monkeypatch, tmp_path):
+        upload_dir = mock_upload_dir(monkeypatch, tmp_path)
+        monkeypatch.setattr(provider, "STORAGE_UPLOAD_CHUNK_SIZE", 5)
+        with pytest.raises(ValueError):
+            self.Storage.upload_file(
+                io.BytesIO(self.file_content),
+                self.filename,
+                max_size=len(self.file_content) - 1,
+            )
+        # The partial upload is removed
+        assert not (upload_dir / self.filename).exists()
+
     def test_get_file(self, monkeypatch, tmp_path):
         upload_dir = mock_upload_dir(monkeypatch, tmp_path)
         file_path = str(upload_dir / self.filename)
@@ -96,6 +132,19 @@ class TestLocalStorageProvider:
         assert not (upload_dir / self.filename).exists()
         assert not (upload_dir / self.filename_extra).exists()
 
+    def test_async_methods(self, monkeypatch, tmp_path):
+        upload_dir = mock_upload_dir(monkeypatch, tmp_path)
+
+        async def run():
+            _, file_path = await self.Storage.upload_file_async(
+                io.BytesIO(self.file_content), self.filename
+            )
+            assert await self.Storage.get_file_async(file_path) == file_path
+            await self.Storage.delete_files_async([file_path])
+
+        asyncio.run(run())
+        assert not (upload_dir / self.filename).exists()
+
 
 @mock_aws
 class TestS3StorageProvider:
@@ -112,11 +161,12 @@ class TestS3StorageProvider:
 
     def test_upload_file(self, monkeypatch, tmp_path):
         upload_dir = mock_upload_dir(monkeypatch, tmp_path)
+        mock_cache(monkeypatch, self.Storage, tmp_path)
         # S3 checks
         with pytest.raises(Exception):
             self.Storage.upload_file(io.BytesIO(self.file_content), self.filename)
         self.s3_client.create_bucket(Bucket=self.Storage.bucket_name)
-        contents, s3_file_path = self.Storage.upload_file(
+        meta, s3_file_path = self.Storage.upload_file(
             io.BytesIO(self.file_content), self.filename
         )
         object = self.s3_client.Object(self.Storage.bucket_name, self.filename)
@@ -124,25 +174,37 @@ class TestS3StorageProvider:
         # local checks
         assert (upload_dir / self.filename).exists()
         assert (upload_dir / self.filename).read_bytes() == self.file_content
-        assert contents == self.file_content
+        assert meta == file_meta(self.file_content)
         assert s3_file_path == "s3://" + self.Storage.bucket_name + "/" + self.filename
         with pytest.raises(ValueError):
             self.Storage.upload_file(self.file_bytesio_empty, self.filename)
 
     def test_get_file(self, monkeypatch, tmp_path):
         upload_dir = mock_upload_dir(monkeypatch, tmp_path)
+        cache = mock_cache(monkeypatch, self.Storage, tmp_path)
         self.s3_client.create_bucket(Bucket=self.Storage.bucket_name)
-        contents, s3_file_path = self.Storage.upload_file(
+        meta, s3_file_path = self.Storage.upload_file(
             io.BytesIO(self.file_content), self.filename
         )
+        # Seeded by the upload
         file_path = self.Storage.get_file(s3_file_path)
-        assert file_path == str(upload_dir / self.filename)
-        assert (upload_dir / self.filename).exists()
+        assert file_path.startswith(str(tmp_path / "cache"))
+        assert open(file_path, "rb").read() == self.file_content
+        assert cache.hits.value >= 1
+        # Downloaded again once the object changes
+        misses = cache.misses.value
+        self.s3_client.Object(self.Storage.bucket_name, self.filename).put(
+            Body=b"new content"
+        )
+        file_path = self.Storage.get_file(s3_file_path)
+        assert open(file_path, "rb").read() == b"new content"
+        assert cache.misses.value == misses + 1
 
     def test_delete_file(self, monkeypatch, tmp_path):
         upload_dir = mock_upload_dir(monkeypatch, tmp_path)
+        mock_cache(monkeypatch, self.Storage, tmp_path)
         self.s3_client.create_bucket(Bucket=self.Storage.bucket_name)
-        contents, s3_file_path = self.Storage.upload_file(
+        meta, s3_file_path = self.Storage.upload_file(
             io.BytesIO(self.file_content), self.filename
         )
         assert (upload_dir / self.filename).exists()
@@ -154,8 +216,24 @@ class TestS3StorageProvider:
         assert error["Code"] == "404"
         assert error["Message"] == "Not Found"
 
+    def test_delete_files(self, monkeypatch, tmp_path):
+        upload_dir = mock_upload_dir(monkeypatch, tmp_path)
+        mock_cache(monkeypatch, self.Storage, tmp_path)
+        self.s3_client.create_bucket(Bucket=self.Storage.bucket_name)
+        file_paths = [
+            self.Storage.upload_file(io.BytesIO(self.file_content), filename)[1]
+            for filename in [self.filename, self.filename_extra]
+        ]
+
+        asyncio.run(self.Storage.delete_files_async(file_paths))
+        for filename in [self.filename, self.filename_extra]:
+            assert not (upload_dir / filename).exists()
+            with pytest.raises(ClientError):
+                self.s3_client.Object(self.Storage.bucket_name, filename).load()
+
     def test_delete_all_files(self, monkeypatch, tmp_path):
         upload_dir = mock_upload_dir(monkeypatch, tmp_path)
+        mock_cache(monkeypatch, self.Storage, tmp_path)
         # create 2 files
         self.s3_client.create_bucket(Bucket=self.Storage.bucket_name)
         self.Storage.upload_file(io.BytesIO(self.file_content), self.filename)
@@ -225,11 +303,12 @@ class TestGCSStorageProvider:
 
     def test_upload_file(self, monkeypatch, tmp_path, setup):
         upload_dir = mock_upload_dir(monkeypatch, tmp_path)
+        mock_cache(monkeypatch, self.Storage, tmp_path)
         # catch error if bucket does not exist
         with pytest.raises(Exception):
             self.Storage.bucket = monkeypatch(self.Storage, "bucket", None)
             self.Storage.upload_file(io.BytesIO(self.file_content), self.filename)
-        contents, gcs_file_path = self.Storage.upload_file(
+        meta, gcs_file_path = self.Storage.upload_file(
             io.BytesIO(self.file_content), self.filename
         )
         object = self.Storage.bucket.get_blob(self.filename)
@@ -237,7 +316,7 @@ class TestGCSStorageProvider:
         # local checks
         assert (upload_dir / self.filename).exists()
         assert (upload_dir / self.filename).read_bytes() == self.file_content
-        assert contents == self.file_content
+        assert meta == file_meta(self.file_content)
         assert gcs_file_path == "gs://" + self.Storage.bucket_name + "/" + self.filename
         # test error if file is empty
         with pytest.raises(ValueError):
@@ -245,16 +324,18 @@ class TestGCSStorageProvider:
 
     def test_get_file(self, monkeypatch, tmp_path, setup):
         upload_dir = mock_upload_dir(monkeypatch, tmp_path)
-        contents, gcs_file_path = self.Storage.upload_file(
+        mock_cache(monkeypatch, self.Storage, tmp_path)
+        meta, gcs_file_path = self.Storage.upload_file(
             io.BytesIO(self.file_content), self.filename
         )
         file_path = self.Storage.get_file(gcs_file_path)
-        assert file_path == str(upload_dir / self.filename)
-        assert (upload_dir / self.filename).exists()
+        assert file_path.startswith(str(tmp_path / "cache"))
+        assert open(file_path, "rb").read() == self.file_content
 
     def test_delete_file(self, monkeypatch, tmp_path, setup):
         upload_dir = mock_upload_dir(monkeypatch, tmp_path)
-        contents, gcs_file_path = self.Storage.upload_file(
+        mock_cache(monkeypatch, self.Storage, tmp_path)
+        meta, gcs_file_path = self.Storage.upload_file(
             io.BytesIO(self.file_content), self.filename
         )
         # ensure that local directory has the uploaded file as well
@@ -267,6 +348,7 @@ class TestGCSStorageProvider:
 
     def test_delete_all_files(self, monkeypatch, tmp_path, setup):
         upload_dir = mock_upload_dir(monkeypatch, tmp_path)
+        mock_cache(monkeypatch, self.Storage, tmp_path)
         # create 2 files
         self.Storage.upload_file(io.BytesIO(self.file_content), self.filename)
         object = self.Storage.bucket.get_blob(self.filename)
@@ -337,6 +419,7 @@ class TestAzureStorageProvider:
 
     def test_upload_file(self, monkeypatch, tmp_path):
         upload_dir = mock_upload_dir(monkeypatch, tmp_path)
+        mock_cache(monkeypatch, self.Storage, tmp_path)
 
         # Simulate an error when container does not exist
         self.Storage.container_client.get_blob_client.side_effect = Exception(
@@ -348,16 +431,17 @@ class TestAzureStorageProvider:
         # Reset side effect and create container
         self.Storage.container_client.get_blob_client.side_effect = None
         self.Storage.create_container()
-        contents, azure_file_path = self.Storage.upload_file(
+        meta, azure_file_path = self.Storage.upload_file(
             io.BytesIO(self.file_content), self.filename
         )
 
         # Assertions
         self.Storage.container_client.get_blob_client.assert_called_with(self.filename)
-        self.Storage.container_client.get_blob_client().upload_blob.assert_called_once_with(
-            self.file_content, overwrite=True
-        )
-        assert contents == self.file_content
+        upload_blob = self.Storage.container_client.get_blob_client().upload_blob
+        upload_blob.assert_called_once()
+        assert upload_blob.call_args.kwargs["length"] == len(self.file_content)
+        assert upload_blob.call_args.kwargs["overwrite"] is True
+        assert meta == file_meta(self.file_content)
         assert (
             azure_file_path
             == f"https://myaccount.blob.core.windows.net/{self.Storage.container_name}/{self.filename}"
@@ -370,24 +454,27 @@ class TestAzureStorageProvider:
 
     def test_get_file(self, monkeypatch, tmp_path):
         upload_dir = mock_upload_dir(monkeypatch, tmp_path)
+        mock_cache(monkeypatch, self.Storage, tmp_path)
         self.Storage.create_container()
 
         # Mock upload behavior
         self.Storage.upload_file(io.BytesIO(self.file_content), self.filename)
         # Mock blob download behavior
-        self.Storage.container_client.get_blob_client().download_blob().readall.return_value = (
+        blob_client = self.Storage.container_client.get_blob_client()
+        blob_client.get_blob_properties().etag = "new-etag"
+        blob_client.download_blob().readinto.side_effect = lambda f: f.write(
             self.file_content
         )
 
         file_url = f"https://myaccount.blob.core.windows.net/{self.Storage.container_name}/{self.filename}"
         file_path = self.Storage.get_file(file_url)
 
-        assert file_path == str(upload_dir / self.filename)
-        assert (upload_dir / self.filename).exists()
-        assert (upload_dir / self.filename).read_bytes() == self.file_content
+        assert file_path.startswith(str(tmp_path / "cache"))
+        assert open(file_path, "rb").read() == self.file_content
 
     def test_delete_file(self, monkeypatch, tmp_path):
         upload_dir = mock_upload_dir(monkeypatch, tmp_path)
+        mock_cache(monkeypatch, self.Storage, tmp_path)
         self.Storage.create_container()
 
         # Mock file upload
@@ -403,6 +490,7 @@ class TestAzureStorageProvider:
 
     def test_delete_all_files(self, monkeypatch, tmp_path):
         upload_dir = mock_upload_dir(monkeypatch, tmp_path)
+        mock_cache(monkeypatch, self.Storage, tmp_path)
         self.Storage.create_container()
 
         # Mock file uploads
@@ -411,15 +499,21 @@ class TestAzureStorageProvider:
 
         # Mock listing and deletion behavior
         self.Storage.container_client.list_blobs.return_value = [
-            {"name": self.filename},
-            {"name": self.filename_extra},
+            SimpleNamespace(name=self.filename),
+            SimpleNamespace(name=self.filename_extra),
+        ]
+        self.Storage.container_client.delete_blobs.return_value = [
+            SimpleNamespace(status_code=202),
+            SimpleNamespace(status_code=202),
         ]
-        self.Storage.container_client.get_blob_client().delete_blob.return_value = None
 
         self.Storage.delete_all_files()
 
         self.Storage.container_client.list_blobs.assert_called_once()
-        self.Storage.container_client.get_blob_client().delete_blob.assert_any_call()
+        # Deleted in a single batch request
+        self.Storage.container_client.delete_blobs.assert_called_once_with(
+            self.filename, self.filename_extra, raise_on_any_failure=False
+        )
         assert not (upload_dir / self.filename).exists()
         assert not (upload_dir / self.filename_extra).exists()
 
@@ -0,0 +1,46 @@
+import math
+import struct
+import wave
+
+import pytest
+
+from open_webui.utils.audio import AudioNormalizer
+
+
+def write_wav(path, seconds=1, rate=44100):
+    with wave.open(str(path), "wb") as f:
+        f.setnchannels(2)
+        f.setsampwidth(2)
+        f.setframerate(rate)
+        f.writeframes(
+            b"".join(
+                struct.pack("<hh", int(8000 * math.sin(i / 20)), 0)
+                for i in range(rate * seconds)
+            )
+        )
+
+
+def test_normalizes_once_by_content(tmp_path):
+    normalizer = AudioNormalizer(tmp_path / "cache", 1024 * 1024 * 1024)
+    write_wav(tmp_path / "a.wav")
+    write_wav(tmp_path / "b.wav")
+
+    futures = [normalizer.submit(tmp_path / "a.wav") for _ in range(3)]
+    assert len({id(future) for future in futures}) == 1
+
+    path = normalizer.normalize(tmp_path / "a.wav")
+    with wave.open(str(path)) as f:
+        assert (f.getnchannels(), f.getframerate(), f.getnframes()) == (1, 16000, 16000)
+
+    # The same content under another name is served from the cache
+    hits = normalizer.cache.hits.value
+    assert normalizer.normalize(tmp_path / "b.wav") == path
+    assert normalizer.cache.hits.value == hits + 1
+
+
+def test_rejects_unknown_format(tmp_path):
+    normalizer = AudioNormalizer(tmp_path / "cache", 1024 * 1024 * 1024)
+    write_wav(tmp_path / "a.wav")
+
+    with pytest.raises(ValueError):
+        normalizer.normalize(tmp_path / "a.wav", "flac")
@@ -0,0 +1,149 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+import aiohttp
+import pytest
+
+from open_webui.utils.images import comfyui
+from open_webui.utils.images.comfyui import ComfyUIClient
+
+
+class FakeWebSocket:
+    """Yields the messages put on it until it is closed or fails."""
+
+    def __init__(self):
+        self.messages = asyncio.Queue()
+        self.closed = False
+
+    def send(self, message_type, **data):
+        self.messages.put_nowait(
+            SimpleNamespace(
+                type=aiohttp.WSMsgType.TEXT,
+                data=json.dumps({"type": message_type, "data": data}),
+            )
+        )
+
+    def fail(self, error):
+        self.messages.put_nowait(error)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        message = await self.messages.get()
+        if message is None:
+            raise StopAsyncIteration
+        if isinstance(message, Exception):
+            raise message
+        return message
+
+    async def close(self):
+        if not self.closed:
+            self.closed = True
+            self.messages.put_nowait(None)
+
+
+class FakeSession:
+    def __init__(self):
+        self.websockets = []
+
+    async def ws_connect(self, url, **kwargs):
+        self.websockets.append(FakeWebSocket())
+        return self.websockets[-1]
+
+
+@pytest.fixture
+def session(monkeypatch):
+    session = FakeSession()
+    monkeypatch.setattr(comfyui, "get_session", lambda: session)
+    return session
+
+
+async def settle():
+    # Lets the listener handle the messages sent so far
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+def test_prompt_finished_before_it_is_awaited(session):
+    async def run():
+        client = ComfyUIClient("http://comfyui")
+        await client.connect()
+        ws = session.websockets[0]
+
+        ws.send("executing", node=None, prompt_id="a")
+        await settle()
+        assert "a" in client._finished
+
+        await client.wait_for_prompt("a", timeout=1)
+        assert "a" not in client._finished
+        await client.close()
+
+    asyncio.run(run())
+
+
+def test_execution_error(session):
+    async def run():
+        client = ComfyUIClient("http://comfyui")
+        await client.connect()
+        ws = session.websockets[0]
+
+        waiting = asyncio.create_task(client.wait_for_prompt("a", timeout=1))
+        await settle()
+        ws.send("execution_error", prompt_id="a", exception_message="Out of memory")
+
+        with pytest.raises(Exception, match="ComfyUI: Out of memory"):
+            await waiting
+        assert client._prompts == {}
+        await client.close()
+
+    asyncio.run(run())
+
+
+def test_listener_failure_fails_pending_prompts(session):
+    async def run():
+        client = ComfyUIClient("http://comfyui")
+        await client.connect()
+        ws = session.websockets[0]
+
+        waiting = [
+            asyncio.create_task(client.wait_for_prompt(prompt_id, timeout=1))
+            for prompt_id in ["a", "b"]
+        ]
+        await settle()
+        ws.fail(aiohttp.ClientError("Connection reset"))
+
+        for task in waiting:
+            with pytest.raises(ConnectionError):
+                await task
+        assert ws.closed
+        assert client._prompts == {}
+        await client.close()
+
+    asyncio.run(run())
+
+
+def test_reconnects_on_next_connect(session):
+    async def run():
+        client = ComfyUIClient("http://comfyui")
+        await client.connect()
+        await client.connect()
+        assert len(session.websockets) == 1
+
+        # The server closes the connection
+        session.websockets[0].messages.put_nowait(None)
+        await settle()
+        assert client._listener.done()
+
+        await client.connect()
+        assert len(session.websockets) == 2
+        ws = session.websockets[1]
+
+        waiting = asyncio.create_task(client.wait_for_prompt("a", timeout=1))
+        await settle()
+        ws.send("execution_success", prompt_id="a")
+        await waiting
+        await client.close()
+
+    asyncio.run(run())
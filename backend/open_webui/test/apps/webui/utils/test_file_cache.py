@@ -0,0 +1,90 @@
+import os
+import time
+
+from open_webui.utils.file_cache import FileCache
+
+
+def write(cache, key, content=b"data", suffix=".mp3"):
+    path = cache.path(key, suffix)
+    path.write_bytes(content)
+    cache.add(key)
+    return path
+
+
+def test_get_hit_and_miss(tmp_path):
+    cache = FileCache(tmp_path, 1024)
+    hits, misses = cache.hits.value, cache.misses.value
+
+    assert cache.get("aa11", ".mp3") is None
+    path = write(cache, "aa11")
+    assert cache.get("aa11", ".mp3") == path
+    assert path.parent.name == "aa"
+
+    assert cache.hits.value == hits + 1
+    assert cache.misses.value == misses + 1
+
+
+def test_evicts_least_recently_used(tmp_path):
+    cache = FileCache(tmp_path, 10)
+    a = write(cache, "a", b"aaaa")
+    b = write(cache, "b", b"bbbb")
+    # Using `a` makes `b` the least recently used entry
+    time.sleep(0.01)
+    cache.get("a", ".mp3")
+    c = write(cache, "c", b"cccc")
+    cache.evict()
+
+    assert a.exists()
+    assert not b.exists()
+    assert c.exists()
+    assert cache._size == 8
+
+
+def test_evicts_expired_entries(tmp_path):
+    cache = FileCache(tmp_path, 1024, ttl=60)
+    a = write(cache, "a")
+    b = write(cache, "b")
+    os.utime(a, (time.time() - 120, time.time() - 120))
+
+    cache.evict()
+    assert not a.exists()
+    assert b.exists()
+
+    # An expired entry is not served even before it is evicted
+    c = write(cache, "c")
+    os.utime(c, (time.time() - 120, time.time() - 120))
+    assert cache.get("c", ".mp3") is None
+    assert not c.exists()
+
+
+def test_entries_span_files_and_workers(tmp_path):
+    cache = FileCache(tmp_path, 1024)
+    write(cache, "a", b"clip", ".mp3")
+    write(cache, "a", b"{}", ".json")
+
+    # Another worker sharing the directory sees the entry and its size
+    other = FileCache(tmp_path, 1024)
+    other.evict()
+    assert other._size == 6
+
+    other.remove("a")
+    assert list((tmp_path / "a").iterdir()) == []
+
+
+def test_add_evicts_in_background(tmp_path):
+    cache = FileCache(tmp_path, 4)
+    write(cache, "a", b"aaaa")
+    cache._eviction.result(timeout=5)
+
+    b = write(cache, "b", b"bbbb")
+    cache._eviction.result(timeout=5)
+    assert not (tmp_path / "a" / "a.mp3").exists()
+    assert b.exists()
+
+
+def test_skips_files_being_written(tmp_path):
+    cache = FileCache(tmp_path, 1024)
+    cache.part_path("a").write_bytes(b"partial")
+
+    cache.evict()
+    assert cache._size == 0
@@ -0,0 +1,60 @@
+from types import SimpleNamespace
+
+from open_webui.utils.images.variants import (
+    get_accepted_types,
+    get_file_storage_paths,
+    select_image_variant,
+)
+
+
+def variant(width, content_type, size):
+    return {"width": width, "content_type": content_type, "size": size}
+
+
+FILE = SimpleNamespace(
+    meta={
+        "size": 900,
+        "image": {
+            "width": 1536,
+            "height": 1024,
+            "variants": [
+                variant(512, "image/webp", 100),
+                variant(512, "image/avif", 80),
+                variant(1024, "image/webp", 300),
+                variant(1536, "image/webp", 600),
+            ],
+        },
+    }
+)
+
+
+def test_accepted_types():
+    accept = "image/avif,image/webp;q=0.9,image/png;q=0, */*;q=0.8"
+    assert get_accepted_types(accept) == {"image/avif", "image/webp", "*/*"}
+
+
+def test_selects_smallest_accepted_variant():
+    assert (
+        select_image_variant(FILE, "image/webp,*/*")
+        == FILE.meta["image"]["variants"][3]
+    )
+    assert select_image_variant(FILE, "image/avif,image/webp", 400)["size"] == 80
+    assert select_image_variant(FILE, "image/webp", 600)["width"] == 1024
+
+
+def test_falls_back_to_original():
+    assert select_image_variant(FILE, "image/png,*/*") is None
+    assert select_image_variant(FILE, "image/avif", 600) is None
+    assert select_image_variant(FILE, "image/webp", 4096)["width"] == 1536
+    assert select_image_variant(SimpleNamespace(meta={}), "image/webp") is None
+
+
+def test_storage_paths_include_variants():
+    file = SimpleNamespace(
+        path="/data/a.png",
+        meta={"image": {"variants": [{"path": "/data/a_512w.webp"}]}},
+    )
+    assert get_file_storage_paths(file) == ["/data/a.png", "/data/a_512w.webp"]
+    assert get_file_storage_paths(SimpleNamespace(path="/data/b.txt", meta=None)) == [
+        "/data/b.txt"
+    ]
@@ -0,0 +1,106 @@
+import threading
+import time
+
+from open_webui.utils.model_manager import ModelManager
+
+
+def test_loads_lazily_once():
+    manager = ModelManager()
+    loads = []
+    model = manager.register("embedding", "a", lambda: loads.append(1) or "model")
+
+    assert not model.loaded
+    results = [model.run(lambda m, i: (m, i), i) for i in range(3)]
+
+    assert results == [("model", 0), ("model", 1), ("model", 2)]
+    assert len(loads) == 1
+    assert model.refs == 0
+
+
+def test_register_replaces_changed_model():
+    manager = ModelManager()
+    old = manager.register("embedding", "a", lambda: "a")
+    old.run(lambda m: m)
+
+    assert manager.register("embedding", "a", lambda: "other") is old
+
+    new = manager.register("embedding", "b", lambda: "b")
+    assert new is not old
+    assert not old.loaded
+    assert old.executor._shutdown
+    assert new.run(lambda m: m) == "b"
+
+
+def test_replaced_model_unloads_after_its_calls():
+    manager = ModelManager()
+    old = manager.register("embedding", "a", lambda: "a")
+    started, finish = threading.Event(), threading.Event()
+
+    def infer(model):
+        started.set()
+        finish.wait()
+        return model
+
+    future = old.submit(infer)
+    started.wait()
+    manager.register("embedding", "b", lambda: "b")
+
+    # Still in use by the running call
+    assert old.loaded
+    assert not old.executor._shutdown
+    finish.set()
+    assert future.result() == "a"
+
+    # Released by the call's done callback
+    for _ in range(100):
+        if old.executor._shutdown:
+            break
+        time.sleep(0.01)
+    assert not old.loaded
+    assert old.executor._shutdown
+
+
+def test_unload_idle():
+    manager = ModelManager(idle_timeout=1)
+    model = manager.register("whisper", "base", lambda: "whisper")
+    model.run(lambda m: m)
+
+    manager.unload_idle()
+    assert model.loaded
+
+    model.last_used -= 2
+    manager.unload_idle()
+    assert not model.loaded
+
+    # Loaded again on the next use
+    assert model.run(lambda m: m) == "whisper"
+
+
+def test_memory_budget_unloads_least_recently_used():
+    manager = ModelManager(memory_budget=100)
+    a = manager.register("embedding", "a", lambda: "a")
+    b = manager.register("reranking", "b", lambda: "b")
+    c = manager.register("whisper", "c", lambda: "c")
+
+    a.run(lambda m: m)
+    a.size = 60
+    time.sleep(0.01)
+    b.run(lambda m: m)
+    b.size = 30
+    c.size = 30
+
+    c.run(lambda m: m)
+    assert not a.loaded
+    assert b.loaded and c.loaded
+
+
+def test_warmup():
+    manager = ModelManager()
+    model = manager.register("speech", "t5", lambda: "speech")
+    model.warmup()
+
+    for _ in range(100):
+        if model.loaded:
+            break
+        time.sleep(0.01)
+    assert model.loaded
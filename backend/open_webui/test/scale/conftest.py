@@ -0,0 +1,9 @@
+import sys
+from pathlib import Path
+
+# The harness also runs as a script, so it and the tests import its modules
+# (harness, mock_llm) by name from this directory, whatever the working
+# directory or pytest import mode
+SCALE_DIR = Path(__file__).parent
+if str(SCALE_DIR) not in sys.path:
+    sys.path.insert(0, str(SCALE_DIR))
@@ -0,0 +1,833 @@
+"""
+Multi-node scaling harness.
+
+Starts a mock OpenAI-compatible upstream, a Redis server and `--nodes` uvicorn
+processes of Open WebUI sharing one database, then drives socket clients and
+chat completions across them. Socket clients connect to one node while their
+completions are posted to another, so every event has to cross the Redis
+manager to arrive.
+
+Reports throughput and latency percentiles, and checks the state that has to
+be shared between nodes: chat events, saved messages, event stream resume,
+the task registry, presence, model usage and the app config.
+
+    cd backend
+    python open_webui/test/scale/harness.py --nodes 3 --clients 50 --chats 500
+
+Redis comes from `--redis-url`, a `redis-server` binary on the PATH, or
+fakeredis (with `lupa` for the Lua scripts) as the last resort. The database
+is a temporary SQLite file unless `--database-url` points to e.g. Postgres.
+Needs `python-socketio[asyncio_client]` and `aiohttp` next to the backend
+requirements.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from collections import defaultdict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional
+
+import aiohttp
+import socketio
+
+from mock_llm import get_content
+
+SCALE_DIR = Path(__file__).parent
+BACKEND_DIR = SCALE_DIR.parents[2]
+
+ADMIN_EMAIL = "admin@scale.test"
+PASSWORD = "scale-password"
+
+
+def get_free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def percentiles(values: list[float]) -> dict:
+    values = sorted(values)
+
+    def percentile(p):
+        return values[min(len(values) - 1, int(p * len(values)))] if values else 0
+
+    return {
+        "count": len(values),
+        "p50": percentile(0.5),
+        "p90": percentile(0.9),
+        "p99": percentile(0.99),
+        "max": values[-1] if values else 0,
+    }
+
+
+@dataclass
+class Options:
+    nodes: int = 2
+    users: int = 5
+    clients: int = 20
+    chats: int = 100
+    concurrency: int = 10
+    tokens: int = 32
+    token_delay: float = 0.01
+    timeout: float = 60.0
+    redis_url: Optional[str] = None
+    database_url: Optional[str] = None
+    keep_logs: bool = False
+
+
+class Cluster:
+    """
+    The mock upstream, Redis and Open WebUI node processes, torn down on exit.
+    """
+
+    def __init__(self, options: Options):
+        self.options = options
+        self.tmp_dir = Path(tempfile.mkdtemp(prefix="open-webui-scale-"))
+        self.processes: list[tuple[str, subprocess.Popen]] = []
+        self.fake_redis_server = None
+
+        self.redis_url: Optional[str] = None
+        self.mock_url: Optional[str] = None
+        self.node_urls: list[str] = []
+
+    async def __aenter__(self):
+        try:
+            self.redis_url = self.start_redis()
+            self.mock_url = await self.start_mock_llm()
+            await self.start_nodes()
+        except BaseException:
+            self.stop()
+            raise
+        return self
+
+    async def __aexit__(self, *exc):
+        self.stop()
+
+    def spawn(self, name: str, args: list[str], env: dict) -> subprocess.Popen:
+        log_file = open(self.tmp_dir / f"{name}.log", "wb")
+        process = subprocess.Popen(
+            args,
+            cwd=BACKEND_DIR,
+            env=env,
+            stdout=log_file,
+            stderr=subprocess.STDOUT,
+        )
+        self.processes.append((name, process))
+        return process
+
+    def log_tail(self, name: str, lines: int = 40) -> str:
+        path = self.tmp_dir / f"{name}.log"
+        if not path.exists():
+            return ""
+        return "\n".join(path.read_text(errors="replace").splitlines()[-lines:])
+
+    async def wait_until_ready(self, name: str, url: str, timeout: float = 180):
+        process = dict(self.processes)[name]
+        deadline = time.monotonic() + timeout
+
+        async with aiohttp.ClientSession() as session:
+            while time.monotonic() < deadline:
+                if process.poll() is not None:
+                    raise RuntimeError(
+                        f"{name} exited with {process.returncode}:\n{self.log_tail(name)}"
+                    )
+                try:
+                    async with session.get(url) as r:
+                        if r.status == 200:
+                            return
+                except aiohttp.ClientError:
+                    pass
+                await asyncio.sleep(0.5)
+
+        raise RuntimeError(f"{name} not ready after {timeout}s:\n{self.log_tail(name)}")
+
+    def start_redis(self) -> str:
+        if self.options.redis_url:
+            return self.options.redis_url
+
+        port = get_free_port()
+        if shutil.which("redis-server"):
+            self.spawn(
+                "redis",
+                [
+                    "redis-server",
+                    "--port",
+                    str(port),
+                    "--save",
+                    "",
+                    "--appendonly",
+                    "no",
+                ],
+                dict(os.environ),
+            )
+            return f"redis://127.0.0.1:{port}/0"
+
+        try:
+            from fakeredis import TcpFakeServer
+        except ImportError:
+            raise RuntimeError(
+                "Needs --redis-url, redis-server on the PATH or fakeredis installed"
+            )
+
+        self.fake_redis_server = TcpFakeServer(("127.0.0.1", port), server_type="redis")
+        threading.Thread(
+            target=self.fake_redis_server.serve_forever, daemon=True
+        ).start()
+        return f"redis://127.0.0.1:{port}/0"
+
+    async def start_mock_llm(self) -> str:
+        port = get_free_port()
+        env = {
+            **os.environ,
+            "MOCK_LLM_TOKENS": str(self.options.tokens),
+            "MOCK_LLM_TOKEN_DELAY": str(self.options.token_delay),
+        }
+        self.spawn(
+            "mock-llm",
+            [
+                sys.executable,
+                "-m",
+                "uvicorn",
+                "--app-dir",
+                str(SCALE_DIR),
+                "mock_llm:app",
+                "--port",
+                str(port),
+                "--log-level",
+                "warning",
+            ],
+            env,
+        )
+
+        url = f"http://127.0.0.1:{port}"
+        await self.wait_until_ready("mock-llm", f"{url}/v1/models")
+        return url
+
+    def get_node_env(self) -> dict:
+        data_dir = self.tmp_dir / "data"
+        data_dir.mkdir(exist_ok=True)
+
+        return {
+            **os.environ,
+            "DATA_DIR": str(data_dir),
+            "DATABASE_URL": self.options.database_url
+            or f"sqlite:///{self.tmp_dir / 'webui.db'}",
+            "WEBUI_SECRET_KEY": "scale-harness-secret",
+            "REDIS_URL": self.redis_url,
+            "ENABLE_WEBSOCKET_SUPPORT": "true",
+            "WEBSOCKET_MANAGER": "redis",
+            "WEBSOCKET_REDIS_URL": self.redis_url,
+            "ENABLE_OLLAMA_API": "false",
+            "ENABLE_OPENAI_API": "true",
+            "OPENAI_API_BASE_URL": f"{self.mock_url}/v1",
+            "OPENAI_API_KEY": "mock",
+            # Embeddings from the mock rather than a locally loaded model
+            "RAG_EMBEDDING_ENGINE": "openai",
+            "RAG_OPENAI_API_BASE_URL": f"{self.mock_url}/v1",
+            "RAG_OPENAI_API_KEY": "mock",
+            "BYPASS_MODEL_ACCESS_CONTROL": "true",
+            "ENABLE_SIGNUP": "true",
+            "GLOBAL_LOG_LEVEL": "WARNING",
+        }
+
+    async def start_nodes(self):
+        env = self.get_node_env()
+        ports = [get_free_port() for _ in range(self.options.nodes)]
+
+        def start(i):
+            self.spawn(
+                f"node-{i}",
+                [
+                    sys.executable,
+                    "-m",
+                    "uvicorn",
+                    "open_webui.main:app",
+                    "--host",
+                    "127.0.0.1",
+                    "--port",
+                    str(ports[i]),
+                    "--log-level",
+                    "warning",
+                ],
+                env,
+            )
+            return self.wait_until_ready(
+                f"node-{i}", f"http://127.0.0.1:{ports[i]}/health"
+            )
+
+        # The first node runs the migrations, the others start against a current schema
+        await start(0)
+        await asyncio.gather(*[start(i) for i in range(1, len(ports))])
+
+        self.node_urls = [f"http://127.0.0.1:{port}" for port in ports]
+
+    def stop(self):
+        for _, process in reversed(self.processes):
+            if process.poll() is None:
+                process.terminate()
+        for _, process in reversed(self.processes):
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+        self.processes = []
+
+        if self.fake_redis_server:
+            self.fake_redis_server.shutdown()
+            self.fake_redis_server = None
+
+        if not self.options.keep_logs:
+            shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+
+@dataclass
+class Generation:
+    started: float
+    first_event: Optional[float] = None
+    content: str = ""
+    done: asyncio.Event = field(default_factory=asyncio.Event)
+    cancelled: bool = False
+
+
+class Client:
+    """
+    A socket connection of a user to one node, recording the generations it
+    receives events for.
+    """
+
+    def __init__(self, node_index: int, node_url: str, user: dict):
+        self.node_index = node_index
+        self.node_url = node_url
+        self.user = user
+
+        self.sio = socketio.AsyncClient(reconnection=False)
+        self.sio.on("*", self.dispatch)
+
+        self.generations: dict[str, Generation] = {}
+        self.waiters: dict[str, list] = defaultdict(list)
+
+    @property
+    def sid(self) -> str:
+        return self.sio.get_sid()
+
+    async def connect(self) -> float:
+        start = time.perf_counter()
+        await self.sio.connect(
+            self.node_url,
+            socketio_path="/ws/socket.io",
+            transports=["websocket"],
+            auth={"token": self.user["token"]},
+        )
+        await self.sio.call("user-join", {"auth": {"token": self.user["token"]}})
+        return time.perf_counter() - start
+
+    async def disconnect(self):
+        await self.sio.disconnect()
+
+    def track(self, message_id: str) -> Generation:
+        self.generations[message_id] = Generation(started=time.perf_counter())
+        return self.generations[message_id]
+
+    async def dispatch(self, event, data=None):
+        if event == "chat-events":
+            self.on_chat_event(data)
+
+        for waiter in list(self.waiters[event]):
+            predicate, future = waiter
+            if not future.done() and predicate(data):
+                future.set_result(data)
+
+    def on_chat_event(self, event: dict):
+        generation = self.generations.get(event.get("message_id"))
+        if generation is None:
+            return
+
+        if generation.first_event is None:
+            generation.first_event = time.perf_counter()
+
+        event_data = event.get("data", {})
+        if event_data.get("type") == "task-cancelled":
+            generation.cancelled = True
+            generation.done.set()
+        elif event_data.get("type") == "chat:completion":
+            data = event_data.get("data", {})
+            if "content" in data:
+                generation.content = data["content"]
+            if data.get("done"):
+                generation.done.set()
+
+    async def wait_for(self, event: str, predicate=lambda data: True, timeout=10.0):
+        waiter = (predicate, asyncio.get_running_loop().create_future())
+        self.waiters[event].append(waiter)
+        try:
+            return await asyncio.wait_for(waiter[1], timeout)
+        finally:
+            self.waiters[event].remove(waiter)
+
+
+class Harness:
+    def __init__(self, cluster: Cluster, options: Options):
+        self.cluster = cluster
+        self.options = options
+        self.session: Optional[aiohttp.ClientSession] = None
+
+        self.admin: Optional[dict] = None
+        self.users: list[dict] = []
+        self.clients: list[Client] = []
+
+        self.connect_latencies: list[float] = []
+        self.request_latencies: list[float] = []
+        self.first_event_latencies: list[float] = []
+        self.done_latencies: list[float] = []
+        self.results: list[dict] = []
+        self.checks: list[dict] = []
+
+    @property
+    def node_urls(self) -> list[str]:
+        return self.cluster.node_urls
+
+    def other_node(self, node_index: int, offset: int = 1) -> str:
+        return self.node_urls[(node_index + offset) % len(self.node_urls)]
+
+    async def request(self, method, url, token=None, **kwargs):
+        headers = {"Authorization": f"Bearer {token}"} if token else {}
+        async with self.session.request(method, url, headers=headers, **kwargs) as r:
+            body = await r.json(content_type=None)
+            if r.status >= 400:
+                raise RuntimeError(f"{method} {url} failed with {r.status}: {body}")
+            return body
+
+    def check(self, name: str, passed: bool, detail: str = ""):
+        self.checks.append({"name": name, "passed": bool(passed), "detail": detail})
+
+    async def add_user(self, i) -> dict:
+        user = await self.request(
+            "POST",
+            f"{self.node_urls[0]}/api/v1/auths/add",
+            token=self.admin["token"],
+            json={
+                "name": f"User {i}",
+                "email": f"user-{i}@scale.test",
+                "password": PASSWORD,
+                "role": "user",
+            },
+        )
+        return {"id": user["id"], "token": user["token"]}
+
+    async def setup(self):
+        admin = await self.request(
+            "POST",
+            f"{self.node_urls[0]}/api/v1/auths/signup",
+            json={"name": "Admin", "email": ADMIN_EMAIL, "password": PASSWORD},
+        )
+        self.admin = {"id": admin["id"], "token": admin["token"]}
+        self.users = [await self.add_user(i) for i in range(self.options.users)]
+
+        self.clients = [
+            Client(
+                i % len(self.node_urls), self.node_urls[i % len(self.node_urls)], user
+            )
+            for i, user in enumerate(
+                self.users[i % len(self.users)] for i in range(self.options.clients)
+            )
+        ]
+
+        async def connect(client):
+            self.connect_latencies.append(await client.connect())
+
+        await asyncio.gather(*[connect(client) for client in self.clients])
+
+    async def start_chat(self, client: Client, model: str = "mock-model", offset=1):
+        """
+        Create a chat and post its completion to another node than the one
+        the client is connected to.
+        """
+        node_url = self.other_node(client.node_index, offset)
+        message_id = str(uuid.uuid4())
+        messages = [{"role": "user", "content": "Hello"}]
+
+        chat = await self.request(
+            "POST",
+            f"{node_url}/api/v1/chats/new",
+            token=client.user["token"],
+            json={"chat": {"title": "Scale", "models": [model], "messages": []}},
+        )
+
+        generation = client.track(message_id)
+        response = await self.request(
+            "POST",
+            f"{node_url}/api/chat/completions",
+            token=client.user["token"],
+            json={
+                "model": model,
+                "messages": messages,
+                "stream": True,
+                "chat_id": chat["id"],
+                "id": message_id,
+                "session_id": client.sid,
+                "background_tasks": {},
+            },
+        )
+        self.request_latencies.append(time.perf_counter() - generation.started)
+
+        return chat["id"], message_id, generation, response.get("task_id")
+
+    async def run_chat(self, i: int):
+        client = self.clients[i % len(self.clients)]
+        result = {"client": i % len(self.clients), "completed": False}
+        try:
+            chat_id, message_id, generation, _ = await self.start_chat(client)
+            result.update({"chat_id": chat_id, "message_id": message_id})
+
+            await asyncio.wait_for(generation.done.wait(), self.options.timeout)
+
+            self.first_event_latencies.append(
+                generation.first_event - generation.started
+            )
+            self.done_latencies.append(time.perf_counter() - generation.started)
+            result.update(
+                {
+                    "completed": not generation.cancelled,
+                    "content": generation.content,
+                }
+            )
+        except Exception as e:
+            result["error"] = repr(e)
+
+        self.results.append(result)
+
+    async def run_benchmark(self) -> float:
+        semaphore = asyncio.Semaphore(self.options.concurrency)
+
+        async def run(i):
+            async with semaphore:
+                await self.run_chat(i)
+
+        start = time.perf_counter()
+        await asyncio.gather(*[run(i) for i in range(self.options.chats)])
+        return time.perf_counter() - start
+
+    async def check_chat_events(self):
+        expected = get_content(self.options.tokens).strip()
+        completed = [r for r in self.results if r["completed"]]
+        correct = [r for r in completed if r["content"].strip() == expected]
+        errors = sorted({r["error"] for r in self.results if "error" in r})
+
+        self.check(
+            "chat events delivered across nodes",
+            len(correct) == self.options.chats,
+            f"{len(correct)}/{self.options.chats} complete and correct"
+            + (f", errors: {errors[:3]}" if errors else ""),
+        )
+
+    async def check_saved_messages(self):
+        expected = get_content(self.options.tokens).strip()
+        sample = [r for r in self.results if r["completed"]][:10]
+
+        mismatches = 0
+        for result in sample:
+            client = self.clients[result["client"]]
+            # Give the node a moment to persist the final message
+            for _ in range(20):
+                chat = await self.request(
+                    "GET",
+                    f"{self.other_node(client.node_index, 2)}/api/v1/chats/{result['chat_id']}",
+                    token=client.user["token"],
+                )
+                message = chat["chat"].get("history", {}).get("messages", {})
+                content = message.get(result["message_id"], {}).get("content", "")
+                if content.strip() == expected:
+                    break
+                await asyncio.sleep(0.1)
+            else:
+                mismatches += 1
+
+        self.check(
+            "messages saved and read from another node",
+            sample and mismatches == 0,
+            f"{len(sample) - mismatches}/{len(sample)} sampled messages match",
+        )
+
+    async def check_resume(self):
+        result = next((r for r in self.results if r["completed"]), None)
+        if result is None:
+            self.check("event stream resumed on another node", False, "no chats")
+            return
+
+        owner = self.clients[result["client"]]
+        client = next(
+            (
+                c
+                for c in self.clients
+                if c.user["id"] == owner.user["id"] and c.node_index != owner.node_index
+            ),
+            owner,
+        )
+
+        response = await client.sio.call(
+            "chat:resume",
+            {"chat_id": result["chat_id"], "message_id": result["message_id"]},
+        )
+        events = response.get("events", [])
+        content = next(
+            (
+                e["data"]["data"]["content"]
+                for e in reversed(events)
+                if "content" in e["data"].get("data", {})
+            ),
+            "",
+        )
+
+        self.check(
+            "event stream resumed on another node",
+            response.get("done")
+            and content.strip() == get_content(self.options.tokens).strip(),
+            f"{len(events)} events from node {client.node_index}, "
+            f"generated for node {owner.node_index}",
+        )
+
+    async def check_task_registry(self):
+        client = self.clients[0]
+        chat_id, _, generation, task_id = await self.start_chat(client, "mock-slow")
+        node_url = self.other_node(client.node_index, 2)
+
+        listed = await self.request(
+            "GET", f"{node_url}/api/tasks/chat/{chat_id}", token=client.user["token"]
+        )
+        await self.request(
+            "POST", f"{node_url}/api/tasks/stop/{task_id}", token=client.user["token"]
+        )
+
+        try:
+            await asyncio.wait_for(generation.done.wait(), 10)
+        except asyncio.TimeoutError:
+            pass
+
+        self.check(
+            "task listed and stopped from another node",
+            task_id in listed.get("task_ids", []) and generation.cancelled,
+            f"listed: {task_id in listed.get('task_ids', [])}, "
+            f"cancelled: {generation.cancelled}",
+        )
+
+    async def check_presence(self):
+        watcher = self.clients[0]
+        await watcher.sio.emit("presence:subscribe")
+        await watcher.wait_for("user-list")
+
+        user = await self.add_user("presence")
+        client = Client(
+            len(self.node_urls) - 1, self.other_node(watcher.node_index), user
+        )
+
+        joined = watcher.wait_for(
+            "user-presence", lambda data: user["id"] in data.get("joined", [])
+        )
+        left = watcher.wait_for(
+            "user-presence", lambda data: user["id"] in data.get("left", [])
+        )
+        joined, left = asyncio.ensure_future(joined), asyncio.ensure_future(left)
+
+        results = {}
+        try:
+            await client.connect()
+            await joined
+            results["joined"] = True
+            await client.disconnect()
+            await left
+            results["left"] = True
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            left.cancel()
+            await watcher.sio.emit("presence:unsubscribe")
+
+        self.check(
+            "presence changes broadcast across nodes",
+            results.get("joined") and results.get("left"),
+            f"joined: {results.get('joined', False)}, left: {results.get('left', False)}",
+        )
+
+    async def check_usage(self):
+        watcher = self.clients[0]
+        reporter = next(
+            (c for c in self.clients if c.node_index != watcher.node_index), watcher
+        )
+
+        await watcher.sio.emit("usage:subscribe")
+        used = asyncio.ensure_future(
+            watcher.wait_for(
+                "usage", lambda data: "mock-slow" in data.get("models", [])
+            )
+        )
+        await reporter.sio.emit(
+            "usage", {"model": "mock-slow", "chat_id": str(uuid.uuid4())}
+        )
+
+        try:
+            await used
+            passed = True
+        except asyncio.TimeoutError:
+            passed = False
+        finally:
+            await watcher.sio.emit("usage:unsubscribe")
+
+        self.check(
+            "model usage broadcast across nodes",
+            passed,
+            f"reported on node {reporter.node_index}, "
+            f"watched on node {watcher.node_index}",
+        )
+
+    async def check_config_sync(self):
+        token = self.admin["token"]
+        config = await self.request(
+            "GET", f"{self.node_urls[0]}/api/v1/auths/admin/config", token=token
+        )
+        enabled = not config["ENABLE_MESSAGE_RATING"]
+
+        await self.request(
+            "POST",
+            f"{self.node_urls[0]}/api/v1/auths/admin/config",
+            token=token,
+            json={**config, "ENABLE_MESSAGE_RATING": enabled},
+        )
+        synced = await self.request(
+            "GET", f"{self.node_urls[-1]}/api/v1/auths/admin/config", token=token
+        )
+        await self.request(
+            "POST",
+            f"{self.node_urls[0]}/api/v1/auths/admin/config",
+            token=token,
+            json=config,
+        )
+
+        self.check(
+            "config changes visible on other nodes",
+            synced["ENABLE_MESSAGE_RATING"] == enabled,
+            f"set to {enabled} on node 0, "
+            f"read {synced['ENABLE_MESSAGE_RATING']} on node {len(self.node_urls) - 1}",
+        )
+
+    async def get_node_metrics(self) -> list[dict]:
+        return await asyncio.gather(
+            *[
+                self.request("GET", f"{url}/api/metrics", token=self.admin["token"])
+                for url in self.node_urls
+            ]
+        )
+
+    async def run(self) -> dict:
+        async with aiohttp.ClientSession() as self.session:
+            await self.setup()
+            try:
+                duration = await self.run_benchmark()
+
+                for check in [
+                    self.check_chat_events,
+                    self.check_saved_messages,
+                    self.check_resume,
+                    self.check_task_registry,
+                    self.check_presence,
+                    self.check_usage,
+                    self.check_config_sync,
+                ]:
+                    try:
+                        await check()
+                    except Exception as e:
+                        self.check(check.__name__, False, repr(e))
+
+                node_metrics = await self.get_node_metrics()
+            finally:
+                await asyncio.gather(
+                    *[client.disconnect() for client in self.clients],
+                    return_exceptions=True,
+                )
+
+        completed = sum(1 for r in self.results if r["completed"])
+        return {
+            "options": vars(self.options),
+            "duration": duration,
+            "throughput": completed / duration if duration else 0,
+            "completed": completed,
+            "latency": {
+                "connect": percentiles(self.connect_latencies),
+                "request": percentiles(self.request_latencies),
+                "first_event": percentiles(self.first_event_latencies),
+                "done": percentiles(self.done_latencies),
+            },
+            "checks": self.checks,
+            "node_metrics": node_metrics,
+        }
+
+
+def print_report(report: dict):
+    options = report["options"]
+    print(
+        f"\nnodes={options['nodes']} users={options['users']} "
+        f"clients={options['clients']} chats={options['chats']} "
+        f"concurrency={options['concurrency']}"
+    )
+    print(
+        f"completed {report['completed']} chats in {report['duration']:.2f}s "
+        f"({report['throughput']:.1f} chats/s)\n"
+    )
+
+    print(f"{'latency (ms)':<16}{'p50':>10}{'p90':>10}{'p99':>10}{'max':>10}")
+    for name, stats in report["latency"].items():
+        print(
+            f"{name:<16}"
+            + "".join(f"{stats[p] * 1000:>10.1f}" for p in ["p50", "p90", "p99", "max"])
+        )
+
+    print()
+    for check in report["checks"]:
+        status = "PASS" if check["passed"] else "FAIL"
+        print(f"[{status}] {check['name']}: {check['detail']}")
+
+
+async def run(options: Options) -> dict:
+    async with Cluster(options) as cluster:
+        return await Harness(cluster, options).run()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--nodes", type=int, default=Options.nodes)
+    parser.add_argument("--users", type=int, default=Options.users)
+    parser.add_argument("--clients", type=int, default=Options.clients)
+    parser.add_argument("--chats", type=int, default=Options.chats)
+    parser.add_argument("--concurrency", type=int, default=Options.concurrency)
+    parser.add_argument("--tokens", type=int, default=Options.tokens)
+    parser.add_argument("--token-delay", type=float, default=Options.token_delay)
+    parser.add_argument("--timeout", type=float, default=Options.timeout)
+    parser.add_argument("--redis-url")
+    parser.add_argument("--database-url")
+    parser.add_argument("--keep-logs", action="store_true")
+    parser.add_argument("--json", help="Also write the report to this file")
+    args = parser.parse_args()
+
+    output = args.json
+    del args.json
+    report = asyncio.run(run(Options(**vars(args))))
+
+    print_report(report)
+    if output:
+        Path(output).write_text(json.dumps(report, indent=2))
+
+    sys.exit(0 if all(check["passed"] for check in report["checks"]) else 1)
+
+
+if __name__ == "__main__":
+    main()
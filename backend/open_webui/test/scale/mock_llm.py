@@ -0,0 +1,121 @@
+"""
+Minimal OpenAI-compatible upstream for the scaling harness.
+
+Streams `MOCK_LLM_TOKENS` tokens per completion, `MOCK_LLM_TOKEN_DELAY`
+seconds apart. The `mock-slow` model is ten times slower, which leaves time
+to stop its generation from another node.
+
+    uvicorn mock_llm:app --port 9999
+"""
+
+import asyncio
+import json
+import os
+import time
+import uuid
+
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, StreamingResponse
+from starlette.routing import Route
+
+MODELS = ["mock-model", "mock-slow"]
+
+TOKENS = int(os.environ.get("MOCK_LLM_TOKENS", "32"))
+TOKEN_DELAY = float(os.environ.get("MOCK_LLM_TOKEN_DELAY", "0.01"))
+
+
+def get_content(tokens: int = TOKENS) -> str:
+    return "".join(f"token{i} " for i in range(tokens))
+
+
+async def models(request: Request):
+    return JSONResponse(
+        {
+            "object": "list",
+            "data": [
+                {"id": model, "object": "model", "owned_by": "openai"}
+                for model in MODELS
+            ],
+        }
+    )
+
+
+async def embeddings(request: Request):
+    body = await request.json()
+    inputs = body.get("input", [])
+    inputs = inputs if isinstance(inputs, list) else [inputs]
+    return JSONResponse(
+        {
+            "object": "list",
+            "data": [
+                {"object": "embedding", "index": i, "embedding": [0.0] * 8}
+                for i in range(len(inputs))
+            ],
+        }
+    )
+
+
+async def chat_completions(request: Request):
+    body = await request.json()
+    model = body.get("model", MODELS[0])
+    delay = TOKEN_DELAY * (10 if model == "mock-slow" else 1)
+
+    completion_id = f"chatcmpl-{uuid.uuid4()}"
+    created = int(time.time())
+
+    if not body.get("stream"):
+        return JSONResponse(
+            {
+                "id": completion_id,
+                "object": "chat.completion",
+                "created": created,
+                "model": model,
+                "choices": [
+                    {
+                        "index": 0,
+                        "message": {"role": "assistant", "content": get_content()},
+                        "finish_reason": "stop",
+                    }
+                ],
+            }
+        )
+
+    async def stream():
+        for i in range(TOKENS):
+            await asyncio.sleep(delay)
+            chunk = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": model,
+                "choices": [
+                    {
+                        "index": 0,
+                        "delta": {"content": f"token{i} "},
+                        "finish_reason": None,
+                    }
+                ],
+            }
+            yield f"data: {json.dumps(chunk)}\n\n"
+
+        chunk = {
+            "id": completion_id,
+            "object": "chat.completion.chunk",
+            "created": created,
+            "model": model,
+            "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}],
+        }
+        yield f"data: {json.dumps(chunk)}\n\n"
+        yield "data: [DONE]\n\n"
+
+    return StreamingResponse(stream(), media_type="text/event-stream")
+
+
+app = Starlette(
+    routes=[
+        Route("/v1/models", models),
+        Route("/v1/embeddings", embeddings, methods=["POST"]),
+        Route("/v1/chat/completions", chat_completions, methods=["POST"]),
+    ]
+)
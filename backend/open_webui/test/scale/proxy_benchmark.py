@@ -0,0 +1,246 @@
+"""
+Passthrough proxy microbenchmark.
+
+Streams a response from a local aiohttp upstream through two ASGI stacks and
+reports the time to first byte and the throughput of each:
+
+- baseline: `StreamingResponse(r.content)`, which iterates the upstream body
+  line by line, behind `BaseHTTPMiddleware` layers, as the proxy routes did
+  before `UpstreamStreamingResponse`
+- passthrough: `UpstreamStreamingResponse` behind pure ASGI middlewares
+
+The stacks are called directly, without an HTTP server in front of them, so
+only the proxying itself is measured.
+
+    cd backend
+    python open_webui/test/scale/proxy_benchmark.py --requests 200 --chunks 2000
+
+Needs `aiohttp` next to the backend requirements.
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+import aiohttp
+from aiohttp import web
+from starlette.applications import Starlette
+from starlette.background import BackgroundTask
+from starlette.middleware import Middleware
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.responses import StreamingResponse
+from starlette.routing import Route
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[3]))
+
+from open_webui.utils.proxy import UpstreamStreamingResponse  # noqa: E402
+
+
+@dataclass
+class Options:
+    requests: int = 100
+    concurrency: int = 10
+    chunks: int = 1000
+    chunk_size: int = 512
+    middlewares: int = 5
+
+
+def start_upstream(options: Options):
+    # NDJSON-like body, one line per chunk as Ollama and OpenAI streams send
+    line = b"x" * (options.chunk_size - 1) + b"\n"
+
+    async def stream(request: web.Request):
+        response = web.StreamResponse(
+            headers={"Content-Type": "application/x-ndjson"}
+        )
+        await response.prepare(request)
+        for _ in range(options.chunks):
+            await response.write(line)
+        await response.write_eof()
+        return response
+
+    app = web.Application()
+    app.router.add_get("/stream", stream)
+    return app
+
+
+async def cleanup_response(response, session):
+    response.close()
+    await session.close()
+
+
+class PassthroughHTTPMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request, call_next):
+        return await call_next(request)
+
+
+class PassthroughASGIMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        async def send_wrapper(message):
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
+
+
+def create_apps(upstream_url: str, options: Options) -> dict[str, Starlette]:
+    async def baseline(request):
+        session = aiohttp.ClientSession()
+        r = await session.get(upstream_url)
+        return StreamingResponse(
+            r.content,
+            status_code=r.status,
+            headers={"Content-Type": r.headers["Content-Type"]},
+            background=BackgroundTask(cleanup_response, response=r, session=session),
+        )
+
+    async def passthrough(request):
+        session = aiohttp.ClientSession()
+        r = await session.get(upstream_url)
+        return UpstreamStreamingResponse(r, session=session)
+
+    return {
+        "baseline": Starlette(
+            routes=[Route("/", baseline)],
+            middleware=[Middleware(PassthroughHTTPMiddleware)] * options.middlewares,
+        ),
+        "passthrough": Starlette(
+            routes=[Route("/", passthrough)],
+            middleware=[Middleware(PassthroughASGIMiddleware)] * options.middlewares,
+        ),
+    }
+
+
+async def call(app) -> tuple[float, float, int]:
+    """Returns the time to first byte, total time and size of one response."""
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": "/",
+        "raw_path": b"/",
+        "query_string": b"",
+        "root_path": "",
+        "headers": [],
+        "client": ("127.0.0.1", 0),
+        "server": ("127.0.0.1", 80),
+    }
+    requested = False
+    disconnected = asyncio.Event()
+
+    async def receive():
+        nonlocal requested
+        if not requested:
+            requested = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await disconnected.wait()
+        return {"type": "http.disconnect"}
+
+    start = time.perf_counter()
+    first_byte = None
+    size = 0
+
+    async def send(message):
+        nonlocal first_byte, size
+        if message["type"] == "http.response.body" and message.get("body"):
+            if first_byte is None:
+                first_byte = time.perf_counter()
+            size += len(message["body"])
+
+    await app(scope, receive, send)
+    end = time.perf_counter()
+    disconnected.set()
+    return first_byte - start, end - start, size
+
+
+def percentile(values: list[float], p: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(p * len(values)))]
+
+
+async def measure(app, options: Options) -> dict:
+    semaphore = asyncio.Semaphore(options.concurrency)
+
+    async def limited_call():
+        async with semaphore:
+            return await call(app)
+
+    for _ in range(options.concurrency):
+        await call(app)  # warm up
+
+    start = time.perf_counter()
+    results = await asyncio.gather(
+        *(limited_call() for _ in range(options.requests))
+    )
+    elapsed = time.perf_counter() - start
+
+    ttfbs = [ttfb * 1000 for ttfb, _, _ in results]
+    durations = [duration * 1000 for _, duration, _ in results]
+    return {
+        "ttfb_p50": statistics.median(ttfbs),
+        "ttfb_p99": percentile(ttfbs, 0.99),
+        "duration_p50": statistics.median(durations),
+        "throughput": sum(size for _, _, size in results) / elapsed / 2**20,
+    }
+
+
+async def run(options: Options):
+    runner = web.AppRunner(start_upstream(options))
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+
+    try:
+        apps = create_apps(f"http://127.0.0.1:{port}/stream", options)
+        print(
+            f"{options.requests} requests, concurrency {options.concurrency}, "
+            f"{options.chunks} x {options.chunk_size} byte chunks, "
+            f"{options.middlewares} middlewares"
+        )
+        print(
+            f"{'stack':<12} {'ttfb p50':>10} {'ttfb p99':>10} "
+            f"{'total p50':>10} {'MiB/s':>8}"
+        )
+        for name, app in apps.items():
+            result = await measure(app, options)
+            print(
+                f"{name:<12} {result['ttfb_p50']:>8.2f}ms {result['ttfb_p99']:>8.2f}ms "
+                f"{result['duration_p50']:>8.2f}ms {result['throughput']:>8.1f}"
+            )
+    finally:
+        await runner.cleanup()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=Options.requests)
+    parser.add_argument("--concurrency", type=int, default=Options.concurrency)
+    parser.add_argument("--chunks", type=int, default=Options.chunks)
+    parser.add_argument("--chunk-size", type=int, default=Options.chunk_size)
+    parser.add_argument("--middlewares", type=int, default=Options.middlewares)
+    args = parser.parse_args()
+
+    asyncio.run(
+        run(
+            Options(
+                requests=args.requests,
+                concurrency=args.concurrency,
+                chunks=args.chunks,
+                chunk_size=args.chunk_size,
+                middlewares=args.middlewares,
+            )
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,28 @@
+import asyncio
+import os
+
+import pytest
+
+from harness import Options, print_report, run
+
+
+@pytest.mark.skipif(
+    not os.environ.get("OPEN_WEBUI_SCALE_TEST"),
+    reason="starts several server processes, set OPEN_WEBUI_SCALE_TEST=1 to run",
+)
+def test_cluster_state_is_shared_between_nodes():
+    options = Options(
+        nodes=2,
+        users=2,
+        clients=4,
+        chats=20,
+        concurrency=4,
+        redis_url=os.environ.get("OPEN_WEBUI_SCALE_REDIS_URL"),
+        database_url=os.environ.get("OPEN_WEBUI_SCALE_DATABASE_URL"),
+    )
+    report = asyncio.run(run(options))
+    print_report(report)
+
+    failed = [check for check in report["checks"] if not check["passed"]]
+    assert not failed, failed
+    assert report["completed"] == options.chats
@@ -150,6 +150,8 @@ class AbstractPostgresTest(AbstractIntegrationTest):
             "chat",
             "chatidtag",
             "document",
+            '"group"',
+            "group_member",
             "memory",
             "model",
             "prompt",
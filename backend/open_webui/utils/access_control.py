@@ -1,10 +1,10 @@
 from typing import Optional, Union, List, Dict, Any
 from open_webui.models.users import Users, UserModel
-from open_webui.models.groups import Groups
+from open_webui.models.groups import Groups, GroupModel
 
 
 from open_webui.config import DEFAULT_USER_PERMISSIONS
-import json
+import copy
 
 
 def fill_missing_permissions(
@@ -28,6 +28,7 @@ def fill_missing_permissions(
 def get_permissions(
     user_id: str,
     default_permissions: Dict[str, Any],
+    user_groups: Optional[List[GroupModel]] = None,
 ) -> Dict[str, Any]:
     """
     Get all permissions for a user by combining the permissions of all groups the user is a member of.
@@ -53,14 +54,15 @@ def get_permissions(
                     )  # Use the most permissive value (True > False)
         return permissions
 
-    user_groups = Groups.get_groups_by_member_id(user_id)
+    if user_groups is None:
+        user_groups = Groups.get_groups_by_member_id(user_id)
 
     # Deep copy default permissions to avoid modifying the original dict
-    permissions = json.loads(json.dumps(default_permissions))
+    permissions = copy.deepcopy(default_permissions)
 
     # Combine permissions from all user groups
     for group in user_groups:
-        group_permissions = group.permissions
+        group_permissions = group.permissions or {}
         permissions = combine_permissions(permissions, group_permissions)
 
     # Ensure all fields from default_permissions are present and filled in
@@ -73,6 +75,7 @@ def has_permission(
     user_id: str,
     permission_key: str,
     default_permissions: Dict[str, Any] = {},
+    user_groups: Optional[List[GroupModel]] = None,
 ) -> bool:
     """
     Check if a user has a specific permission by checking the group permissions
@@ -93,10 +96,11 @@ def has_permission(
     permission_hierarchy = permission_key.split(".")
 
     # Retrieve user group permissions
-    user_groups = Groups.get_groups_by_member_id(user_id)
+    if user_groups is None:
+        user_groups = Groups.get_groups_by_member_id(user_id)
 
     for group in user_groups:
-        group_permissions = group.permissions
+        group_permissions = group.permissions or {}
         if get_permission(group_permissions, permission_hierarchy):
             return True
 
@@ -111,12 +115,13 @@ def has_access(
     user_id: str,
     type: str = "write",
     access_control: Optional[dict] = None,
+    user_group_ids: Optional[List[str]] = None,
 ) -> bool:
     if access_control is None:
         return type == "read"
 
-    user_groups = Groups.get_groups_by_member_id(user_id)
-    user_group_ids = [group.id for group in user_groups]
+    if user_group_ids is None:
+        user_group_ids = Groups.get_group_ids_by_member_id(user_id)
     permission_access = access_control.get(type, {})
     permitted_group_ids = permission_access.get("group_ids", [])
     permitted_user_ids = permission_access.get("user_ids", [])
@@ -138,10 +143,67 @@ def get_users_with_access(
     permitted_user_ids = permission_access.get("user_ids", [])
 
     user_ids_with_access = set(permitted_user_ids)
-
-    for group_id in permitted_group_ids:
-        group_user_ids = Groups.get_group_user_ids_by_id(group_id)
-        if group_user_ids:
-            user_ids_with_access.update(group_user_ids)
+    user_ids_with_access.update(Groups.get_member_ids_by_group_ids(permitted_group_ids))
 
     return Users.get_users_by_user_ids(list(user_ids_with_access))
+
+
+class AuthContext:
+    """
+    Request-scoped view of a user's groups and permissions.
+    Groups and merged permissions are resolved at most once per request and
+    reused by every access check made while handling it.
+    """
+
+    def __init__(self, user: UserModel):
+        self.user = user
+        self._groups: Optional[List[GroupModel]] = None
+        self._permissions: Optional[Dict[str, Any]] = None
+        self._default_permissions: Optional[Dict[str, Any]] = None
+
+    @property
+    def groups(self) -> List[GroupModel]:
+        if self._groups is None:
+            self._groups = Groups.get_groups_by_member_id(self.user.id)
+        return self._groups
+
+    @property
+    def group_ids(self) -> List[str]:
+        return [group.id for group in self.groups]
+
+    def get_permissions(self, default_permissions: Dict[str, Any]) -> Dict[str, Any]:
+        # Merged permissions are reused as long as the same defaults are passed in
+        if self._permissions is None or (
+            self._default_permissions is not default_permissions
+        ):
+            self._permissions = get_permissions(
+                self.user.id, default_permissions, user_groups=self.groups
+            )
+            self._default_permissions = default_permissions
+        return self._permissions
+
+    def has_permission(
+        self, permission_key: str, default_permissions: Dict[str, Any] = {}
+    ) -> bool:
+        return has_permission(
+            self.user.id,
+            permission_key,
+            default_permissions,
+            user_groups=self.groups,
+        )
+
+    def has_access(
+        self, type: str = "write", access_control: Optional[dict] = None
+    ) -> bool:
+        return has_access(
+            self.user.id, type, access_control, user_group_ids=self.group_ids
+        )
+
+
+def get_auth_context(request, user: UserModel) -> AuthContext:
+    """Return the AuthContext cached on the request, creating it if needed."""
+    auth_context = getattr(request.state, "auth_context", None)
+    if auth_context is None or auth_context.user.id != user.id:
+        auth_context = AuthContext(user)
+        request.state.auth_context = auth_context
+    return auth_context
@@ -0,0 +1,107 @@
+import asyncio
+import logging
+import threading
+import time
+from typing import Optional
+
+from open_webui.models.users import Users
+from open_webui.utils.redis import get_redis_connection, get_sentinels_from_env
+from open_webui.env import (
+    REDIS_URL,
+    REDIS_SENTINEL_HOSTS,
+    REDIS_SENTINEL_PORT,
+    SRC_LOG_LEVELS,
+    USER_ACTIVITY_FLUSH_INTERVAL,
+)
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["MODELS"])
+
+
+class UserActivityCoalescer:
+    """
+    Collects user activity timestamps in memory and writes them to the DB in
+    one bulk UPDATE per flush instead of one transaction per request.
+
+    When Redis is configured, every node first merges its batch into a shared
+    sorted set (ZADD GT), so the value written is the newest timestamp seen by
+    any node and `last_active_at` stays roughly monotonic across the cluster.
+    """
+
+    REDIS_KEY = "open-webui:user_last_active"
+    # Batches are flushed within a few intervals, so older entries no longer
+    # matter to the merge and are trimmed to keep the set bounded
+    REDIS_RETENTION = max(USER_ACTIVITY_FLUSH_INTERVAL * 10, 60 * 60)
+
+    def __init__(self, redis_url: Optional[str] = None, redis_sentinels=[]):
+        self._pending: dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._redis = (
+            get_redis_connection(redis_url, redis_sentinels, decode_responses=True)
+            if redis_url
+            else None
+        )
+
+    def record(self, user_id: str, timestamp: Optional[int] = None):
+        timestamp = timestamp or int(time.time())
+        with self._lock:
+            if timestamp > self._pending.get(user_id, 0):
+                self._pending[user_id] = timestamp
+
+    def _merge_with_redis(self, pending: dict[str, int]) -> dict[str, int]:
+        try:
+            pipe = self._redis.pipeline()
+            pipe.zadd(self.REDIS_KEY, pending, gt=True)
+            pipe.zmscore(self.REDIS_KEY, list(pending.keys()))
+            pipe.zremrangebyscore(
+                self.REDIS_KEY, "-inf", int(time.time()) - self.REDIS_RETENTION
+            )
+            _, scores, _ = pipe.execute()
+
+            return {
+                user_id: max(timestamp, int(score or 0))
+                for (user_id, timestamp), score in zip(pending.items(), scores)
+            }
+        except Exception as e:
+            log.warning(f"Unable to merge user activity with Redis: {e}")
+            return pending
+
+    def flush(self) -> int:
+        with self._lock:
+            pending, self._pending = self._pending, {}
+
+        if not pending:
+            return 0
+
+        if self._redis:
+            pending = self._merge_with_redis(pending)
+
+        if not Users.update_users_last_active_by_ids(pending):
+            log.error(f"Failed to flush activity for {len(pending)} users")
+            # Put the batch back so it is retried with the next flush
+            for user_id, timestamp in pending.items():
+                self.record(user_id, timestamp)
+            return 0
+
+        return len(pending)
+
+
+user_activity = UserActivityCoalescer(
+    redis_url=REDIS_URL,
+    redis_sentinels=get_sentinels_from_env(REDIS_SENTINEL_HOSTS, REDIS_SENTINEL_PORT),
+)
+
+
+async def periodic_user_activity_flush():
+    try:
+        while True:
+            await asyncio.sleep(USER_ACTIVITY_FLUSH_INTERVAL)
+            try:
+                count = await asyncio.to_thread(user_activity.flush)
+                if count:
+                    log.debug(f"Flushed activity for {count} users")
+            except Exception as e:
+                log.exception(f"Error flushing user activity: {e}")
+    finally:
+        # Write whatever is left when the app shuts down
+        user_activity.flush()
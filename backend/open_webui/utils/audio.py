@@ -0,0 +1,120 @@
+import hashlib
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from pathlib import Path
+from typing import Optional
+
+from open_webui.utils.file_cache import FileCache
+
+# Arguments to pydub's export for each normalized format
+FORMATS = {
+    "wav": {"format": "wav"},
+    "opus": {"format": "opus", "bitrate": "32k"},
+}
+
+
+def transcode_audio(
+    input_path: str, part_path: str, output_path: str, format: str
+) -> str:
+    """
+    Converts a recording to 16 kHz mono in `format`. Runs in a worker process,
+    and writes to `part_path` first so the output appears complete or not at all.
+    """
+    from pydub import AudioSegment
+
+    try:
+        audio = AudioSegment.from_file(
+            input_path, parameters=["-ac", "1", "-ar", "16000"]
+        )
+        audio = audio.set_frame_rate(16000).set_channels(1).set_sample_width(2)
+        audio.export(part_path, **FORMATS[format])
+        os.replace(part_path, output_path)
+        return output_path
+    except BaseException:
+        Path(part_path).unlink(missing_ok=True)
+        raise
+
+
+def hash_file(file_path: str) -> str:
+    sha256 = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            sha256.update(chunk)
+    return sha256.hexdigest()
+
+
+class AudioNormalizer:
+    """
+    Converts recordings to 16 kHz mono WAV or Opus on a pool of `workers`
+    processes, caching the results by the SHA-256 of the recording, so a
+    recording transcribed again, or uploaded again, is converted only once.
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        max_size: int,
+        ttl: Optional[int] = None,
+        workers: int = 2,
+    ):
+        self.cache = FileCache(directory, max_size, ttl=ttl, name="audio.normalized")
+        # Spawned, as forking copies the locks held by the server's threads
+        self.executor = ProcessPoolExecutor(
+            max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+        )
+
+        self._lock = threading.Lock()
+        # (Key, format) -> conversion in progress
+        self._pending: dict[tuple[str, str], Future] = {}
+
+    def submit(
+        self, file_path: str, format: str = "wav", sha256: Optional[str] = None
+    ) -> Future:
+        """
+        Starts converting `file_path` unless it is cached or being converted,
+        and returns a future of the path of the converted recording.
+        """
+        if format not in FORMATS:
+            raise ValueError(f"Unsupported audio format: {format}")
+
+        key = sha256 or hash_file(file_path)
+        suffix = f".{format}"
+
+        path = self.cache.get(key, suffix)
+        if path is not None:
+            future = Future()
+            future.set_result(str(path))
+            return future
+
+        with self._lock:
+            future = self._pending.get((key, format))
+            if future is not None:
+                return future
+
+            future = self.executor.submit(
+                transcode_audio,
+                str(file_path),
+                str(self.cache.part_path(key)),
+                str(self.cache.path(key, suffix)),
+                format,
+            )
+            self._pending[(key, format)] = future
+
+        # Outside the lock, as it runs right away if the conversion is done
+        future.add_done_callback(lambda f: self._done(key, format, f))
+        return future
+
+    def _done(self, key: str, format: str, future: Future):
+        with self._lock:
+            self._pending.pop((key, format), None)
+
+        if not future.cancelled() and future.exception() is None:
+            self.cache.add(key)
+
+    def normalize(
+        self, file_path: str, format: str = "wav", sha256: Optional[str] = None
+    ) -> Path:
+        """Returns the path of the converted recording, converting it if needed."""
+        return Path(self.submit(file_path, format, sha256).result())
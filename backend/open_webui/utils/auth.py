@@ -1,3 +1,4 @@
+import asyncio
 import logging
 import uuid
 import jwt
@@ -6,14 +7,20 @@ import hmac
 import hashlib
 import requests
 import os
+import threading
+import time
 
 
+from collections import OrderedDict
 from datetime import datetime, timedelta
 import pytz
 from pytz import UTC
 from typing import Optional, Union, List, Dict
 
-from open_webui.models.users import Users
+from open_webui.models.users import Users, UserModel
+from open_webui.utils.access_control import AuthContext
+from open_webui.utils.activity import user_activity
+from open_webui.utils.redis import get_redis_connection, get_sentinels_from_env
 
 from open_webui.constants import ERROR_MESSAGES
 from open_webui.env import (
@@ -21,6 +28,11 @@ from open_webui.env import (
     TRUSTED_SIGNATURE_KEY,
     STATIC_DIR,
     SRC_LOG_LEVELS,
+    AUTH_USER_CACHE_TTL,
+    USER_LAST_ACTIVE_UPDATE_INTERVAL,
+    REDIS_URL,
+    REDIS_SENTINEL_HOSTS,
+    REDIS_SENTINEL_PORT,
 )
 
 from fastapi import BackgroundTasks, Depends, HTTPException, Request, Response, status
@@ -153,6 +165,141 @@ def get_http_authorization_cred(auth_header: Optional[str]):
         return None
 
 
+##############
+# User Cache
+##############
+
+# Users resolved from a token, keyed by a hash of the (signed) token
+USER_CACHE: dict[str, tuple[float, UserModel]] = {}
+USER_CACHE_MAX_SIZE = 10000
+
+# Last time a `last_active_at` write was issued for each user, oldest first.
+# Entries older than USER_LAST_ACTIVE_UPDATE_INTERVAL no longer throttle
+# anything and are dropped.
+USER_LAST_ACTIVE_UPDATES: OrderedDict[str, float] = OrderedDict()
+USER_LAST_ACTIVE_UPDATES_LOCK = threading.Lock()
+
+# Invalidations are published here so that every node drops its cached entries
+REDIS_USER_CACHE_CHANNEL = "open-webui:auth:user-cache:invalidate"
+
+redis = (
+    get_redis_connection(
+        REDIS_URL,
+        get_sentinels_from_env(REDIS_SENTINEL_HOSTS, REDIS_SENTINEL_PORT),
+        decode_responses=True,
+        async_mode=True,
+    )
+    if REDIS_URL
+    else None
+)
+
+
+def get_user_cache_key(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+def get_cached_user(token: str, loader) -> Optional[UserModel]:
+    """
+    Returns the user for the given token, calling `loader` only if the user
+    is not cached or the cached entry is older than AUTH_USER_CACHE_TTL.
+    """
+    if AUTH_USER_CACHE_TTL <= 0:
+        return loader()
+
+    key = get_user_cache_key(token)
+    now = time.monotonic()
+
+    cached = USER_CACHE.get(key)
+    if cached and cached[0] > now:
+        return cached[1]
+
+    user = loader()
+    if user is not None:
+        if len(USER_CACHE) >= USER_CACHE_MAX_SIZE:
+            for k, (expires, _) in list(USER_CACHE.items()):
+                if expires <= now:
+                    USER_CACHE.pop(k, None)
+            if len(USER_CACHE) >= USER_CACHE_MAX_SIZE:
+                USER_CACHE.clear()
+        USER_CACHE[key] = (now + AUTH_USER_CACHE_TTL, user)
+    else:
+        USER_CACHE.pop(key, None)
+    return user
+
+
+def drop_cached_user(user_id: Optional[str] = None):
+    """Drops this node's cached entries for a user, or all of them if no user id is given."""
+    if user_id is None:
+        USER_CACHE.clear()
+        return
+
+    for key, (_, user) in list(USER_CACHE.items()):
+        if user.id == user_id:
+            USER_CACHE.pop(key, None)
+
+
+async def invalidate_user_cache(user_id: Optional[str] = None):
+    """Drops cached entries for a user, or the whole cache, on every node."""
+    drop_cached_user(user_id)
+
+    if redis:
+        try:
+            await redis.publish(REDIS_USER_CACHE_CHANNEL, user_id or "*")
+        except Exception as e:
+            log.warning(f"Unable to publish user cache invalidation: {e}")
+
+
+async def listen_for_user_cache_invalidations():
+    """
+    Drop cached users when another node invalidates them on the cache channel.
+    """
+    if not redis:
+        return
+
+    while True:
+        pubsub = redis.pubsub(ignore_subscribe_messages=True)
+        try:
+            await pubsub.subscribe(REDIS_USER_CACHE_CHANNEL)
+            async for message in pubsub.listen():
+                if message.get("type") != "message":
+                    continue
+
+                user_id = message["data"]
+                drop_cached_user(None if user_id == "*" else user_id)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            log.warning(f"User cache listener disconnected, retrying: {e}")
+            # Entries may have been invalidated while disconnected
+            USER_CACHE.clear()
+            await asyncio.sleep(1)
+        finally:
+            await pubsub.close()
+
+
+def should_update_last_active(user_id: str) -> bool:
+    """Throttles `last_active_at` writes to one per USER_LAST_ACTIVE_UPDATE_INTERVAL."""
+    now = time.monotonic()
+    with USER_LAST_ACTIVE_UPDATES_LOCK:
+        last_update = USER_LAST_ACTIVE_UPDATES.get(user_id)
+        if (
+            last_update is not None
+            and now - last_update < USER_LAST_ACTIVE_UPDATE_INTERVAL
+        ):
+            return False
+
+        USER_LAST_ACTIVE_UPDATES[user_id] = now
+        USER_LAST_ACTIVE_UPDATES.move_to_end(user_id)
+
+        while USER_LAST_ACTIVE_UPDATES and (
+            len(USER_LAST_ACTIVE_UPDATES) > USER_CACHE_MAX_SIZE
+            or now - next(iter(USER_LAST_ACTIVE_UPDATES.values()))
+            >= USER_LAST_ACTIVE_UPDATE_INTERVAL
+        ):
+            USER_LAST_ACTIVE_UPDATES.popitem(last=False)
+        return True
+
+
 def get_current_user(
     request: Request,
     background_tasks: BackgroundTasks,
@@ -194,7 +341,9 @@ def get_current_user(
                     status.HTTP_403_FORBIDDEN, detail=ERROR_MESSAGES.API_KEY_NOT_ALLOWED
                 )
 
-        return get_current_user_by_api_key(token)
+        user = get_current_user_by_api_key(token)
+        request.state.auth_context = AuthContext(user)
+        return user
 
     # auth by jwt token
     try:
@@ -206,17 +355,19 @@ def get_current_user(
         )
 
     if data is not None and "id" in data:
-        user = Users.get_user_by_id(data["id"])
+        user = get_cached_user(token, lambda: Users.get_user_by_id(data["id"]))
         if user is None:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail=ERROR_MESSAGES.INVALID_TOKEN,
             )
         else:
-            # Refresh the user's last active timestamp asynchronously
-            # to prevent blocking the request
-            if background_tasks:
-                background_tasks.add_task(Users.update_user_last_active_by_id, user.id)
+            # Refresh the user's last active timestamp with the next batched flush
+            # to prevent a write per request
+            if should_update_last_active(user.id):
+                user_activity.record(user.id)
+
+        request.state.auth_context = AuthContext(user)
         return user
     else:
         raise HTTPException(
@@ -226,15 +377,15 @@ def get_current_user(
 
 
 def get_current_user_by_api_key(api_key: str):
-    user = Users.get_user_by_api_key(api_key)
+    user = get_cached_user(api_key, lambda: Users.get_user_by_api_key(api_key))
 
     if user is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail=ERROR_MESSAGES.INVALID_TOKEN,
         )
-    else:
-        Users.update_user_last_active_by_id(user.id)
+    elif should_update_last_active(user.id):
+        user_activity.record(user.id)
 
     return user
 
@@ -44,8 +44,9 @@ from open_webui.utils.plugin import load_function_module_by_id
 from open_webui.utils.models import get_all_models, check_model_access
 from open_webui.utils.payload import convert_payload_openai_to_ollama
 from open_webui.utils.response import (
+    ChunkStreamingResponse,
     convert_response_ollama_to_openai,
-    convert_streaming_response_ollama_to_openai,
+    convert_streaming_chunks_ollama_to_openai,
 )
 from open_webui.utils.filter import (
     get_sorted_filter_ids,
@@ -230,9 +231,21 @@ async def generate_chat_completion(
                     async for chunk in stream:
                         yield chunk
 
+                async def chunk_stream_wrapper(chunks):
+                    yield {"selected_model_id": selected_model_id}
+                    async for chunk in chunks:
+                        yield chunk
+
                 response = await generate_chat_completion(
                     request, form_data, user, bypass_filter=True
                 )
+
+                if isinstance(response, ChunkStreamingResponse):
+                    return ChunkStreamingResponse(
+                        chunk_stream_wrapper(response.chunks),
+                        background=response.background,
+                    )
+
                 return StreamingResponse(
                     stream_wrapper(response.body_iterator),
                     media_type="text/event-stream",
@@ -264,8 +277,8 @@ async def generate_chat_completion(
             )
             if form_data.get("stream"):
                 response.headers["content-type"] = "text/event-stream"
-                return StreamingResponse(
-                    convert_streaming_response_ollama_to_openai(response),
+                return ChunkStreamingResponse(
+                    convert_streaming_chunks_ollama_to_openai(response),
                     headers=dict(response.headers),
                     background=response.background,
                 )
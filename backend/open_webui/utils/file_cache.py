@@ -0,0 +1,198 @@
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Iterator, Optional
+
+from open_webui.utils import metrics
+
+# Evictions scan whole cache directories, so they run off the event loop
+eviction_executor = ThreadPoolExecutor(
+    max_workers=1, thread_name_prefix="disk-cache-eviction"
+)
+
+
+class DiskCache:
+    """
+    Index of the entries of a cache directory, evicting entries not used for
+    `ttl` seconds, then the least recently used ones while the cache holds
+    more than `max_size` bytes. The last use is kept as the files'
+    modification time, so it survives restarts and is shared by the workers
+    using the same directory.
+
+    Subclasses define the layout of the entries on disk with `_scan_entries`
+    and `_remove_entry`. Eviction rescans the directory to pick up the other
+    workers' entries, and runs on a background thread.
+    """
+
+    # Expired entries are looked for at most this often, unless over budget
+    EVICTION_INTERVAL = 60
+
+    def __init__(
+        self,
+        directory: Path,
+        max_size: int,
+        ttl: Optional[int] = None,
+        name: str = "cache",
+    ):
+        self.directory = Path(directory)
+        self.max_size = max_size
+        self.ttl = ttl
+
+        self._lock = threading.Lock()
+        # Entry -> [last used, size in bytes], least recently used first
+        self._entries: Optional[OrderedDict] = None
+        self._size = 0
+
+        self._eviction_lock = threading.Lock()
+        self._eviction: Optional[Future] = None
+        self._last_eviction = 0.0
+
+        self.hits = metrics.counter(f"{name}.hits")
+        self.misses = metrics.counter(f"{name}.misses")
+        self.evictions = metrics.counter(f"{name}.evictions")
+        metrics.gauge(f"{name}.bytes", lambda: self._size)
+
+    def _scan_entries(self) -> Iterator[tuple[str, float, int]]:
+        """Yields the entries on disk as (entry, last used, size in bytes)."""
+        raise NotImplementedError
+
+    def _remove_entry(self, entry: str):
+        raise NotImplementedError
+
+    def _touch(self, entry: str, path: Path):
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+        with self._lock:
+            if self._entries is not None and entry in self._entries:
+                self._entries[entry][0] = time.time()
+                self._entries.move_to_end(entry)
+
+    def _add(self, entry: str, size: int):
+        """Accounts for an entry just written, evicting others if needed."""
+        with self._lock:
+            if self._entries is not None:
+                self._size += size - self._entries.pop(entry, [0, 0])[1]
+                self._entries[entry] = [time.time(), size]
+
+            if (
+                self._entries is None
+                or self._size > self.max_size
+                or time.time() - self._last_eviction > self.EVICTION_INTERVAL
+            ):
+                self._schedule_eviction()
+
+    def _forget(self, entry: str):
+        with self._lock:
+            if self._entries is not None and entry in self._entries:
+                self._size -= self._entries.pop(entry)[1]
+
+    def _schedule_eviction(self):
+        # Called with the lock held
+        if self._eviction is None or self._eviction.done():
+            self._last_eviction = time.time()
+            self._eviction = eviction_executor.submit(self.evict)
+
+    def evict(self):
+        """Rescans the directory and evicts the expired and surplus entries."""
+        with self._eviction_lock:
+            entries = sorted(self._scan_entries(), key=lambda entry: entry[1])
+
+            with self._lock:
+                self._entries = OrderedDict(
+                    (entry, [last_used, size]) for entry, last_used, size in entries
+                )
+                self._size = sum(size for _, size in self._entries.values())
+
+                now = time.time()
+                self._last_eviction = now
+                expired = now - self.ttl if self.ttl else 0
+
+                # The most recently used entry is always kept
+                evicted = []
+                for entry, (last_used, size) in list(self._entries.items())[:-1]:
+                    if last_used >= expired and self._size <= self.max_size:
+                        break
+                    del self._entries[entry]
+                    self._size -= size
+                    evicted.append(entry)
+
+            for entry in evicted:
+                self._remove_entry(entry)
+                self.evictions.inc()
+
+
+class FileCache(DiskCache):
+    """
+    Files stored as `<directory>/<key[:2]>/<key><suffix>`, where a key may have
+    several files (e.g. a clip and the request that produced it).
+    """
+
+    def path(self, key: str, suffix: str) -> Path:
+        shard = self.directory / key[:2]
+        shard.mkdir(parents=True, exist_ok=True)
+        return shard / f"{key}{suffix}"
+
+    def part_path(self, key: str) -> Path:
+        """A hidden temporary path to write an entry's file before moving it in place."""
+        return self.path(key, "").with_name(f".{key}.{uuid.uuid4().hex}.part")
+
+    def get(self, key: str, suffix: str) -> Optional[Path]:
+        path = self.path(key, suffix)
+        try:
+            last_used = path.stat().st_mtime
+        except FileNotFoundError:
+            self.misses.inc()
+            return None
+
+        if self.ttl and time.time() - last_used > self.ttl:
+            self.remove(key)
+            self.misses.inc()
+            return None
+
+        self._touch(key, path)
+        self.hits.inc()
+        return path
+
+    def _files(self, key: str) -> list[Path]:
+        return list((self.directory / key[:2]).glob(f"{key}.*"))
+
+    def add(self, key: str):
+        """Accounts for the files just written for `key`."""
+        self._add(key, sum(path.stat().st_size for path in self._files(key)))
+
+    def remove(self, key: str):
+        self._remove_entry(key)
+        self._forget(key)
+
+    def _remove_entry(self, key: str):
+        for path in self._files(key):
+            path.unlink(missing_ok=True)
+
+    def _scan_entries(self) -> Iterator[tuple[str, float, int]]:
+        entries = {}
+        if self.directory.is_dir():
+            for shard in self.directory.iterdir():
+                if not shard.is_dir():
+                    continue
+                for path in shard.iterdir():
+                    # Skips the files being written
+                    if path.name.startswith("."):
+                        continue
+                    try:
+                        stat = path.stat()
+                    except FileNotFoundError:
+                        continue
+
+                    key = path.name.split(".")[0]
+                    last_used, size = entries.get(key, (0, 0))
+                    entries[key] = (max(last_used, stat.st_mtime), size + stat.st_size)
+
+        for key, (last_used, size) in entries.items():
+            yield key, last_used, size
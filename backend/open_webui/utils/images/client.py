@@ -0,0 +1,54 @@
+import asyncio
+import io
+from typing import Optional
+
+import aiohttp
+from open_webui.env import AIOHTTP_CLIENT_TIMEOUT
+
+_session: Optional[aiohttp.ClientSession] = None
+
+
+def get_session() -> aiohttp.ClientSession:
+    """
+    The session shared by the image generation clients, so their requests to
+    the same server reuse connections. Must be called from the event loop.
+    """
+    global _session
+    if _session is None or _session.closed:
+        _session = aiohttp.ClientSession(
+            timeout=aiohttp.ClientTimeout(total=AIOHTTP_CLIENT_TIMEOUT),
+            trust_env=True,
+        )
+    return _session
+
+
+async def close_session():
+    global _session
+    if _session is not None:
+        await _session.close()
+        _session = None
+
+
+class ResponseReader(io.RawIOBase):
+    """
+    A file object over the body of an aiohttp response, for handing the body
+    to blocking code, e.g. storage uploads, running in a worker thread while
+    the event loop keeps receiving it.
+    """
+
+    def __init__(self, response: aiohttp.ClientResponse):
+        self.response = response
+        self.loop = asyncio.get_running_loop()
+
+    def readable(self) -> bool:
+        return True
+
+    def read(self, size: int = -1) -> bytes:
+        return asyncio.run_coroutine_threadsafe(
+            self.response.content.read(size), self.loop
+        ).result()
+
+    def readinto(self, buffer) -> int:
+        data = self.read(len(buffer))
+        buffer[: len(data)] = data
+        return len(data)
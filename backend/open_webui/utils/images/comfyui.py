@@ -3,11 +3,13 @@ import json
 import logging
 import random
 import urllib.parse
-import urllib.request
+import uuid
+from collections import OrderedDict
 from typing import Optional
 
-import websocket  # NOTE: websocket-client (https://github.com/websocket-client/websocket-client)
+import aiohttp
 from open_webui.env import SRC_LOG_LEVELS
+from open_webui.utils.images.client import get_session
 from pydantic import BaseModel
 
 log = logging.getLogger(__name__)
@@ -15,80 +17,207 @@ log.setLevel(SRC_LOG_LEVELS["COMFYUI"])
 
 default_headers = {"User-Agent": "Mozilla/5.0"}
 
+# Prompts that finished before they were waited on are remembered this long
+FINISHED_PROMPTS_SIZE = 256
 
-def queue_prompt(prompt, client_id, base_url, api_key):
-    log.info("queue_prompt")
-    p = {"prompt": prompt, "client_id": client_id}
-    data = json.dumps(p).encode("utf-8")
-    log.debug(f"queue_prompt data: {data}")
-    try:
-        req = urllib.request.Request(
-            f"{base_url}/prompt",
-            data=data,
-            headers={**default_headers, "Authorization": f"Bearer {api_key}"},
-        )
-        response = urllib.request.urlopen(req).read()
-        return json.loads(response)
-    except Exception as e:
-        log.exception(f"Error while queuing prompt: {e}")
-        raise e
-
-
-def get_image(filename, subfolder, folder_type, base_url, api_key):
-    log.info("get_image")
-    data = {"filename": filename, "subfolder": subfolder, "type": folder_type}
-    url_values = urllib.parse.urlencode(data)
-    req = urllib.request.Request(
-        f"{base_url}/view?{url_values}",
-        headers={**default_headers, "Authorization": f"Bearer {api_key}"},
-    )
-    with urllib.request.urlopen(req) as response:
-        return response.read()
-
-
-def get_image_url(filename, subfolder, folder_type, base_url):
-    log.info("get_image")
-    data = {"filename": filename, "subfolder": subfolder, "type": folder_type}
-    url_values = urllib.parse.urlencode(data)
-    return f"{base_url}/view?{url_values}"
-
-
-def get_history(prompt_id, base_url, api_key):
-    log.info("get_history")
-
-    req = urllib.request.Request(
-        f"{base_url}/history/{prompt_id}",
-        headers={**default_headers, "Authorization": f"Bearer {api_key}"},
-    )
-    with urllib.request.urlopen(req) as response:
-        return json.loads(response.read())
-
-
-def get_images(ws, prompt, client_id, base_url, api_key):
-    prompt_id = queue_prompt(prompt, client_id, base_url, api_key)["prompt_id"]
-    output_images = []
-    while True:
-        out = ws.recv()
-        if isinstance(out, str):
-            message = json.loads(out)
-            if message["type"] == "executing":
-                data = message["data"]
-                if data["node"] is None and data["prompt_id"] == prompt_id:
-                    break  # Execution is done
-        else:
-            continue  # previews are binary data
-
-    history = get_history(prompt_id, base_url, api_key)[prompt_id]
-    for o in history["outputs"]:
-        for node_id in history["outputs"]:
-            node_output = history["outputs"][node_id]
-            if "images" in node_output:
-                for image in node_output["images"]:
-                    url = get_image_url(
-                        image["filename"], image["subfolder"], image["type"], base_url
+# How long to wait for a queued prompt to finish, in seconds
+PROMPT_TIMEOUT = 600
+
+
+class ComfyUIClient:
+    """
+    Client for a ComfyUI server. One websocket, opened on first use, receives
+    the progress of every prompt queued by the client, so any number of
+    generations can wait on their prompts at the same time.
+    """
+
+    def __init__(self, base_url: str, api_key: Optional[str] = None):
+        self.base_url = base_url
+        self.api_key = api_key
+        # ComfyUI keeps one websocket per client id, so the id is not shared
+        # with other clients or workers
+        self.client_id = str(uuid.uuid4())
+
+        self._ws: Optional[aiohttp.ClientWebSocketResponse] = None
+        self._listener: Optional[asyncio.Task] = None
+        self._connect_lock = asyncio.Lock()
+
+        # Prompt id -> future set to the prompt's error, or None, when it ends
+        self._prompts: dict[str, asyncio.Future] = {}
+        self._finished: OrderedDict[str, Optional[str]] = OrderedDict()
+
+    @property
+    def headers(self) -> dict:
+        return {
+            **default_headers,
+            **({"Authorization": f"Bearer {self.api_key}"} if self.api_key else {}),
+        }
+
+    async def connect(self):
+        async with self._connect_lock:
+            if (
+                self._ws is not None
+                and not self._ws.closed
+                and self._listener is not None
+                and not self._listener.done()
+            ):
+                return
+
+            if self._ws is not None and not self._ws.closed:
+                await self._ws.close()
+
+            ws_url = self.base_url.replace("http://", "ws://").replace(
+                "https://", "wss://"
+            )
+            self._ws = await get_session().ws_connect(
+                f"{ws_url}/ws?clientId={self.client_id}",
+                headers=self.headers,
+                heartbeat=30,
+                max_msg_size=0,
+            )
+            log.info("WebSocket connection established.")
+            self._listener = asyncio.create_task(self._listen(self._ws))
+
+    async def _listen(self, ws: aiohttp.ClientWebSocketResponse):
+        try:
+            async for msg in ws:
+                if msg.type != aiohttp.WSMsgType.TEXT:
+                    continue  # previews are binary data
+
+                try:
+                    message = json.loads(msg.data)
+                except ValueError:
+                    log.warning(f"Ignoring malformed WebSocket message: {msg.data}")
+                    continue
+
+                message_type = message.get("type")
+                data = message.get("data") or {}
+                if (
+                    message_type == "executing" and data.get("node") is None
+                ) or message_type == "execution_success":
+                    self._finish(data.get("prompt_id"), None)
+                elif message_type in ["execution_error", "execution_interrupted"]:
+                    self._finish(
+                        data.get("prompt_id"),
+                        data.get("exception_message", message_type),
                     )
-                    output_images.append({"url": url})
-    return {"data": output_images}
+        except Exception as e:
+            log.exception(f"Error while receiving from WebSocket server: {e}")
+        finally:
+            log.info("WebSocket connection closed.")
+            # The prompts still running can no longer be followed
+            for future in self._prompts.values():
+                if not future.done():
+                    future.set_exception(
+                        ConnectionError("Lost the connection to ComfyUI")
+                    )
+            self._prompts.clear()
+
+            # The next connect() opens a new connection and listener
+            if not ws.closed:
+                await ws.close()
+
+    def _finish(self, prompt_id: Optional[str], error: Optional[str]):
+        if prompt_id is None:
+            return
+
+        future = self._prompts.pop(prompt_id, None)
+        if future is None:
+            self._finished[prompt_id] = error
+            while len(self._finished) > FINISHED_PROMPTS_SIZE:
+                self._finished.popitem(last=False)
+        elif not future.done():
+            future.set_result(error)
+
+    async def request(self, method: str, path: str, **kwargs):
+        async with get_session().request(
+            method, f"{self.base_url}{path}", headers=self.headers, **kwargs
+        ) as r:
+            r.raise_for_status()
+            return await r.json(content_type=None)
+
+    async def queue_prompt(self, prompt: dict) -> str:
+        log.info("queue_prompt")
+        log.debug(f"queue_prompt prompt: {prompt}")
+        try:
+            res = await self.request(
+                "POST", "/prompt", json={"prompt": prompt, "client_id": self.client_id}
+            )
+            return res["prompt_id"]
+        except Exception as e:
+            log.exception(f"Error while queuing prompt: {e}")
+            raise e
+
+    async def wait_for_prompt(self, prompt_id: str, timeout: float = PROMPT_TIMEOUT):
+        if prompt_id in self._finished:
+            error = self._finished.pop(prompt_id)
+        else:
+            future = asyncio.get_running_loop().create_future()
+            self._prompts[prompt_id] = future
+            try:
+                error = await asyncio.wait_for(future, timeout)
+            except asyncio.TimeoutError:
+                raise TimeoutError(
+                    f"ComfyUI: prompt {prompt_id} did not finish in {timeout}s"
+                )
+            finally:
+                self._prompts.pop(prompt_id, None)
+
+        if error:
+            raise Exception(f"ComfyUI: {error}")
+
+    async def get_history(self, prompt_id: str) -> dict:
+        log.info("get_history")
+        return await self.request("GET", f"/history/{prompt_id}")
+
+    async def get_object_info(self) -> dict:
+        return await self.request("GET", "/object_info")
+
+    def get_image_url(self, filename, subfolder, folder_type) -> str:
+        data = {"filename": filename, "subfolder": subfolder, "type": folder_type}
+        url_values = urllib.parse.urlencode(data)
+        return f"{self.base_url}/view?{url_values}"
+
+    async def get_images(self, prompt: dict) -> dict:
+        await self.connect()
+        prompt_id = await self.queue_prompt(prompt)
+        await self.wait_for_prompt(prompt_id)
+
+        history = (await self.get_history(prompt_id))[prompt_id]
+        output_images = []
+        for node_output in history["outputs"].values():
+            for image in node_output.get("images", []):
+                url = self.get_image_url(
+                    image["filename"], image["subfolder"], image["type"]
+                )
+                output_images.append({"url": url})
+        return {"data": output_images}
+
+    async def close(self):
+        if self._ws is not None:
+            await self._ws.close()
+        if self._listener is not None:
+            await self._listener
+
+
+_client: Optional[ComfyUIClient] = None
+
+
+async def get_comfyui_client(base_url: str, api_key: Optional[str]) -> ComfyUIClient:
+    """Returns the client for the configured server, replacing a stale one."""
+    global _client
+    if _client is None or (_client.base_url, _client.api_key) != (base_url, api_key):
+        if _client is not None:
+            await _client.close()
+        _client = ComfyUIClient(base_url, api_key)
+    return _client
+
+
+async def close_comfyui_client():
+    global _client
+    if _client is not None:
+        await _client.close()
+        _client = None
 
 
 class ComfyUINodeInput(BaseModel):
@@ -117,9 +246,8 @@ class ComfyUIGenerateImageForm(BaseModel):
 
 
 async def comfyui_generate_image(
-    model: str, payload: ComfyUIGenerateImageForm, client_id, base_url, api_key
+    model: str, payload: ComfyUIGenerateImageForm, base_url, api_key
 ):
-    ws_url = base_url.replace("http://", "ws://").replace("https://", "wss://")
     workflow = json.loads(payload.workflow.workflow)
 
     for node in payload.workflow.nodes:
@@ -169,25 +297,8 @@ async def comfyui_generate_image(
             for node_id in node.node_ids:
                 workflow[node_id]["inputs"][node.key] = node.value
 
-    try:
-        ws = websocket.WebSocket()
-        headers = {"Authorization": f"Bearer {api_key}"}
-        ws.connect(f"{ws_url}/ws?clientId={client_id}", header=headers)
-        log.info("WebSocket connection established.")
-    except Exception as e:
-        log.exception(f"Failed to connect to WebSocket server: {e}")
-        return None
-
-    try:
-        log.info("Sending workflow to WebSocket server.")
-        log.info(f"Workflow: {workflow}")
-        images = await asyncio.to_thread(
-            get_images, ws, workflow, client_id, base_url, api_key
-        )
-    except Exception as e:
-        log.exception(f"Error while receiving images: {e}")
-        images = None
-
-    ws.close()
-
-    return images
+    client = await get_comfyui_client(base_url, api_key)
+
+    log.info("Sending workflow to ComfyUI server.")
+    log.info(f"Workflow: {workflow}")
+    return await client.get_images(workflow)
@@ -0,0 +1,175 @@
+import io
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+from PIL import Image
+
+try:
+    # Adds AVIF support to Pillow releases without it
+    import pillow_avif  # noqa: F401
+except ImportError:
+    pass
+
+from open_webui.config import (
+    ENABLE_IMAGE_VARIANTS,
+    IMAGE_VARIANT_FORMATS,
+    IMAGE_VARIANT_QUALITY,
+    IMAGE_VARIANT_WIDTHS,
+    IMAGE_VARIANT_WORKERS,
+)
+from open_webui.env import SRC_LOG_LEVELS
+from open_webui.models.files import FileModel, Files
+from open_webui.storage.provider import Storage
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["IMAGES"])
+
+# Format -> Pillow format and content type
+FORMATS = {
+    "webp": ("WEBP", "image/webp"),
+    "avif": ("AVIF", "image/avif"),
+}
+
+executor = ThreadPoolExecutor(
+    max_workers=IMAGE_VARIANT_WORKERS, thread_name_prefix="image-variants"
+)
+
+
+def get_variant_formats() -> list[str]:
+    Image.init()
+    return [
+        format
+        for format in IMAGE_VARIANT_FORMATS
+        if format in FORMATS and FORMATS[format][0] in Image.SAVE
+    ]
+
+
+def create_image_variants(file: FileModel) -> dict:
+    """
+    Encodes the image of `file` in each variant format, at full size and at
+    each configured width narrower than the image, and stores the results.
+    Full-size variants no smaller than the original are left out.
+    """
+    formats = get_variant_formats()
+    original_size = (file.meta or {}).get("size")
+
+    with Image.open(Storage.get_file(file.path)) as image:
+        image.load()
+        if image.mode not in ["RGB", "RGBA"]:
+            has_alpha = image.mode in ["LA", "PA"] or "transparency" in image.info
+            image = image.convert("RGBA" if has_alpha else "RGB")
+
+        variants = []
+        for width in sorted({w for w in IMAGE_VARIANT_WIDTHS if w < image.width}):
+            variants.extend(
+                save_variants(
+                    file,
+                    image.resize(
+                        (width, max(round(image.height * width / image.width), 1)),
+                        Image.LANCZOS,
+                    ),
+                    formats,
+                )
+            )
+
+        variants.extend(save_variants(file, image, formats, max_size=original_size))
+        return {"width": image.width, "height": image.height, "variants": variants}
+
+
+def save_variants(
+    file: FileModel,
+    image: Image.Image,
+    formats: list[str],
+    max_size: Optional[int] = None,
+) -> list[dict]:
+    variants = []
+    for format in formats:
+        pillow_format, content_type = FORMATS[format]
+
+        buffer = io.BytesIO()
+        image.save(buffer, pillow_format, quality=IMAGE_VARIANT_QUALITY)
+        if max_size is not None and buffer.tell() >= max_size:
+            continue
+
+        buffer.seek(0)
+        upload, path = Storage.upload_file(buffer, f"{file.id}_{image.width}w.{format}")
+        variants.append(
+            {
+                "width": image.width,
+                "height": image.height,
+                "content_type": content_type,
+                "path": path,
+                "size": upload["size"],
+                "sha256": upload["sha256"],
+            }
+        )
+    return variants
+
+
+def process_image_variants(id: str):
+    file = Files.get_file_by_id(id)
+    if not file:
+        return
+
+    try:
+        image = create_image_variants(file)
+    except Exception as e:
+        log.exception(f"Error creating variants of image {id}: {e}")
+        return
+
+    if not Files.update_file_metadata_by_id(id, {"image": image}):
+        # Deleted while its variants were created
+        Storage.delete_files([variant["path"] for variant in image["variants"]])
+
+
+def schedule_image_variants(file: FileModel):
+    """Creates the variants of an uploaded image in the background."""
+    if ENABLE_IMAGE_VARIANTS and get_variant_formats():
+        executor.submit(process_image_variants, file.id)
+
+
+def get_file_storage_paths(file: FileModel) -> list[str]:
+    """Paths of the content of `file` in storage, with its image variants."""
+    image = (file.meta or {}).get("image") or {}
+    return [file.path, *(variant["path"] for variant in image.get("variants", []))]
+
+
+def get_accepted_types(accept: str) -> set[str]:
+    types = set()
+    for media_range in accept.split(","):
+        media_type, *params = [part.strip() for part in media_range.split(";")]
+        if not any(param.replace(" ", "") in ["q=0", "q=0.0"] for param in params):
+            types.add(media_type.lower())
+    return types
+
+
+def select_image_variant(
+    file: FileModel, accept: str, width: Optional[int] = None
+) -> Optional[dict]:
+    """
+    Picks the smallest variant in a format the client lists in `accept`, of
+    the narrowest width that is at least `width` (full size by default).
+    Returns None when the original is the better choice.
+    """
+    image = (file.meta or {}).get("image")
+    if not image:
+        return None
+
+    accepted = get_accepted_types(accept)
+    candidates = [
+        variant
+        for variant in image.get("variants", [])
+        if variant["content_type"] in accepted
+    ]
+
+    # The original counts as available at full size
+    widths = {variant["width"] for variant in candidates} | {image["width"]}
+    target = min(
+        [w for w in widths if width and w >= width] or [image["width"]],
+    )
+
+    candidates = [variant for variant in candidates if variant["width"] == target]
+    if not candidates:
+        return None
+    return min(candidates, key=lambda variant: variant["size"])
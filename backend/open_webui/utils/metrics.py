@@ -0,0 +1,80 @@
+import threading
+from collections import deque
+from typing import Callable, Union
+
+
+class Counter:
+    def __init__(self):
+        self.value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: int = 1):
+        with self._lock:
+            self.value += amount
+
+    def snapshot(self):
+        return self.value
+
+
+class Gauge:
+    """Reports the current value of `func` whenever metrics are read."""
+
+    def __init__(self, func: Callable[[], Union[int, float]]):
+        self.func = func
+
+    def snapshot(self):
+        return self.func()
+
+
+class Histogram:
+    """
+    Keeps the last `size` observations to report percentiles, plus the total
+    count and maximum since startup.
+    """
+
+    def __init__(self, size: int = 1024):
+        self.count = 0
+        self.max = 0.0
+        self._values = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        with self._lock:
+            self.count += 1
+            self.max = max(self.max, value)
+            self._values.append(value)
+
+    def snapshot(self):
+        with self._lock:
+            values = sorted(self._values)
+
+        def percentile(p):
+            return values[min(len(values) - 1, int(p * len(values)))] if values else 0
+
+        return {
+            "count": self.count,
+            "max": self.max,
+            "p50": percentile(0.5),
+            "p90": percentile(0.9),
+            "p99": percentile(0.99),
+        }
+
+
+METRICS: dict[str, Union[Counter, Gauge, Histogram]] = {}
+
+
+def counter(name: str) -> Counter:
+    return METRICS.setdefault(name, Counter())
+
+
+def gauge(name: str, func: Callable[[], Union[int, float]]) -> Gauge:
+    METRICS[name] = Gauge(func)
+    return METRICS[name]
+
+
+def histogram(name: str, size: int = 1024) -> Histogram:
+    return METRICS.setdefault(name, Histogram(size))
+
+
+def get_metrics() -> dict:
+    return {name: metric.snapshot() for name, metric in sorted(METRICS.items())}
@@ -72,6 +72,7 @@ from open_webui.utils.misc import (
 )
 from open_webui.utils.tools import get_tools
 from open_webui.utils.plugin import load_function_module_by_id
+from open_webui.utils.response import iter_stream_chunks
 from open_webui.utils.filter import (
     get_sorted_filter_ids,
     process_filter_functions,
@@ -90,7 +91,6 @@ from open_webui.env import (
     SRC_LOG_LEVELS,
     GLOBAL_LOG_LEVEL,
     BYPASS_MODEL_ACCESS_CONTROL,
-    ENABLE_REALTIME_CHAT_SAVE,
 )
 from open_webui.constants import TASKS
 from open_webui.mcp.mcp import cleanup_mcp_servers
@@ -1154,7 +1154,7 @@ async def process_chat_response(
                     )
 
                     # Send a webhook notification if the user is not active
-                    if get_active_status_by_user_id(user.id) is None:
+                    if await get_active_status_by_user_id(user.id) is None:
                         webhook_url = Users.get_user_webhook_url_by_id(user.id)
                         if webhook_url:
                             post_webhook(
@@ -1605,24 +1605,10 @@ async def process_chat_response(
 
                     response_tool_calls = []
 
-                    async for line in response.body_iterator:
-                        line = line.decode("utf-8") if isinstance(line, bytes) else line
-                        data = line
-
-                        # Skip empty lines
-                        if not data.strip():
-                            continue
-
-                        # "data:" is the prefix for each event
-                        if not data.startswith("data:"):
-                            continue
-
-                        # Remove the prefix
-                        data = data[len("data:") :].strip()
-
+                    # Each chunk is parsed once, either by the provider adapter
+                    # or here from the `data:` lines of an SSE stream
+                    async for data in iter_stream_chunks(response):
                         try:
-                            data = json.loads(data)
-
                             data, _ = await process_filter_functions(
                                 request=request,
                                 filter_functions=filter_functions,
@@ -1809,23 +1795,11 @@ async def process_chat_response(
                                                 )
                                             )
 
-                                        if ENABLE_REALTIME_CHAT_SAVE:
-                                            # Save message in the database
-                                            Chats.upsert_message_to_chat_by_id_and_message_id(
-                                                metadata["chat_id"],
-                                                metadata["message_id"],
-                                                {
-                                                    "content": serialize_content_blocks(
-                                                        content_blocks
-                                                    ),
-                                                },
-                                            )
-                                        else:
-                                            data = {
-                                                "content": serialize_content_blocks(
-                                                    content_blocks
-                                                ),
-                                            }
+                                        data = {
+                                            "content": serialize_content_blocks(
+                                                content_blocks
+                                            ),
+                                        }
 
                                 await event_emitter(
                                     {
@@ -1834,12 +1808,8 @@ async def process_chat_response(
                                     }
                                 )
                         except Exception as e:
-                            done = "data: [DONE]" in line
-                            if done:
-                                pass
-                            else:
-                                log.debug("Error: ", e)
-                                continue
+                            log.debug("Error: ", e)
+                            continue
 
                     if content_blocks:
                         # Clean up the last text block
@@ -2282,18 +2252,17 @@ async def process_chat_response(
                     "title": title,
                 }
 
-                if not ENABLE_REALTIME_CHAT_SAVE:
-                    # Save message in the database
-                    Chats.upsert_message_to_chat_by_id_and_message_id(
-                        metadata["chat_id"],
-                        metadata["message_id"],
-                        {
-                            "content": serialize_content_blocks(content_blocks),
-                        },
-                    )
+                # Save message in the database
+                Chats.upsert_message_to_chat_by_id_and_message_id(
+                    metadata["chat_id"],
+                    metadata["message_id"],
+                    {
+                        "content": serialize_content_blocks(content_blocks),
+                    },
+                )
 
                 # Send a webhook notification if the user is not active
-                if get_active_status_by_user_id(user.id) is None:
+                if await get_active_status_by_user_id(user.id) is None:
                     webhook_url = Users.get_user_webhook_url_by_id(user.id)
                     if webhook_url:
                         post_webhook(
@@ -2320,15 +2289,14 @@ async def process_chat_response(
                 log.warning("Task was cancelled!")
                 await event_emitter({"type": "task-cancelled"})
 
-                if not ENABLE_REALTIME_CHAT_SAVE:
-                    # Save message in the database
-                    Chats.upsert_message_to_chat_by_id_and_message_id(
-                        metadata["chat_id"],
-                        metadata["message_id"],
-                        {
-                            "content": serialize_content_blocks(content_blocks),
-                        },
-                    )
+                # Save message in the database
+                Chats.upsert_message_to_chat_by_id_and_message_id(
+                    metadata["chat_id"],
+                    metadata["message_id"],
+                    {
+                        "content": serialize_content_blocks(content_blocks),
+                    },
+                )
                 
                 # 清理 MCP 相关资源
                 if metadata.get("mcp_servers", []) or metadata.get("mcp_enabled", False):
@@ -2346,7 +2314,11 @@ async def process_chat_response(
                     await cleanup_mcp_servers(metadata["mcp_servers"])
 
         # background_tasks.add_task(post_response_handler, response, events)
-        task_id, _ = create_task(post_response_handler(response, events))
+        task_id, _ = await create_task(
+            post_response_handler(response, events),
+            user_id=user.id,
+            chat_id=metadata.get("chat_id"),
+        )
         return {"status": True, "task_id": task_id}
 
     else:
@@ -2368,6 +2340,8 @@ async def process_chat_response(
                     yield wrap_item(json.dumps(event))
 
             async for data in original_generator:
+                # Stream filters get text, whether the provider streams str or bytes
+                data = data.decode("utf-8") if isinstance(data, bytes) else data
                 data, _ = await process_filter_functions(
                     request=request,
                     filter_functions=filter_functions,
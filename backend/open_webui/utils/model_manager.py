@@ -0,0 +1,294 @@
+import asyncio
+import gc
+import logging
+import sys
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+import psutil
+
+from open_webui.config import MODEL_IDLE_TIMEOUT, MODEL_MEMORY_BUDGET
+from open_webui.env import SRC_LOG_LEVELS
+from open_webui.utils import metrics
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["MAIN"])
+
+
+class ManagedModel:
+    """
+    A model loaded on first use, or ahead of it by `warmup`. Inference runs on
+    the model's own executor, and the model cannot be unloaded while calls
+    submitted with `submit`, `run` or `run_async` hold a reference to it.
+    """
+
+    def __init__(
+        self,
+        manager: "ModelManager",
+        name: str,
+        key: Any,
+        loader: Callable[[], Any],
+        threads: int = 1,
+    ):
+        self.manager = manager
+        self.name = name
+        self.key = key
+        self.loader = loader
+        self.executor = ThreadPoolExecutor(
+            max_workers=threads, thread_name_prefix=f"model-{name}"
+        )
+
+        self.model = None
+        # Memory the model took when it was last loaded, in bytes
+        self.size = 0
+        self.refs = 0
+        self.last_used = time.monotonic()
+        self.retired = False
+
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()
+
+    @property
+    def loaded(self) -> bool:
+        return self.model is not None
+
+    def _load(self):
+        with self._load_lock:
+            if self.model is not None:
+                return self.model
+
+            with self.manager._load_lock:
+                # Loaded one at a time, which bounds the memory taken while
+                # loading and keeps the measured sizes apart
+                self.manager._make_room(self, self.size)
+
+                log.info(f"Loading {self.name} model: {self.key}")
+                rss = psutil.Process().memory_info().rss
+                model = self.loader()
+                self.size = max(psutil.Process().memory_info().rss - rss, 0)
+                self.manager.loads.inc()
+
+                with self._lock:
+                    self.model = model
+                    self.last_used = time.monotonic()
+
+                self.manager._make_room(self, 0)
+
+        # Replaced while it was loading
+        if self.retired and self.refs == 0:
+            self.close()
+        return model
+
+    def acquire(self):
+        """Returns the model, loading it if needed, and holds a reference to it."""
+        with self._lock:
+            self.refs += 1
+            self.last_used = time.monotonic()
+            model = self.model
+
+        if model is None:
+            try:
+                model = self._load()
+            except BaseException:
+                self.release()
+                raise
+        return model
+
+    def release(self):
+        with self._lock:
+            self.refs -= 1
+            self.last_used = time.monotonic()
+            retired = self.retired and self.refs == 0
+
+        if retired:
+            self.close()
+
+    def submit(self, fn: Callable, *args, **kwargs) -> Future:
+        """Runs `fn(model, *args, **kwargs)` on the model's executor."""
+        model = self.acquire()
+        try:
+            future = self.executor.submit(fn, model, *args, **kwargs)
+        except BaseException:
+            self.release()
+            raise
+
+        future.add_done_callback(lambda _: self.release())
+        return future
+
+    def run(self, fn: Callable, *args, **kwargs):
+        return self.submit(fn, *args, **kwargs).result()
+
+    async def run_async(self, fn: Callable, *args, **kwargs):
+        # Loading blocks, so it is kept off the event loop as well
+        future = await asyncio.to_thread(self.submit, fn, *args, **kwargs)
+        return await asyncio.wrap_future(future)
+
+    def warmup(self):
+        """Loads the model in the background."""
+
+        def load():
+            try:
+                self._load()
+            except Exception as e:
+                log.error(f"Error loading {self.name} model {self.key}: {e}")
+
+        threading.Thread(
+            target=load, name=f"model-{self.name}-warmup", daemon=True
+        ).start()
+
+    def unload(self, idle_for: Optional[float] = None) -> bool:
+        """
+        Unloads the model unless it is in use or being loaded, or has been used
+        within the last `idle_for` seconds.
+        """
+        if not self._load_lock.acquire(blocking=False):
+            return False
+
+        try:
+            with self._lock:
+                if self.model is None or self.refs > 0:
+                    return False
+                if idle_for is not None and (
+                    time.monotonic() - self.last_used < idle_for
+                ):
+                    return False
+                self.model = None
+        finally:
+            self._load_lock.release()
+
+        log.info(f"Unloaded {self.name} model: {self.key}")
+        self.manager.unloads.inc()
+        free_memory()
+        return True
+
+    def close(self):
+        """Unloads a retired model and stops its executor's threads."""
+        self.unload()
+        self.executor.shutdown(wait=False)
+
+
+def free_memory():
+    gc.collect()
+
+    torch = sys.modules.get("torch")
+    if torch is not None and torch.cuda.is_available():
+        torch.cuda.empty_cache()
+
+
+class ModelManager:
+    """
+    Keeps one model per name (e.g. "embedding"), replacing it when its key
+    (e.g. the configured model) changes. Models unused for `idle_timeout`
+    seconds are unloaded, and so are the least recently used idle ones while
+    the loaded models take up more than `memory_budget` bytes.
+    """
+
+    def __init__(self, idle_timeout: int = 0, memory_budget: int = 0):
+        self.idle_timeout = idle_timeout
+        self.memory_budget = memory_budget
+
+        self.models: dict[str, ManagedModel] = {}
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()
+
+        self.loads = metrics.counter("models.loads")
+        self.unloads = metrics.counter("models.unloads")
+        metrics.gauge("models.loaded", lambda: len(self.loaded_models()))
+        metrics.gauge("models.bytes", lambda: sum(m.size for m in self.loaded_models()))
+
+    def loaded_models(self) -> list[ManagedModel]:
+        with self._lock:
+            return [model for model in self.models.values() if model.loaded]
+
+    def get(self, name: str) -> Optional[ManagedModel]:
+        return self.models.get(name)
+
+    def register(
+        self,
+        name: str,
+        key: Any,
+        loader: Callable[[], Any],
+        threads: int = 1,
+    ) -> ManagedModel:
+        """
+        Returns the model registered as `name`, or registers a new one when
+        its key differs. A replaced model is unloaded once its calls are done.
+        """
+        with self._lock:
+            model = self.models.get(name)
+            if model is not None and model.key == key:
+                return model
+
+            self.models[name] = ManagedModel(self, name, key, loader, threads)
+            replacement = self.models[name]
+
+        if model is not None:
+            self._retire(model)
+        return replacement
+
+    def remove(self, name: str):
+        with self._lock:
+            model = self.models.pop(name, None)
+
+        if model is not None:
+            self._retire(model)
+
+    def _retire(self, model: ManagedModel):
+        with model._lock:
+            model.retired = True
+            idle = model.refs == 0
+
+        # Otherwise the last of the calls already submitted closes it
+        if idle:
+            model.close()
+
+    def _make_room(self, loading: Optional[ManagedModel], size: int):
+        """
+        Unloads idle models, least recently used first, until the loaded ones
+        and the `size` bytes `loading` is about to take fit in the budget.
+        """
+        if not self.memory_budget:
+            return
+
+        others = sorted(
+            [model for model in self.loaded_models() if model is not loading],
+            key=lambda model: model.last_used,
+        )
+        used = sum(model.size for model in others) + size
+        if loading is not None and loading.loaded:
+            used += loading.size
+
+        for model in others:
+            if used <= self.memory_budget:
+                break
+            if model.unload():
+                used -= model.size
+
+        if used > self.memory_budget:
+            log.warning(
+                f"Loaded models take {used} bytes, over the budget of "
+                f"{self.memory_budget}, as the others are in use"
+            )
+
+    def unload_idle(self):
+        if self.idle_timeout:
+            for model in self.loaded_models():
+                model.unload(idle_for=self.idle_timeout)
+
+        if self.memory_budget:
+            with self._load_lock:
+                self._make_room(None, 0)
+
+
+MODELS = ModelManager(MODEL_IDLE_TIMEOUT, MODEL_MEMORY_BUDGET)
+
+
+async def periodic_model_unload(interval: int = 60):
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await asyncio.to_thread(MODELS.unload_idle)
+        except Exception as e:
+            log.exception(f"Error unloading idle models: {e}")
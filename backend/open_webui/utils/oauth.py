@@ -16,6 +16,7 @@ from starlette.responses import RedirectResponse
 from open_webui.models.auths import Auths
 from open_webui.models.users import Users
 from open_webui.models.groups import Groups, GroupModel, GroupUpdateForm
+from open_webui.socket.main import invalidate_channel_membership
 from open_webui.config import (
     DEFAULT_USER_ROLE,
     ENABLE_OAUTH_SIGNUP,
@@ -42,7 +43,11 @@ from open_webui.env import (
     WEBUI_AUTH_COOKIE_SECURE,
 )
 from open_webui.utils.misc import parse_duration
-from open_webui.utils.auth import get_password_hash, create_token
+from open_webui.utils.auth import (
+    get_password_hash,
+    create_token,
+    invalidate_user_cache,
+)
 from open_webui.utils.webhook import post_webhook
 
 from open_webui.env import SRC_LOG_LEVELS, GLOBAL_LOG_LEVEL
@@ -314,6 +319,7 @@ class OAuthManager:
             determined_role = self.get_user_role(user, user_data)
             if user.role != determined_role:
                 Users.update_user_role_by_id(user.id, determined_role)
+                await invalidate_user_cache(user.id)
 
         if not user:
             user_count = Users.get_num_users()
@@ -414,6 +420,8 @@ class OAuthManager:
                 user_data=user_data,
                 default_permissions=request.app.state.config.USER_PERMISSIONS,
             )
+            # Channel access granted through the groups may have changed
+            await invalidate_channel_membership([user.id])
 
         # Set the cookie token
         response.set_cookie(
@@ -0,0 +1,87 @@
+from functools import partial
+from typing import Mapping, Optional
+
+import aiohttp
+import anyio
+from starlette.responses import Response
+from starlette.types import Receive, Scope, Send
+
+# Headers describing the upstream connection/encoding, which do not apply to ours
+HOP_BY_HOP_HEADERS = {
+    "connection",
+    "content-encoding",
+    "content-length",
+    "keep-alive",
+    "transfer-encoding",
+}
+
+
+class UpstreamStreamingResponse(Response):
+    """
+    Pure ASGI response that forwards an upstream aiohttp response to the client.
+
+    Chunks are sent exactly as they arrive from the upstream socket, without
+    being split into lines, decoded or re-encoded. The upstream response and
+    session are released when the stream ends or the client disconnects.
+    """
+
+    def __init__(
+        self,
+        response: aiohttp.ClientResponse,
+        session: Optional[aiohttp.ClientSession] = None,
+        status_code: Optional[int] = None,
+        headers: Optional[Mapping[str, str]] = None,
+        media_type: Optional[str] = None,
+    ):
+        self.upstream = response
+        self.session = session
+        self.status_code = status_code or response.status
+        self.media_type = media_type
+        self.background = None
+
+        self.init_headers(
+            {
+                key: value
+                for key, value in (headers or response.headers).items()
+                if key.lower() not in HOP_BY_HOP_HEADERS
+            }
+        )
+
+    async def listen_for_disconnect(self, receive: Receive):
+        while True:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                break
+
+    async def stream_response(self, send: Send):
+        await send(
+            {
+                "type": "http.response.start",
+                "status": self.status_code,
+                "headers": self.raw_headers,
+            }
+        )
+
+        async for chunk in self.upstream.content.iter_any():
+            await send({"type": "http.response.body", "body": chunk, "more_body": True})
+
+        await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+    async def close(self):
+        self.upstream.close()
+        if self.session:
+            await self.session.close()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        try:
+            async with anyio.create_task_group() as task_group:
+
+                async def wrap(func):
+                    await func()
+                    task_group.cancel_scope.cancel()
+
+                task_group.start_soon(wrap, partial(self.stream_response, send))
+                await wrap(partial(self.listen_for_disconnect, receive))
+        finally:
+            with anyio.CancelScope(shield=True):
+                await self.close()
@@ -18,10 +18,15 @@ def parse_redis_sentinel_url(redis_url):
     }
 
 
-def get_redis_connection(redis_url, redis_sentinels, decode_responses=True):
+def get_redis_connection(
+    redis_url, redis_sentinels, decode_responses=True, async_mode=False
+):
     if redis_sentinels:
         redis_config = parse_redis_sentinel_url(redis_url)
-        sentinel = redis.sentinel.Sentinel(
+        sentinel_class = (
+            aioredis.sentinel.Sentinel if async_mode else redis.sentinel.Sentinel
+        )
+        sentinel = sentinel_class(
             redis_sentinels,
             port=redis_config["port"],
             db=redis_config["db"],
@@ -32,6 +37,9 @@ def get_redis_connection(redis_url, redis_sentinels, decode_responses=True):
 
         # Get a master connection from Sentinel
         return sentinel.master_for(redis_config["service"])
+    elif async_mode:
+        # Standard asyncio Redis connection
+        return aioredis.Redis.from_url(redis_url, decode_responses=decode_responses)
     else:
         # Standard Redis connection
         return redis.Redis.from_url(redis_url, decode_responses=decode_responses)
@@ -1,11 +1,65 @@
 import json
+from typing import AsyncIterator
 from uuid import uuid4
+
+import orjson
+from starlette.responses import StreamingResponse
+
 from open_webui.utils.misc import (
     openai_chat_chunk_message_template,
     openai_chat_completion_message_template,
 )
 
 
+class ChunkStreamingResponse(StreamingResponse):
+    """
+    A streaming chat completion backed by already parsed OpenAI-style chunk dicts.
+
+    Internal consumers (e.g. `process_chat_response`) iterate `chunks` directly,
+    so every upstream line is parsed exactly once. The chunks are only serialized
+    to SSE when the response is sent to an external client.
+    """
+
+    def __init__(self, chunks: AsyncIterator[dict], **kwargs):
+        self.chunks = chunks
+        kwargs.setdefault("media_type", "text/event-stream")
+        super().__init__(serialize_chunks_to_sse(chunks), **kwargs)
+
+
+async def serialize_chunks_to_sse(chunks: AsyncIterator[dict]) -> AsyncIterator[bytes]:
+    async for chunk in chunks:
+        yield b"data: " + orjson.dumps(chunk) + b"\n\n"
+
+    yield b"data: [DONE]\n\n"
+
+
+async def iter_stream_chunks(response: StreamingResponse) -> AsyncIterator[dict]:
+    """
+    Yields the parsed chunks of a streaming chat completion, reading them straight
+    from a ChunkStreamingResponse or parsing the `data:` lines of an SSE body.
+    """
+    if isinstance(response, ChunkStreamingResponse):
+        async for chunk in response.chunks:
+            yield chunk
+        return
+
+    async for line in response.body_iterator:
+        line = (line.encode("utf-8") if isinstance(line, str) else line).strip()
+
+        # "data:" is the prefix for each event, skip empty lines and comments
+        if not line.startswith(b"data:"):
+            continue
+
+        data = line[len(b"data:") :].strip()
+        if data == b"[DONE]":
+            continue
+
+        try:
+            yield orjson.loads(data)
+        except orjson.JSONDecodeError:
+            continue
+
+
 def convert_ollama_tool_call_to_openai(tool_calls: dict) -> dict:
     openai_tool_calls = []
     for tool_call in tool_calls:
@@ -99,9 +153,14 @@ def convert_response_ollama_to_openai(ollama_response: dict) -> dict:
     return response
 
 
-async def convert_streaming_response_ollama_to_openai(ollama_streaming_response):
+async def convert_streaming_chunks_ollama_to_openai(
+    ollama_streaming_response,
+) -> AsyncIterator[dict]:
     async for data in ollama_streaming_response.body_iterator:
-        data = json.loads(data)
+        if not data.strip():
+            continue
+
+        data = orjson.loads(data)
 
         model = data.get("model", "ollama")
         message_content = data.get("message", {}).get("content", None)
@@ -117,11 +176,6 @@ async def convert_streaming_response_ollama_to_openai(ollama_streaming_response)
         if done:
             usage = convert_ollama_usage_to_openai(data)
 
-        data = openai_chat_chunk_message_template(
+        yield openai_chat_chunk_message_template(
             model, message_content, openai_tool_calls, usage
         )
-
-        line = f"data: {json.dumps(data)}\n\n"
-        yield line
-
-    yield "data: [DONE]\n\n"
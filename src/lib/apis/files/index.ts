@@ -118,6 +118,21 @@ export const getFileById = async (token: string, id: string) => {
 	return res;
 };
 
+// Audio uploads are transcribed after the upload returns, with `data.status`
+// "pending" until the transcript is indexed
+export const waitForFileProcessing = async (token: string, file, interval = 2000) => {
+	while (file?.data?.status === 'pending') {
+		await new Promise((resolve) => setTimeout(resolve, interval));
+		file = await getFileById(token, file.id);
+	}
+
+	if (file?.data?.status === 'failed') {
+		throw file.data.error ?? 'Failed to process file.';
+	}
+
+	return file;
+};
+
 export const updateFileDataContentById = async (token: string, id: string, content: string) => {
 	let error = null;
 
@@ -22,6 +22,8 @@ export const MODEL_DOWNLOAD_POOL = writable({});
 export const mobile = writable(false);
 
 export const socket: Writable<null | Socket> = writable(null);
+// Set once the server has stored the socket's session, and cleared on disconnect
+export const socketReady: Writable<boolean> = writable(false);
 export const activeUserIds: Writable<null | string[]> = writable(null);
 export const USAGE_POOL: Writable<null | string[]> = writable(null);
 
@@ -0,0 +1,41 @@
+import { get } from 'svelte/store';
+import { socket, socketReady } from '$lib/stores';
+
+// Components currently interested in each server-pushed topic (usage, presence)
+const subscriptions: Record<string, number> = {};
+
+// Until the session is ready, subscriptions are only recorded and get sent by
+// `resubscribe` when the server emits "session-ready"
+const emitSubscribe = (topic: string) => {
+	if (get(socketReady)) {
+		get(socket)?.emit(`${topic}:subscribe`);
+	}
+};
+
+export const subscribe = (topic: string) => {
+	subscriptions[topic] = (subscriptions[topic] ?? 0) + 1;
+	if (subscriptions[topic] === 1) {
+		emitSubscribe(topic);
+	}
+};
+
+export const unsubscribe = (topic: string) => {
+	if (!subscriptions[topic]) {
+		return;
+	}
+
+	subscriptions[topic] -= 1;
+	if (subscriptions[topic] === 0) {
+		get(socket)?.emit(`${topic}:unsubscribe`);
+	}
+};
+
+// Rooms do not survive a reconnect, so subscriptions are sent again once the
+// new session is ready
+export const resubscribe = () => {
+	for (const [topic, count] of Object.entries(subscriptions)) {
+		if (count > 0) {
+			emitSubscribe(topic);
+		}
+	}
+};